@@ -0,0 +1,126 @@
+"""
+結構化存取日誌
+為每個請求分配 request id，記錄路由、狀態碼、延遲、資料庫耗時與操作者；
+2xx 回應依 ACCESS_LOG_SAMPLE_RATE 取樣，錯誤與慢請求一律記錄
+"""
+import random
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+
+
+logger = get_logger("access")
+
+# 當前請求的統計資料（可變字典，讓依賴與資料庫事件能寫回同一份）
+_request_stats: ContextVar[Optional[dict]] = ContextVar("request_stats", default=None)
+
+
+def get_request_id() -> Optional[str]:
+    """獲取當前請求的 request id"""
+    stats = _request_stats.get()
+    return stats["request_id"] if stats else None
+
+
+def set_request_actor(kind: str, actor_id: int) -> None:
+    """
+    記錄當前請求的操作者
+
+    Args:
+        kind: "admin" 或 "user"
+        actor_id: 管理員或用戶 ID
+    """
+    stats = _request_stats.get()
+    if stats is not None:
+        stats[f"{kind}_id"] = actor_id
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_start"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop("query_start", None)
+    stats = _request_stats.get()
+    if stats is not None and started is not None:
+        stats["db_ms"] += (time.perf_counter() - started) * 1000
+        stats["db_queries"] += 1
+
+
+def install_db_timing(engine: AsyncEngine) -> None:
+    """在引擎上註冊 SQL 計時事件"""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class AccessLogMiddleware:
+    """純 ASGI 存取日誌中介層（不包裝回應 body，串流回應不受影響）"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+
+        stats = {"request_id": request_id, "status": 500, "db_ms": 0.0, "db_queries": 0}
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                stats["status"] = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stats.reset(token)
+            self._log(scope, stats, (time.perf_counter() - started) * 1000)
+
+    def _log(self, scope, stats: dict, latency_ms: float) -> None:
+        status_code = stats["status"]
+        slow = latency_ms >= settings.ACCESS_LOG_SLOW_MS
+
+        if status_code < 400 and not slow and random.random() >= settings.ACCESS_LOG_SAMPLE_RATE:
+            return
+
+        route = scope.get("route")
+        fields = {
+            "request_id": stats["request_id"],
+            "method": scope["method"],
+            "route": getattr(route, "path", None) or scope["path"],
+            "path": scope["path"],
+            "status": status_code,
+            "latency_ms": round(latency_ms, 2),
+            "db_ms": round(stats["db_ms"], 2),
+            "db_queries": stats["db_queries"],
+        }
+        for key in ("admin_id", "user_id"):
+            if key in stats:
+                fields[key] = stats[key]
+        if slow:
+            fields["slow"] = True
+
+        if status_code >= 500:
+            logger.error("request", extra={"fields": fields})
+        elif status_code >= 400 or slow:
+            logger.warning("request", extra={"fields": fields})
+        else:
+            logger.info("request", extra={"fields": fields})
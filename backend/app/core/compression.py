@@ -0,0 +1,193 @@
+"""
+回應壓縮
+純 ASGI 中介層，依 Accept-Encoding 選擇 brotli（有安裝時）或 gzip；
+小於 COMPRESSION_MIN_SIZE 的回應不壓縮，串流回應逐塊壓縮並 flush，不需要先收齊整個 body；
+部分內容 (206 / Content-Range) 不壓縮，壓縮時保留原有 Vary 並將 ETag 改為弱 ETag
+"""
+import gzip
+import zlib
+from typing import Optional
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # 未安裝 brotli 時只提供 gzip
+    brotli = None
+
+
+# 值得壓縮的內容類型（圖片、xlsx、zip 本身已壓縮）
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+# 預先壓縮檔案的副檔名，依偏好順序
+PRECOMPRESSED = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _parse_accept_encoding(header: str) -> dict:
+    """解析 Accept-Encoding，回傳 {編碼: q 值}"""
+    encodings = {}
+    for item in header.split(","):
+        parts = item.strip().split(";")
+        name = parts[0].strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        encodings[name] = q
+    return encodings
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """選擇客戶端接受且伺服器支援的編碼（br 優先）"""
+    accepted = _parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    for name in ("br", "gzip"):
+        if name == "br" and brotli is None:
+            continue
+        if accepted.get(name, wildcard) > 0:
+            return name
+    return None
+
+
+def precompress_file(path: str) -> None:
+    """為匯出檔案產生 .gz（以及有安裝 brotli 時的 .br），供檔案服務直接回傳"""
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(data, compresslevel=9))
+    if brotli is not None:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(data, quality=11))
+
+
+class _Compressor:
+    """gzip / brotli 串流壓縮器的統一介面"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._gz = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        """壓縮並 flush，讓已產生的資料立即送出"""
+        if self.encoding == "br":
+            return self._br.process(data) + self._br.flush()
+        return self._gz.compress(data) + self._gz.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "br":
+            return self._br.process(data) + self._br.finish()
+        return self._gz.compress(data) + self._gz.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """純 ASGI 壓縮中介層"""
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept_encoding) if accept_encoding else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = {k.lower(): v for k, v in message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+                if (
+                    message["status"] in (204, 206, 304)
+                    or b"content-encoding" in headers
+                    or b"content-range" in headers
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    # 等到第一個 body 區塊才決定是否壓縮
+                    start_message = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                if not more_body and len(body) < self.minimum_size:
+                    # 小回應不壓縮
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding)
+                headers = []
+                vary = []
+                for k, v in start_message.get("headers", []):
+                    name = k.lower()
+                    if name == b"content-length":
+                        continue
+                    if name == b"vary":
+                        vary.extend(item.strip() for item in v.split(b",") if item.strip())
+                        continue
+                    if name == b"etag" and not v.startswith(b"W/"):
+                        # 壓縮後內容與原始位元組不同，強 ETag 改為弱 ETag
+                        v = b"W/" + v
+                    headers.append((k, v))
+                if b"*" not in vary and b"accept-encoding" not in (item.lower() for item in vary):
+                    vary.append(b"Accept-Encoding")
+                headers.append((b"content-encoding", encoding.encode("latin-1")))
+                headers.append((b"vary", b", ".join(vary)))
+
+                if not more_body:
+                    data = compressor.finish(body)
+                    headers.append((b"content-length", str(len(data)).encode("latin-1")))
+                    await send({**start_message, "headers": headers})
+                    await send({"type": "http.response.body", "body": data})
+                    return
+
+                # 串流回應：不設 Content-Length，以 chunked 傳送
+                await send({**start_message, "headers": headers})
+
+            if more_body:
+                data = compressor.compress(body)
+                if data:
+                    await send({"type": "http.response.body", "body": data, "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": compressor.finish(body)})
+
+        await self.app(scope, receive, send_wrapper)
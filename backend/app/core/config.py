@@ -25,6 +25,19 @@ class Settings:
         """生成資料庫連接 URL"""
         return f"postgresql+asyncpg://{self.DB_USERNAME}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    # 唯讀副本配置（未設定 DB_REPLICA_HOST 時所有查詢都走主庫）
+    DB_REPLICA_HOST: Optional[str] = os.getenv("DB_REPLICA_HOST")
+    DB_REPLICA_PORT: str = os.getenv("DB_REPLICA_PORT", DB_PORT)
+    # 副本可接受的最大延遲（秒），超過時或剛寫入後的這段時間內讀取改走主庫
+    REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+
+    @property
+    def REPLICA_DATABASE_URL(self) -> Optional[str]:
+        """生成唯讀副本連接 URL"""
+        if not self.DB_REPLICA_HOST:
+            return None
+        return f"postgresql+asyncpg://{self.DB_USERNAME}:{self.DB_PASSWORD}@{self.DB_REPLICA_HOST}:{self.DB_REPLICA_PORT}/{self.DB_NAME}"
+
     # JWT 配置
     JWT_SECRET: str = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
     JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
@@ -34,6 +47,14 @@ class Settings:
     LINE_CHANNEL_ID: str = os.getenv("LINE_CHANNEL_ID", "")
     LINE_CHANNEL_SECRET: str = os.getenv("LINE_CHANNEL_SECRET", "")
     LINE_CALLBACK_URL: str = os.getenv("LINE_CALLBACK_URL", "")
+    LINE_API_BASE_URL: str = os.getenv("LINE_API_BASE_URL", "https://api.line.me")
+    LINE_HTTP_TIMEOUT: float = float(os.getenv("LINE_HTTP_TIMEOUT", "10"))
+    LINE_JWKS_TTL: int = int(os.getenv("LINE_JWKS_TTL", "3600"))  # JWKS 快取秒數
+
+    # LINE 登入流量控制（每個 worker）
+    LOGIN_MAX_CONCURRENCY: int = int(os.getenv("LOGIN_MAX_CONCURRENCY", "20"))
+    LOGIN_MAX_WAITING: int = int(os.getenv("LOGIN_MAX_WAITING", "200"))
+    LOGIN_QUEUE_TIMEOUT: float = float(os.getenv("LOGIN_QUEUE_TIMEOUT", "3"))
 
     # 前端 URL
     FRONTEND_URL: str = os.getenv("FRONTEND_URL", "http://localhost:5173")
@@ -42,11 +63,23 @@ class Settings:
     STORAGE_TYPE: str = os.getenv("STORAGE_TYPE", "local")  # local, s3
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "./uploads")
 
+    # 設定後檔案下載改以 X-Accel-Redirect 交由 nginx 傳送（例如 /internal-files/）
+    FILES_ACCEL_REDIRECT_PREFIX: str = os.getenv("FILES_ACCEL_REDIRECT_PREFIX", "")
+
     # AWS S3 配置（如果使用 S3）
     AWS_ACCESS_KEY_ID: Optional[str] = os.getenv("AWS_ACCESS_KEY_ID")
     AWS_SECRET_ACCESS_KEY: Optional[str] = os.getenv("AWS_SECRET_ACCESS_KEY")
     AWS_REGION: Optional[str] = os.getenv("AWS_REGION")
     S3_BUCKET_NAME: Optional[str] = os.getenv("S3_BUCKET_NAME")
+    # S3 相容服務（MinIO 等）的端點，使用 AWS S3 時留空
+    S3_ENDPOINT_URL: str = os.getenv("S3_ENDPOINT_URL", "")
+    S3_PRESIGN_EXPIRES: int = int(os.getenv("S3_PRESIGN_EXPIRES", "900"))  # 預簽名下載 URL 有效秒數
+    S3_MULTIPART_CHUNK_MB: int = int(os.getenv("S3_MULTIPART_CHUNK_MB", "8"))  # multipart 上傳門檻與分段大小
+
+    # 匯出檔案保留：最後使用超過此時數即刪除、總容量上限（超過時依最久未使用淘汰）、清理間隔
+    EXPORT_RETENTION_HOURS: float = float(os.getenv("EXPORT_RETENTION_HOURS", "72"))
+    EXPORT_MAX_TOTAL_MB: int = int(os.getenv("EXPORT_MAX_TOTAL_MB", "1024"))
+    EXPORT_SWEEP_INTERVAL_SECONDS: float = float(os.getenv("EXPORT_SWEEP_INTERVAL_SECONDS", "3600"))
 
     # 應用配置
     PROJECT_NAME: str = "CheckinFlow API"
@@ -55,6 +88,49 @@ class Settings:
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
     ALLOW_REGISTRATION: bool = os.getenv("ALLOW_REGISTRATION", "False").lower() == "true"
 
+    # 生產服務配置（serve.py）
+    HOST: str = os.getenv("HOST", "0.0.0.0")
+    PORT: int = int(os.getenv("PORT", "8000"))
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "0"))  # 0 表示依 CPU 核心數
+    MAX_REQUESTS: int = int(os.getenv("MAX_REQUESTS", "10000"))  # worker 處理 N 個請求後回收，0 表示不回收
+    MAX_REQUESTS_JITTER: int = int(os.getenv("MAX_REQUESTS_JITTER", "1000"))
+    GRACEFUL_TIMEOUT: int = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+    # 多 worker 時由 serve.py 在 fork 前初始化一次資料庫，worker 不再重複執行
+    INIT_DB_ON_STARTUP: bool = os.getenv("INIT_DB_ON_STARTUP", "True").lower() == "true"
+
+    # 活動名單快取秒數（名單異動只會清除本 worker 的快取）
+    ROSTER_CACHE_TTL: float = float(os.getenv("ROSTER_CACHE_TTL", "60"))
+
+    # 活動額滿後，本 worker 直接拒絕簽到的秒數（之後重新以資料庫為準）
+    CAPACITY_FULL_TTL: float = float(os.getenv("CAPACITY_FULL_TTL", "5"))
+
+    # 簽到分區與封存：預先建立的月分區數量、活動結束多少個月後封存簽到記錄
+    CHECKIN_PARTITION_MONTHS_AHEAD: int = int(os.getenv("CHECKIN_PARTITION_MONTHS_AHEAD", "3"))
+    CHECKIN_ARCHIVE_AFTER_MONTHS: int = int(os.getenv("CHECKIN_ARCHIVE_AFTER_MONTHS", "12"))
+
+    # 回應壓縮：小於此位元組數的回應不壓縮；gzip 等級與 brotli 品質（即時壓縮取速度）
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+    COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+    # 活動詳情/公開列表的 HTTP 快取秒數（ETag 指紋快取與 Cache-Control max-age）
+    EVENT_HTTP_CACHE_TTL: float = float(os.getenv("EVENT_HTTP_CACHE_TTL", "10"))
+
+    # 範本摘要列表的快取秒數（每次請求仍會比對資料庫中的範本版本，其他 worker 的異動也會立即生效）
+    TEMPLATE_LIST_CACHE_TTL: float = float(os.getenv("TEMPLATE_LIST_CACHE_TTL", "30"))
+
+    # 到場曲線：進行中活動的快取秒數、活動結束多少分鐘後結果視為不再變動
+    ARRIVALS_LIVE_TTL: float = float(os.getenv("ARRIVALS_LIVE_TTL", "5"))
+    ARRIVALS_FINAL_AFTER_MINUTES: int = int(os.getenv("ARRIVALS_FINAL_AFTER_MINUTES", "60"))
+
+    # 出席分析快照：增量更新間隔與完整重建間隔（秒）
+    ANALYTICS_REFRESH_SECONDS: float = float(os.getenv("ANALYTICS_REFRESH_SECONDS", "60"))
+    ANALYTICS_FULL_REFRESH_SECONDS: float = float(os.getenv("ANALYTICS_FULL_REFRESH_SECONDS", "3600"))
+
+    # 存取日誌配置
+    ACCESS_LOG_SAMPLE_RATE: float = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1.0"))  # 2xx/3xx 回應的記錄比例
+    ACCESS_LOG_SLOW_MS: float = float(os.getenv("ACCESS_LOG_SLOW_MS", "1000"))  # 超過此延遲一律記錄
+
     # CORS 配置
     CORS_ORIGINS: list = [
         "http://localhost:5173",
@@ -11,6 +11,7 @@ from sqlalchemy import select
 from app.database import get_db
 from app.models import Admin, User
 from app.core.security import decode_access_token
+from app.core.access_log import set_request_actor
 
 
 # HTTP Bearer 認證方案
@@ -56,6 +57,7 @@ async def get_current_admin(
             detail="用戶不存在"
         )
 
+    set_request_actor("admin", admin.id)
     return admin
 
 
@@ -93,6 +95,7 @@ async def get_current_user(
             detail="用戶不存在"
         )
 
+    set_request_actor("user", user.id)
     return user
 
 
@@ -0,0 +1,145 @@
+"""
+檔案回應
+支援 ETag / Last-Modified 條件式請求與單一 Range 請求；
+伺服器提供 http.response.zerocopy 擴充時以 sendfile 傳送，否則以大區塊非同步讀檔
+"""
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Mapping, Optional
+
+import anyio
+from fastapi import Request, Response
+
+# 非 sendfile 時每次讀取的區塊大小
+CHUNK_SIZE = 256 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def file_etag(st: os.stat_result) -> str:
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def _not_modified(request: Request, etag: str, st: os.stat_result) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(st.st_mtime) <= int(parsedate_to_datetime(if_modified_since).timestamp())
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _parse_range(header: str, size: int) -> Optional[tuple]:
+    """
+    解析單一 bytes 範圍，回傳 (start, end)（含 end）；
+    多重範圍或格式不符時回傳 None（改回傳完整檔案），範圍不合法時拋出 ValueError
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # 後綴範圍：最後 N 個位元組
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("unsatisfiable range")
+    return start, end
+
+
+class RangedFileResponse(Response):
+    """傳送檔案的一段（或全部）內容"""
+
+    def __init__(
+        self,
+        path: str,
+        start: int,
+        length: int,
+        status_code: int,
+        headers: Mapping[str, str],
+        media_type: str,
+    ):
+        super().__init__(status_code=status_code, headers=dict(headers), media_type=media_type)
+        self.path = path
+        self.start = start
+        self.length = length
+        self.headers["content-length"] = str(length)
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD" or self.length == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        zerocopy = "http.response.zerocopy" in scope.get("extensions", {})
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            if zerocopy:
+                await send({
+                    "type": "http.response.zerocopy",
+                    "file": file.fileno(),
+                    "offset": self.start,
+                    "count": self.length,
+                })
+                return
+
+            await file.seek(self.start)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await file.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b""})
+
+
+def file_response(
+    request: Request,
+    path: str,
+    st: os.stat_result,
+    media_type: str,
+    cache_control: str,
+    extra_headers: Optional[Mapping[str, str]] = None,
+) -> Response:
+    """
+    依條件式請求與 Range 產生檔案回應（呼叫端已取得 stat，這裡不再碰檔案系統）
+    """
+    etag = file_etag(st)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+        **(extra_headers or {}),
+    }
+
+    if _not_modified(request, etag, st):
+        return Response(status_code=304, headers=headers)
+
+    size = st.st_size
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if byte_range is not None:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            return RangedFileResponse(path, start, end - start + 1, 206, headers, media_type)
+
+    return RangedFileResponse(path, 0, size, 200, headers, media_type)
@@ -0,0 +1,91 @@
+"""
+HTTP 條件式請求快取
+將序列化後的響應與 ETag 保存在記憶體，If-None-Match 相符時直接回傳 304，不查詢資料庫；
+本 worker 的寫入會立即清除相關項目，其他 worker 的項目在 ttl 秒內過期
+"""
+import hashlib
+import time
+from typing import Dict, Hashable, NamedTuple, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+
+class CachedResponse(NamedTuple):
+    etag: str
+    body: bytes
+    stored_at: float
+
+
+def make_etag(*parts) -> str:
+    """由指紋（id、updated_at 等）計算強 ETag"""
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match 是否包含此 ETag（弱比較，忽略 W/ 前綴）"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+class ResponseCache:
+    """以 key 保存已序列化響應的快取"""
+
+    def __init__(self, ttl: float, max_entries: int = 4096):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple[Hashable, ...], CachedResponse] = {}
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.stored_at >= self.ttl:
+            self._entries.pop(key, None)
+            return None
+        return entry
+
+    def put(self, key: Tuple[Hashable, ...], etag: str, body: bytes) -> CachedResponse:
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+        entry = CachedResponse(etag=etag, body=body, stored_at=time.monotonic())
+        self._entries[key] = entry
+        return entry
+
+    def invalidate(self, kind: str, *ids: Hashable) -> None:
+        """清除指定類型的項目；未提供 ids 時清除該類型全部"""
+        for key in [k for k in self._entries if k[0] == kind and (not ids or k[1] in ids)]:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def cached_response(request: Request, entry: CachedResponse, cache_control: str) -> Response:
+    """依 If-None-Match 回傳 304 或完整響應"""
+    headers = {"ETag": entry.etag, "Cache-Control": cache_control}
+    if etag_matches(request, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+# 活動詳情與公開活動列表（報到頁面每位參與者都會請求）
+event_response_cache = ResponseCache(ttl=settings.EVENT_HTTP_CACHE_TTL)
+
+EVENT_CACHE_CONTROL = (
+    f"public, max-age={int(settings.EVENT_HTTP_CACHE_TTL)}, stale-while-revalidate={int(settings.EVENT_HTTP_CACHE_TTL) * 3}"
+)
+
+
+def invalidate_event_responses(*event_ids: str) -> None:
+    """活動異動後清除詳情與所有公開列表快取"""
+    if event_ids:
+        event_response_cache.invalidate("event", *event_ids)
+    event_response_cache.invalidate("public")
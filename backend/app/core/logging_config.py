@@ -0,0 +1,70 @@
+"""
+日誌配置
+所有 checkinflow.* logger 經由 QueueHandler 寫入佇列，由背景線程輸出 JSON，
+記錄日誌時不會在事件迴圈中做任何 I/O
+"""
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from app.core.config import settings
+
+
+LOGGER_NAME = "checkinflow"
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """每筆日誌輸出為一行 JSON，record.fields 中的欄位會合併輸出"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            data.update(fields)
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """獲取 checkinflow 命名空間下的 logger"""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def setup_logging() -> None:
+    """啟動佇列日誌（在每個 worker 的 lifespan 中呼叫，背景線程不會跨 fork 存在）"""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(logging.DEBUG if settings.DEBUG else logging.INFO)
+    logger.handlers = [QueueHandler(log_queue)]
+    logger.propagate = False
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """停止背景線程並輸出剩餘日誌"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,6 +1,11 @@
 """
 資料庫模組
 """
-from app.database.connection import Base, engine, AsyncSessionLocal, get_db, init_db, close_db
+from app.database.connection import (
+    Base, engine, AsyncSessionLocal, get_db, get_read_db, read_session_factory, mark_recent_write, init_db, close_db
+)
 
-__all__ = ["Base", "engine", "AsyncSessionLocal", "get_db", "init_db", "close_db"]
+__all__ = [
+    "Base", "engine", "AsyncSessionLocal", "get_db", "get_read_db", "read_session_factory",
+    "mark_recent_write", "init_db", "close_db"
+]
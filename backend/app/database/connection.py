@@ -3,9 +3,13 @@
 """
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from typing import AsyncGenerator
+from sqlalchemy import text
+from fastapi import Request
+from typing import AsyncGenerator, Dict, Optional
+import asyncio
 import asyncpg
 import sys
+import time
 
 from app.core.config import settings
 
@@ -97,6 +101,136 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+# 唯讀副本引擎（可選）
+replica_engine = None
+AsyncReadSessionLocal = None
+
+if settings.REPLICA_DATABASE_URL:
+    print(f"📍 連接唯讀副本: {settings.DB_REPLICA_HOST}:{settings.DB_REPLICA_PORT}")
+    replica_engine = create_async_engine(
+        settings.REPLICA_DATABASE_URL,
+        echo=settings.DEBUG,
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=20,
+    )
+    AsyncReadSessionLocal = async_sessionmaker(
+        replica_engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+# 副本健康狀態檢查間隔（秒）
+REPLICA_CHECK_INTERVAL = 5.0
+
+_replica_state = {"usable": False, "checked_at": 0.0}
+_replica_check_lock = asyncio.Lock()
+
+# 最近寫入的範圍（通常是 event_id）與寫入時間，用於 read-your-writes
+# 只記錄在本進程：多 worker 部署 (serve.py) 時，寫入後被分派到其他 worker 的讀取仍可能走副本，
+# 最多讀到 REPLICA_MAX_LAG_SECONDS 內的舊資料（超過此延遲的副本整體會被停用）
+_recent_writes: Dict[str, float] = {}
+
+
+def mark_recent_write(scope: str) -> None:
+    """
+    記錄某個範圍剛寫入過資料
+
+    在 REPLICA_MAX_LAG_SECONDS 內，同一範圍的讀取會改走主庫，避免讀到副本上的舊資料；
+    只對同一個 worker 進程的後續讀取有效
+    """
+    now = time.monotonic()
+    _recent_writes[scope] = now
+
+    # 順便清掉過期記錄，避免字典無限增長
+    if len(_recent_writes) > 10000:
+        expired = [k for k, t in _recent_writes.items() if now - t > settings.REPLICA_MAX_LAG_SECONDS]
+        for k in expired:
+            del _recent_writes[k]
+
+
+def _written_recently(scope: Optional[str]) -> bool:
+    if not scope or scope not in _recent_writes:
+        return False
+    return time.monotonic() - _recent_writes[scope] < settings.REPLICA_MAX_LAG_SECONDS
+
+
+async def _replica_is_usable() -> bool:
+    """
+    檢查副本是否可用且延遲在允許範圍內
+
+    結果快取 REPLICA_CHECK_INTERVAL 秒；副本連不上時視為不可用，讀取回退到主庫。
+    已接收的 WAL 都已重放時延遲為 0（主庫閒置時 pg_last_xact_replay_timestamp 會停在最後一筆交易，
+    單看時間戳會把閒置誤判為延遲），否則以最後重放交易的時間估算
+    """
+    if replica_engine is None:
+        return False
+
+    if time.monotonic() - _replica_state["checked_at"] < REPLICA_CHECK_INTERVAL:
+        return _replica_state["usable"]
+
+    async with _replica_check_lock:
+        # 等鎖期間可能已被其他請求更新
+        if time.monotonic() - _replica_state["checked_at"] < REPLICA_CHECK_INTERVAL:
+            return _replica_state["usable"]
+
+        try:
+            async with replica_engine.connect() as conn:
+                result = await asyncio.wait_for(
+                    conn.execute(text("""
+                        SELECT CASE
+                            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                            ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+                        END
+                    """)),
+                    timeout=1.0
+                )
+                lag = float(result.scalar() or 0)
+            usable = lag <= settings.REPLICA_MAX_LAG_SECONDS
+            if not usable:
+                print(f"⚠️  唯讀副本延遲 {lag:.1f}s，暫時改走主庫")
+        except Exception as e:
+            print(f"⚠️  唯讀副本無法連線，暫時改走主庫: {e}", file=sys.stderr)
+            usable = False
+
+        _replica_state["usable"] = usable
+        _replica_state["checked_at"] = time.monotonic()
+        return usable
+
+
+async def read_session_factory(scope: Optional[str] = None) -> async_sessionmaker:
+    """
+    選擇唯讀查詢使用的 session 工廠（副本可用且 scope 未剛寫入時使用副本）
+
+    供串流回應等需要在依賴注入結束後繼續使用連線的場合自行開啟 session
+    """
+    if not _written_recently(scope) and await _replica_is_usable():
+        return AsyncReadSessionLocal
+    return AsyncSessionLocal
+
+
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    唯讀資料庫 session 依賴注入
+    使用方式：db: AsyncSession = Depends(get_read_db)
+
+    用於儀表板、列表與匯出等重度讀取；以下情況回退到主庫：
+    - 未設定唯讀副本
+    - 副本無法連線或延遲超過 REPLICA_MAX_LAG_SECONDS
+    - 路徑中的 event_id 剛被同一個 worker 寫入過 (read-your-writes)
+    """
+    session_factory = await read_session_factory(request.path_params.get("event_id"))
+
+    async with session_factory() as session:
+        try:
+            yield session
+        finally:
+            await session.rollback()
+            await session.close()
+
+
 # 初始化資料庫（建立所有表）
 async def init_db():
     """初始化資料庫：建立資料庫和表"""
@@ -116,6 +250,12 @@ async def init_db():
 
         await conn.run_sync(Base.metadata.create_all)
 
+        # checkins 為分區表，需要先建立月分區才能寫入
+        from app.services.checkin_partitions import ensure_partitions
+        created = await ensure_partitions(conn)
+        if created:
+            print(f"📅 建立簽到分區: {', '.join(created)}")
+
     print("✅ 資料庫表初始化完成")
     print("=" * 50)
     print("🎉 資料庫初始化完成")
@@ -126,4 +266,6 @@ async def init_db():
 async def close_db():
     """關閉資料庫引擎"""
     await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
     print("✅ 資料庫連接已關閉")
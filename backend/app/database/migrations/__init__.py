@@ -0,0 +1,8 @@
+"""
+資料庫遷移模組
+"""
+from app.database.migrations.operations import Migration, Execute, CreateIndex, CreatePartitionedIndex, Backfill, CopyRows
+from app.database.migrations.runner import MigrationRunner
+from app.database.migrations.versions import MIGRATIONS
+
+__all__ = ["Migration", "Execute", "CreateIndex", "CreatePartitionedIndex", "Backfill", "CopyRows", "MigrationRunner", "MIGRATIONS"]
@@ -0,0 +1,308 @@
+"""
+遷移操作
+每個操作都能實際執行 (apply)，也能在乾跑 (dry-run) 時預估耗時 (estimate)
+"""
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+
+# 乾跑預估使用的吞吐量，只作為量級參考
+DDL_SECONDS = 0.05
+INDEX_ROWS_PER_SECOND = 200_000
+BACKFILL_ROWS_PER_SECOND = 20_000
+
+
+async def estimate_rows(conn: AsyncConnection, table: str, where: Optional[str] = None) -> int:
+    """
+    使用 EXPLAIN 預估符合條件的行數，不會實際掃描資料表
+
+    資料表尚未建立時回傳 0
+    """
+    sql = f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {table}"
+    if where:
+        sql += f" WHERE {where}"
+
+    try:
+        result = await conn.execute(text(sql))
+    except Exception:
+        return 0
+
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class Operation:
+    """遷移操作基礎類"""
+    description: str = ""
+
+    async def apply(self, engine: AsyncEngine) -> None:
+        raise NotImplementedError
+
+    async def estimate(self, conn: AsyncConnection) -> float:
+        """預估執行秒數"""
+        return DDL_SECONDS
+
+
+@dataclass
+class Execute(Operation):
+    """
+    在交易中執行 SQL
+
+    設定 lock_timeout，拿不到鎖時直接失敗，避免排在長交易後面卡住線上流量
+    """
+    sql: str
+    description: str = ""
+    lock_timeout: str = "5s"
+
+    async def apply(self, engine: AsyncEngine) -> None:
+        async with engine.begin() as conn:
+            await conn.execute(text(f"SET LOCAL lock_timeout = '{self.lock_timeout}'"))
+            await conn.execute(text(self.sql))
+
+
+@dataclass
+class CreateIndex(Operation):
+    """
+    以 CREATE INDEX CONCURRENTLY 建立索引，建立期間不阻擋寫入
+
+    CONCURRENTLY 不能在交易中執行，因此使用 AUTOCOMMIT 連線；
+    若上次建立失敗留下 INVALID 索引，會先移除後重建
+    """
+    name: str
+    table: str
+    columns: Sequence[str]
+    unique: bool = False
+    where: Optional[str] = None
+    description: str = ""
+
+    def __post_init__(self):
+        if not self.description:
+            self.description = f"建立索引 {self.name} ON {self.table} ({', '.join(self.columns)})"
+
+    async def apply(self, engine: AsyncEngine) -> None:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+
+            result = await conn.execute(
+                text(
+                    "SELECT i.indisvalid FROM pg_index i "
+                    "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+                ),
+                {"name": self.name}
+            )
+            valid = result.scalar_one_or_none()
+            if valid is True:
+                return
+            if valid is False:
+                print(f"   ⚠️  發現無效索引 {self.name}，重新建立")
+                await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {self.name}"))
+
+            unique = "UNIQUE " if self.unique else ""
+            sql = (
+                f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {self.name} "
+                f"ON {self.table} ({', '.join(self.columns)})"
+            )
+            if self.where:
+                sql += f" WHERE {self.where}"
+            await conn.execute(text(sql))
+
+    async def estimate(self, conn: AsyncConnection) -> float:
+        rows = await estimate_rows(conn, self.table)
+        return DDL_SECONDS + rows / INDEX_ROWS_PER_SECOND
+
+
+@dataclass
+class CreatePartitionedIndex(Operation):
+    """
+    在分區表上建立索引，建立期間不阻擋寫入
+
+    分區表的父表不支援 CONCURRENTLY：先以 ON ONLY 在父表建立（無效的）索引，
+    再逐一以 CONCURRENTLY 建立各分區的索引並 ATTACH，全部分區附加後父表索引自動生效；
+    之後新建的分區會自動建立此索引。資料表不是分區表時等同 CreateIndex
+    """
+    name: str
+    table: str
+    columns: Sequence[str]
+    description: str = ""
+
+    def __post_init__(self):
+        if not self.description:
+            self.description = f"建立分區索引 {self.name} ON {self.table} ({', '.join(self.columns)})"
+
+    async def apply(self, engine: AsyncEngine) -> None:
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            result = await conn.execute(
+                text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"),
+                {"table": self.table}
+            )
+            if result.scalar_one_or_none() != "p":
+                await CreateIndex(self.name, self.table, self.columns).apply(engine)
+                return
+
+            await conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {self.name} ON ONLY {self.table} ({', '.join(self.columns)})"
+            ))
+            result = await conn.execute(
+                text(
+                    "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                    "WHERE i.inhparent = to_regclass(:table) ORDER BY c.relname"
+                ),
+                {"table": self.table}
+            )
+            partitions = list(result.scalars().all())
+
+        for partition in partitions:
+            async with engine.connect() as conn:
+                # 父表索引已存在時新建的分區會自動建立並附加索引（名稱由資料庫產生），不必重建
+                result = await conn.execute(
+                    text(
+                        "SELECT 1 FROM pg_inherits i JOIN pg_index x ON x.indexrelid = i.inhrelid "
+                        "WHERE i.inhparent = to_regclass(:name) AND x.indrelid = to_regclass(:partition)"
+                    ),
+                    {"name": self.name, "partition": partition}
+                )
+                if result.scalar_one_or_none() is not None:
+                    continue
+
+            child = f"{self.name}_{partition}"[:63]
+            await CreateIndex(child, partition, self.columns).apply(engine)
+            async with engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                result = await conn.execute(
+                    text("SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(:child)"),
+                    {"child": child}
+                )
+                if result.scalar_one_or_none() is None:
+                    await conn.execute(text(f"ALTER INDEX {self.name} ATTACH PARTITION {child}"))
+            print(f"   ⏳ {self.name}: 已完成分區 {partition}")
+
+    async def estimate(self, conn: AsyncConnection) -> float:
+        rows = await estimate_rows(conn, self.table)
+        return DDL_SECONDS + rows / INDEX_ROWS_PER_SECOND
+
+
+@dataclass
+class Backfill(Operation):
+    """
+    分批回填資料
+
+    每批在獨立交易中更新至多 batch_size 行 (SKIP LOCKED 跳過正被簽到寫入的行)，
+    批次之間暫停 pause 秒讓出資源。where 條件必須在更新後不再成立，否則不會結束。
+    """
+    table: str
+    assignments: str
+    where: str
+    batch_size: int = 5000
+    key: str = "id"
+    pause: float = 0.05
+    description: str = ""
+
+    def __post_init__(self):
+        if not self.description:
+            self.description = f"回填 {self.table}: SET {self.assignments} WHERE {self.where}"
+
+    async def apply(self, engine: AsyncEngine) -> None:
+        async with engine.connect() as conn:
+            total = await estimate_rows(conn, self.table, self.where)
+
+        sql = text(
+            f"UPDATE {self.table} SET {self.assignments} "
+            f"WHERE {self.key} IN ("
+            f"SELECT {self.key} FROM {self.table} WHERE {self.where} "
+            f"LIMIT :batch_size FOR UPDATE SKIP LOCKED)"
+        )
+
+        done = 0
+        started = time.perf_counter()
+        while True:
+            async with engine.begin() as conn:
+                result = await conn.execute(sql, {"batch_size": self.batch_size})
+            if result.rowcount == 0:
+                break
+
+            done += result.rowcount
+            elapsed = time.perf_counter() - started
+            print(f"   ⏳ {self.table}: 已回填 {done} / ~{max(total, done)} 行 ({done / elapsed:.0f} 行/秒)")
+            await asyncio.sleep(self.pause)
+
+    async def estimate(self, conn: AsyncConnection) -> float:
+        rows = await estimate_rows(conn, self.table, self.where)
+        batches = rows // self.batch_size + 1
+        return rows / BACKFILL_ROWS_PER_SECOND + batches * self.pause
+
+
+@dataclass
+class CopyRows(Operation):
+    """
+    依主鍵範圍分批複製資料到另一張欄位相同的表
+
+    每批在獨立交易中複製一段 key 範圍 (ON CONFLICT DO NOTHING)，中斷後從目標表最大 key 續傳；
+    只複製開始時已存在的範圍，之後新增的資料需由後續步驟補上。來源或目標表不存在時略過
+    """
+    source: str
+    target: str
+    batch_size: int = 5000
+    key: str = "id"
+    pause: float = 0.05
+    description: str = ""
+
+    def __post_init__(self):
+        if not self.description:
+            self.description = f"分批複製 {self.source} → {self.target}"
+
+    async def apply(self, engine: AsyncEngine) -> None:
+        async with engine.connect() as conn:
+            result = await conn.execute(
+                text("SELECT to_regclass(:source) IS NOT NULL AND to_regclass(:target) IS NOT NULL"),
+                {"source": self.source, "target": self.target}
+            )
+            if not result.scalar():
+                return
+            result = await conn.execute(text(f"SELECT min({self.key}), max({self.key}) FROM {self.source}"))
+            low, high = result.one()
+            if high is None:
+                return
+            result = await conn.execute(text(f"SELECT max({self.key}) FROM {self.target}"))
+            copied = result.scalar()
+            total = await estimate_rows(conn, self.source)
+
+        sql = text(
+            f"INSERT INTO {self.target} SELECT * FROM {self.source} "
+            f"WHERE {self.key} > :lower AND {self.key} <= :upper ON CONFLICT DO NOTHING"
+        )
+
+        lower = low - 1 if copied is None else max(copied, low - 1)
+        done = 0
+        started = time.perf_counter()
+        while lower < high:
+            upper = lower + self.batch_size
+            async with engine.begin() as conn:
+                result = await conn.execute(sql, {"lower": lower, "upper": upper})
+            lower = upper
+
+            done += result.rowcount
+            elapsed = time.perf_counter() - started
+            print(f"   ⏳ {self.target}: 已複製 {done} / ~{max(total, done)} 行 ({done / elapsed:.0f} 行/秒)")
+            await asyncio.sleep(self.pause)
+
+    async def estimate(self, conn: AsyncConnection) -> float:
+        rows = await estimate_rows(conn, self.source)
+        batches = rows // self.batch_size + 1
+        return rows / BACKFILL_ROWS_PER_SECOND + batches * self.pause
+
+
+@dataclass
+class Migration:
+    """一個版本的遷移，由多個依序執行的操作組成；每個操作都必須可重複執行"""
+    version: str
+    description: str
+    operations: Sequence[Operation]
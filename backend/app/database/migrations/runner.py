@@ -0,0 +1,132 @@
+"""
+遷移執行器
+以 schema_migrations 表記錄已套用版本，依版本號順序套用待執行的遷移
+"""
+import time
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.database.migrations.operations import Migration
+
+
+VERSION_TABLE = "schema_migrations"
+
+# pg_advisory_lock 的鍵，避免多個副本同時執行遷移
+ADVISORY_LOCK_KEY = 20240601
+
+
+class MigrationRunner:
+    """資料庫遷移執行器"""
+
+    def __init__(self, engine: AsyncEngine, migrations: Sequence[Migration]):
+        self.engine = engine
+        self.migrations = sorted(migrations, key=lambda m: m.version)
+
+    async def ensure_version_table(self) -> None:
+        """建立版本記錄表"""
+        async with self.engine.begin() as conn:
+            await conn.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (
+                    version VARCHAR(50) PRIMARY KEY,
+                    description VARCHAR(255) NOT NULL,
+                    applied_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                    duration_ms INTEGER NOT NULL
+                )
+            """))
+
+    async def applied_versions(self) -> Dict[str, dict]:
+        """獲取已套用的版本"""
+        async with self.engine.connect() as conn:
+            exists = await conn.execute(text(f"SELECT to_regclass('{VERSION_TABLE}')"))
+            if exists.scalar() is None:
+                return {}
+
+            result = await conn.execute(
+                text(f"SELECT version, description, applied_at, duration_ms FROM {VERSION_TABLE}")
+            )
+            return {row.version: dict(row._mapping) for row in result}
+
+    async def pending(self, target: Optional[str] = None) -> List[Migration]:
+        """獲取待執行的遷移 (到 target 版本為止)"""
+        applied = await self.applied_versions()
+        return [
+            m for m in self.migrations
+            if m.version not in applied and (target is None or m.version <= target)
+        ]
+
+    async def status(self) -> None:
+        """印出所有遷移的套用狀態"""
+        applied = await self.applied_versions()
+        print(f"📋 遷移狀態 ({len(applied)}/{len(self.migrations)} 已套用):")
+        for m in self.migrations:
+            record = applied.get(m.version)
+            if record:
+                print(f"   ✅ {m.version} {m.description} ({record['applied_at']:%Y-%m-%d %H:%M}, {record['duration_ms']}ms)")
+            else:
+                print(f"   ⬜ {m.version} {m.description}")
+
+    async def dry_run(self, target: Optional[str] = None) -> float:
+        """
+        乾跑：列出待執行的操作與預估耗時，不修改資料庫
+
+        Returns:
+            預估總秒數
+        """
+        migrations = await self.pending(target)
+        if not migrations:
+            print("✅ 沒有待執行的遷移")
+            return 0.0
+
+        total = 0.0
+        async with self.engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            for m in migrations:
+                print(f"📦 {m.version} {m.description}")
+                for op in m.operations:
+                    seconds = await op.estimate(conn)
+                    total += seconds
+                    print(f"   - {op.description or type(op).__name__} (預估 {seconds:.2f}s)")
+
+        print(f"⏱️  預估總耗時: {total:.2f}s")
+        return total
+
+    async def upgrade(self, target: Optional[str] = None) -> List[str]:
+        """
+        套用待執行的遷移
+
+        Returns:
+            本次套用的版本列表
+        """
+        await self.ensure_version_table()
+
+        applied_now = []
+        async with self.engine.connect() as lock_conn:
+            lock_conn = await lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+            await lock_conn.execute(text(f"SELECT pg_advisory_lock({ADVISORY_LOCK_KEY})"))
+            try:
+                # 取得鎖之後再讀一次，其他副本可能已經套用過
+                for m in await self.pending(target):
+                    print(f"📦 套用 {m.version} {m.description}")
+                    started = time.perf_counter()
+
+                    for op in m.operations:
+                        print(f"   - {op.description or type(op).__name__}")
+                        await op.apply(self.engine)
+
+                    duration_ms = int((time.perf_counter() - started) * 1000)
+                    async with self.engine.begin() as conn:
+                        await conn.execute(
+                            text(
+                                f"INSERT INTO {VERSION_TABLE} (version, description, duration_ms) "
+                                f"VALUES (:version, :description, :duration_ms)"
+                            ),
+                            {"version": m.version, "description": m.description, "duration_ms": duration_ms}
+                        )
+                    applied_now.append(m.version)
+                    print(f"   ✅ 完成 ({duration_ms}ms)")
+            finally:
+                await lock_conn.execute(text(f"SELECT pg_advisory_unlock({ADVISORY_LOCK_KEY})"))
+
+        return applied_now
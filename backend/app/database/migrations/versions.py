@@ -0,0 +1,306 @@
+"""
+遷移版本清單
+新增遷移時在 MIGRATIONS 末尾追加，版本號不可重複使用；每個操作都必須可重複執行
+"""
+from app.database.migrations.operations import Migration, Execute, CreateIndex, CreatePartitionedIndex, Backfill, CopyRows
+
+
+MIGRATIONS = [
+    Migration(
+        version="0001",
+        description="活動位置欄位",
+        operations=[
+            Execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS latitude DOUBLE PRECISION"),
+            Execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS longitude DOUBLE PRECISION"),
+            Execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS radius INTEGER DEFAULT 100"),
+        ],
+    ),
+    Migration(
+        version="0002",
+        description="活動簽退欄位",
+        operations=[
+            Execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS checkout_mode VARCHAR(50)"),
+            Execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS checkout_duration INTEGER"),
+        ],
+    ),
+    Migration(
+        version="0003",
+        description="系列活動、註冊範本與動態欄位",
+        operations=[
+            Execute("""
+                CREATE TABLE IF NOT EXISTS registration_templates (
+                    id VARCHAR(36) PRIMARY KEY,
+                    name VARCHAR(255) NOT NULL,
+                    fields_schema JSON NOT NULL,
+                    is_public BOOLEAN DEFAULT FALSE,
+                    created_by_admin_id INTEGER REFERENCES admins(id),
+                    created_at TIMESTAMPTZ DEFAULT now(),
+                    updated_at TIMESTAMPTZ
+                )
+            """),
+            Execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS visibility VARCHAR(20) DEFAULT 'public'"),
+            Execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS series_id VARCHAR(36)"),
+            Execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS template_id VARCHAR(36)"),
+            Execute("ALTER TABLE checkins ADD COLUMN IF NOT EXISTS dynamic_data JSONB"),
+        ],
+    ),
+    Migration(
+        version="0004",
+        description="管理員啟用狀態",
+        operations=[
+            Execute("ALTER TABLE admins ADD COLUMN IF NOT EXISTS is_active BOOLEAN DEFAULT TRUE"),
+        ],
+    ),
+    Migration(
+        version="0005",
+        description="範本類型與調查觸發時機",
+        operations=[
+            Execute("ALTER TABLE registration_templates ADD COLUMN IF NOT EXISTS type VARCHAR(50) DEFAULT 'registration'"),
+            Execute("ALTER TABLE registration_templates ADD COLUMN IF NOT EXISTS survey_trigger VARCHAR(50)"),
+        ],
+    ),
+    Migration(
+        version="0006",
+        description="使用者擴充資料與活動多重範本欄位",
+        operations=[
+            Execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS profile_data JSONB DEFAULT '{}'::jsonb"),
+            Execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS survey_start_template_id VARCHAR(36) REFERENCES registration_templates(id)"),
+            Execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS survey_end_template_id VARCHAR(36) REFERENCES registration_templates(id)"),
+            Execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS profile_extension_template_id VARCHAR(36) REFERENCES registration_templates(id)"),
+        ],
+    ),
+    Migration(
+        version="0007",
+        description="活動與範本多對多關聯表",
+        operations=[
+            Execute("""
+                CREATE TABLE IF NOT EXISTS event_template_association (
+                    event_id VARCHAR(36) REFERENCES events(id) ON DELETE CASCADE,
+                    template_id VARCHAR(36) REFERENCES registration_templates(id) ON DELETE CASCADE,
+                    PRIMARY KEY (event_id, template_id)
+                )
+            """),
+            Execute("""
+                INSERT INTO event_template_association (event_id, template_id)
+                SELECT id, template_id FROM events WHERE template_id IS NOT NULL
+                UNION
+                SELECT id, survey_start_template_id FROM events WHERE survey_start_template_id IS NOT NULL
+                UNION
+                SELECT id, survey_end_template_id FROM events WHERE survey_end_template_id IS NOT NULL
+                UNION
+                SELECT id, profile_extension_template_id FROM events WHERE profile_extension_template_id IS NOT NULL
+                ON CONFLICT DO NOTHING
+            """),
+        ],
+    ),
+    Migration(
+        version="0008",
+        description="簽到查詢索引",
+        operations=[
+            CreateIndex("ix_checkins_event_id_user_id", "checkins", ["event_id", "user_id"]),
+            CreateIndex("ix_checkins_event_id_checkin_time", "checkins", ["event_id", "checkin_time"]),
+            CreateIndex("ix_checkins_user_id", "checkins", ["user_id"]),
+            CreateIndex("ix_events_created_by_start_time", "events", ["created_by", "start_time"]),
+        ],
+    ),
+    Migration(
+        version="0009",
+        description="活動名單與簽到人數計數器",
+        operations=[
+            Execute("""
+                CREATE TABLE IF NOT EXISTS event_roster (
+                    event_id VARCHAR(36) REFERENCES events(id) ON DELETE CASCADE,
+                    user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
+                    created_at TIMESTAMPTZ DEFAULT now(),
+                    PRIMARY KEY (event_id, user_id)
+                )
+            """),
+            Execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS roster_only BOOLEAN DEFAULT FALSE"),
+            Execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS checkin_count INTEGER"),
+            Backfill(
+                table="events",
+                assignments="checkin_count = (SELECT count(*) FROM checkins c WHERE c.event_id = events.id)",
+                where="checkin_count IS NULL",
+                batch_size=1000,
+            ),
+            Execute("ALTER TABLE events ALTER COLUMN checkin_count SET DEFAULT 0"),
+            Execute("ALTER TABLE events ALTER COLUMN checkin_count SET NOT NULL"),
+        ],
+    ),
+    Migration(
+        version="0010",
+        description="外鍵改為 ON DELETE CASCADE、活動軟刪除與簽到封存表",
+        operations=[
+            # 先以 NOT VALID 加上新外鍵（只需短暫鎖），再另外驗證既有資料
+            Execute("""
+                ALTER TABLE checkins
+                    DROP CONSTRAINT IF EXISTS checkins_event_id_fkey,
+                    ADD CONSTRAINT checkins_event_id_fkey FOREIGN KEY (event_id)
+                        REFERENCES events(id) ON DELETE CASCADE NOT VALID
+            """),
+            Execute("ALTER TABLE checkins VALIDATE CONSTRAINT checkins_event_id_fkey"),
+            Execute("""
+                ALTER TABLE checkins
+                    DROP CONSTRAINT IF EXISTS checkins_user_id_fkey,
+                    ADD CONSTRAINT checkins_user_id_fkey FOREIGN KEY (user_id)
+                        REFERENCES users(id) ON DELETE CASCADE NOT VALID
+            """),
+            Execute("ALTER TABLE checkins VALIDATE CONSTRAINT checkins_user_id_fkey"),
+            Execute("""
+                ALTER TABLE events
+                    DROP CONSTRAINT IF EXISTS events_created_by_fkey,
+                    ADD CONSTRAINT events_created_by_fkey FOREIGN KEY (created_by)
+                        REFERENCES admins(id) ON DELETE CASCADE NOT VALID
+            """),
+            Execute("ALTER TABLE events VALIDATE CONSTRAINT events_created_by_fkey"),
+            Execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS deleted_at TIMESTAMPTZ"),
+            Execute("""
+                CREATE TABLE IF NOT EXISTS checkins_archive (
+                    id INTEGER PRIMARY KEY,
+                    user_id INTEGER NOT NULL,
+                    event_id VARCHAR(36) NOT NULL,
+                    checkin_time TIMESTAMPTZ NOT NULL,
+                    checkout_time TIMESTAMPTZ,
+                    geolocation VARCHAR(255),
+                    is_valid BOOLEAN DEFAULT TRUE,
+                    status VARCHAR(50),
+                    dynamic_data JSON,
+                    created_at TIMESTAMPTZ,
+                    updated_at TIMESTAMPTZ,
+                    archived_at TIMESTAMPTZ DEFAULT now()
+                )
+            """),
+            CreateIndex("ix_checkins_archive_event_id", "checkins_archive", ["event_id"]),
+        ],
+    ),
+    Migration(
+        version="0011",
+        description="簽到記錄依 checkin_time 按月分區、活動封存標記",
+        operations=[
+            Execute("ALTER TABLE events ADD COLUMN IF NOT EXISTS archived_at TIMESTAMPTZ"),
+            # 新的分區表，欄位與預設值（含 id 序列）沿用原表；主鍵必須包含分區欄位
+            Execute("""
+                CREATE TABLE IF NOT EXISTS checkins_partitioned (
+                    LIKE checkins INCLUDING DEFAULTS,
+                    CONSTRAINT checkins_partitioned_pkey PRIMARY KEY (id, checkin_time),
+                    CONSTRAINT checkins_event_id_fkey FOREIGN KEY (event_id)
+                        REFERENCES events(id) ON DELETE CASCADE,
+                    CONSTRAINT checkins_user_id_fkey FOREIGN KEY (user_id)
+                        REFERENCES users(id) ON DELETE CASCADE
+                ) PARTITION BY RANGE (checkin_time)
+            """),
+            Execute("CREATE INDEX IF NOT EXISTS ix_checkins_event_id_user_id_new ON checkins_partitioned (event_id, user_id)"),
+            Execute("CREATE INDEX IF NOT EXISTS ix_checkins_event_id_checkin_time_new ON checkins_partitioned (event_id, checkin_time)"),
+            Execute("CREATE INDEX IF NOT EXISTS ix_checkins_user_id_new ON checkins_partitioned (user_id)"),
+            # 涵蓋既有資料到未來三個月的月分區，其餘落在 default 分區
+            Execute("""
+                DO $$
+                DECLARE
+                    month DATE;
+                    last_month DATE := date_trunc('month', now() + interval '3 months')::date;
+                BEGIN
+                    IF to_regclass('checkins_partitioned') IS NULL THEN
+                        RETURN;
+                    END IF;
+                    SELECT COALESCE(date_trunc('month', min(checkin_time))::date, date_trunc('month', now())::date)
+                        INTO month FROM checkins;
+                    WHILE month <= last_month LOOP
+                        EXECUTE format(
+                            'CREATE TABLE IF NOT EXISTS %I PARTITION OF checkins_partitioned FOR VALUES FROM (%L) TO (%L)',
+                            'checkins_p' || to_char(month, 'YYYYMM'), month, (month + interval '1 month')::date
+                        );
+                        month := (month + interval '1 month')::date;
+                    END LOOP;
+                    CREATE TABLE IF NOT EXISTS checkins_default PARTITION OF checkins_partitioned DEFAULT;
+                END $$
+            """),
+            # 依 id 範圍分批複製既有資料（每批獨立交易，只讀原表，不阻擋線上寫入）
+            CopyRows(source="checkins", target="checkins_partitioned", batch_size=5000),
+            # 短暫鎖住原表寫入，補上複製期間新增、更新（簽退）與刪除的記錄後交換表名
+            Execute("""
+                DO $$
+                DECLARE
+                    r RECORD;
+                BEGIN
+                    IF to_regclass('checkins_partitioned') IS NULL THEN
+                        RETURN;
+                    END IF;
+                    LOCK TABLE checkins IN EXCLUSIVE MODE;
+
+                    -- 複製期間新增的記錄（不依賴 id 或時間戳順序，未提交的交易晚提交也不會漏掉）
+                    INSERT INTO checkins_partitioned
+                    SELECT * FROM checkins c
+                    WHERE NOT EXISTS (SELECT 1 FROM checkins_partitioned p WHERE p.id = c.id);
+
+                    -- 複製後才更新（簽退、狀態、表單回答）的記錄；json 欄位轉 jsonb 才能比較
+                    UPDATE checkins_partitioned p SET
+                        user_id = c.user_id,
+                        event_id = c.event_id,
+                        checkin_time = c.checkin_time,
+                        checkout_time = c.checkout_time,
+                        geolocation = c.geolocation,
+                        is_valid = c.is_valid,
+                        status = c.status,
+                        dynamic_data = c.dynamic_data,
+                        created_at = c.created_at,
+                        updated_at = c.updated_at
+                    FROM checkins c
+                    WHERE p.id = c.id
+                      AND (p.updated_at IS DISTINCT FROM c.updated_at
+                           OR p.user_id IS DISTINCT FROM c.user_id
+                           OR p.event_id IS DISTINCT FROM c.event_id
+                           OR p.checkin_time IS DISTINCT FROM c.checkin_time
+                           OR p.checkout_time IS DISTINCT FROM c.checkout_time
+                           OR p.geolocation IS DISTINCT FROM c.geolocation
+                           OR p.is_valid IS DISTINCT FROM c.is_valid
+                           OR p.status IS DISTINCT FROM c.status
+                           OR p.dynamic_data::jsonb IS DISTINCT FROM c.dynamic_data::jsonb);
+
+                    -- 複製後被刪除的記錄
+                    DELETE FROM checkins_partitioned p
+                    WHERE NOT EXISTS (SELECT 1 FROM checkins c WHERE c.id = p.id);
+
+                    ALTER TABLE checkins RENAME TO checkins_legacy;
+                    FOR r IN SELECT indexname FROM pg_indexes WHERE tablename = 'checkins_legacy' LOOP
+                        EXECUTE format('ALTER INDEX %I RENAME TO %I', r.indexname, r.indexname || '_legacy');
+                    END LOOP;
+
+                    ALTER TABLE checkins_partitioned RENAME TO checkins;
+                    ALTER INDEX checkins_partitioned_pkey RENAME TO checkins_pkey;
+                    FOR r IN SELECT indexname FROM pg_indexes WHERE tablename = 'checkins' AND indexname LIKE '%\_new' LOOP
+                        EXECUTE format('ALTER INDEX %I RENAME TO %I', r.indexname, left(r.indexname, -4));
+                    END LOOP;
+
+                    -- 序列改由新表擁有，之後可安全移除 checkins_legacy
+                    ALTER SEQUENCE checkins_id_seq OWNED BY checkins.id;
+                END $$
+            """, lock_timeout="10s"),
+        ],
+    ),
+    Migration(
+        version="0012",
+        description="匯出檔案索引（去重與保留期限）",
+        operations=[
+            Execute("""
+                CREATE TABLE IF NOT EXISTS export_files (
+                    key VARCHAR(255) PRIMARY KEY,
+                    content_hash VARCHAR(64) NOT NULL UNIQUE,
+                    size BIGINT NOT NULL DEFAULT 0,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    created_at TIMESTAMPTZ DEFAULT now(),
+                    last_accessed_at TIMESTAMPTZ DEFAULT now()
+                )
+            """),
+            CreateIndex("ix_export_files_last_accessed_at", "export_files", ["last_accessed_at"]),
+        ],
+    ),
+    Migration(
+        version="0013",
+        description="出席分析增量更新的最後異動時間索引",
+        operations=[
+            # 與 analytics_store 增量查詢的條件 COALESCE(updated_at, created_at) >= :since 一致
+            CreateIndex("ix_users_modified_at", "users", ["(COALESCE(updated_at, created_at))"]),
+            CreatePartitionedIndex("ix_checkins_modified_at", "checkins", ["(COALESCE(updated_at, created_at))"]),
+        ],
+    ),
+]
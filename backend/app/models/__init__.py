@@ -6,5 +6,8 @@ from app.models.user import User
 from app.models.event import Event
 from app.models.checkin import Checkin
 from app.models.registration_template import RegistrationTemplate
+from app.models.event_roster import EventRoster
+from app.models.checkin_archive import CheckinArchive
+from app.models.export_file import ExportFile
 
-__all__ = ["Admin", "User", "Event", "Checkin", "RegistrationTemplate"]
+__all__ = ["Admin", "User", "Event", "Checkin", "RegistrationTemplate", "EventRoster", "CheckinArchive", "ExportFile"]
@@ -21,5 +21,5 @@ class Admin(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # 關聯
-    events = relationship("Event", back_populates="admin", cascade="all, delete-orphan")
+    events = relationship("Event", back_populates="admin", cascade="all, delete-orphan", passive_deletes=True)
     templates = relationship("RegistrationTemplate", back_populates="admin", cascade="all, delete-orphan")
@@ -1,7 +1,7 @@
 """
 Checkin 模型
 """
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, JSON, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -11,11 +11,20 @@ from app.database.connection import Base
 class Checkin(Base):
     """簽到記錄模型"""
     __tablename__ = "checkins"
+    __table_args__ = (
+        Index("ix_checkins_event_id_user_id", "event_id", "user_id"),
+        Index("ix_checkins_event_id_checkin_time", "event_id", "checkin_time"),
+        # 出席分析增量更新依最後異動時間讀取
+        Index("ix_checkins_modified_at", func.coalesce(text("updated_at"), text("created_at"))),
+        # 依簽到時間按月分區，分區由 app.services.checkin_partitions 維護
+        {"postgresql_partition_by": "RANGE (checkin_time)"},
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    event_id = Column(String(36), ForeignKey("events.id"), nullable=False)
-    checkin_time = Column(DateTime(timezone=True), nullable=False)
+    # 分區表的主鍵必須包含分區欄位；id 仍由序列產生且唯一
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    event_id = Column(String(36), ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
+    checkin_time = Column(DateTime(timezone=True), primary_key=True, nullable=False)
     checkout_time = Column(DateTime(timezone=True), nullable=True)
     geolocation = Column(String(255), nullable=True)
     is_valid = Column(Boolean, default=True)
@@ -0,0 +1,32 @@
+"""
+CheckinArchive 模型
+"""
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.database.connection import Base
+
+
+class CheckinArchive(Base):
+    """已封存的簽到記錄（冷資料表，不設外鍵，活動刪除後仍保留）"""
+    __tablename__ = "checkins_archive"
+    __table_args__ = (
+        Index("ix_checkins_archive_event_id", "event_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    event_id = Column(String(36), nullable=False)
+    checkin_time = Column(DateTime(timezone=True), nullable=False)
+    checkout_time = Column(DateTime(timezone=True), nullable=True)
+    geolocation = Column(String(255), nullable=True)
+    is_valid = Column(Boolean, default=True)
+    status = Column(String(50), default="出席")
+    dynamic_data = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # 封存表不設外鍵，以唯讀關聯讀取用戶資料（與 Checkin.user 用法相同）
+    user = relationship("User", primaryjoin="foreign(CheckinArchive.user_id) == User.id", viewonly=True)
@@ -2,7 +2,7 @@
 Event 模型
 """
 import uuid
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Float, Table
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Float, Table, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -20,6 +20,9 @@ event_template_association = Table(
 class Event(Base):
     """活動模型"""
     __tablename__ = "events"
+    __table_args__ = (
+        Index("ix_events_created_by_start_time", "created_by", "start_time"),
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     # ... (原有欄位保持不變以便相容，但我們主要使用 templates 關係)
@@ -32,6 +35,8 @@ class Event(Base):
     longitude = Column(Float, nullable=True)
     radius = Column(Integer, default=100)  # meters
     max_participants = Column(Integer, nullable=True)
+    checkin_count = Column(Integer, nullable=False, default=0, server_default="0")  # 簽到人數計數器，用於名額控制
+    roster_only = Column(Boolean, default=False)  # 只允許名單內的用戶簽到
     event_type = Column(String(50), default="會議")
     location_validation = Column(Boolean, default=False)
     require_checkout = Column(Boolean, default=False)
@@ -40,6 +45,8 @@ class Event(Base):
     qrcode_url = Column(String(255), nullable=True)
     visibility = Column(String(20), default="public")  # 'public' or 'private'
     series_id = Column(String(36), nullable=True, index=True)  # for recurring events
+    deleted_at = Column(DateTime(timezone=True), nullable=True)  # 軟刪除時間，NULL 表示未刪除
+    archived_at = Column(DateTime(timezone=True), nullable=True)  # 簽到記錄已移至封存表的時間
     
     # 舊有的單一關聯欄位 (保留相容性)
     template_id = Column(String(36), ForeignKey("registration_templates.id"), nullable=True)
@@ -47,12 +54,13 @@ class Event(Base):
     survey_end_template_id = Column(String(36), ForeignKey("registration_templates.id"), nullable=True)
     profile_extension_template_id = Column(String(36), ForeignKey("registration_templates.id"), nullable=True)
     
-    created_by = Column(Integer, ForeignKey("admins.id"), nullable=False)
+    created_by = Column(Integer, ForeignKey("admins.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # 關聯
-    checkins = relationship("Checkin", back_populates="event", cascade="all, delete-orphan")
+    # 簽到記錄由資料庫 ON DELETE CASCADE 刪除，ORM 不逐筆載入
+    checkins = relationship("Checkin", back_populates="event", cascade="all, delete-orphan", passive_deletes=True)
     admin = relationship("Admin", back_populates="events")
     
     # 新的多對多關聯
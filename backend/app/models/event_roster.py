@@ -0,0 +1,16 @@
+"""
+EventRoster 模型
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+
+from app.database.connection import Base
+
+
+class EventRoster(Base):
+    """活動預先報名名單（預期出席者）"""
+    __tablename__ = "event_roster"
+
+    event_id = Column(String(36), ForeignKey("events.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
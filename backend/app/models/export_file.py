@@ -0,0 +1,22 @@
+"""
+ExportFile 模型
+"""
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Index
+from sqlalchemy.sql import func
+
+from app.database.connection import Base
+
+
+class ExportFile(Base):
+    """已產生的匯出檔案索引（內容雜湊去重與保留期限管理）"""
+    __tablename__ = "export_files"
+    __table_args__ = (
+        Index("ix_export_files_last_accessed_at", "last_accessed_at"),
+    )
+
+    key = Column(String(255), primary_key=True)  # 儲存 key，例如 exports/checkins_<id>_<hash>.xlsx
+    content_hash = Column(String(64), nullable=False, unique=True)
+    size = Column(BigInteger, nullable=False, default=0)
+    hits = Column(Integer, nullable=False, default=0)  # 重複匯出直接重用的次數
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_accessed_at = Column(DateTime(timezone=True), server_default=func.now())
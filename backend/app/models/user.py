@@ -1,7 +1,7 @@
 """
 User 模型
 """
-from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -11,6 +11,10 @@ from app.database.connection import Base
 class User(Base):
     """用戶模型（LINE 用戶）"""
     __tablename__ = "users"
+    __table_args__ = (
+        # 出席分析增量更新依最後異動時間讀取
+        Index("ix_users_modified_at", func.coalesce(text("updated_at"), text("created_at"))),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     line_user_id = Column(String(255), unique=True, nullable=False, index=True)
@@ -23,4 +27,4 @@ class User(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # 關聯
-    checkins = relationship("Checkin", back_populates="user", cascade="all, delete-orphan")
+    checkins = relationship("Checkin", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
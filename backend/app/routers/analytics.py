@@ -0,0 +1,80 @@
+"""
+出席分析 API
+"""
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_read_db
+from app.models import Admin
+from app.schemas.analytics import AttendanceReport, AttendanceTrend, AttendanceTrendPoint
+from app.core.dependencies import get_current_admin
+from app.services.analytics_store import attendance_store, no_show_counts, GROUP_BY_OPTIONS
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+def _owner_filter(current_admin: Admin) -> Optional[int]:
+    """系統管理員可看全部活動，其他角色只統計自己創建的活動（與活動列表一致）"""
+    return None if current_admin.name == "系統管理員" else current_admin.id
+
+
+@router.get("/attendance", response_model=AttendanceReport)
+async def get_attendance_report(
+    group_by: str = "department",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    series_id: Optional[str] = None,
+    refresh: bool = False,
+    current_admin: Admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    跨活動出席統計
+    - group_by：department / company / event / series
+    - start/end：依活動開始時間篩選
+    - refresh=true：立即增量更新快照
+    """
+    if group_by not in GROUP_BY_OPTIONS:
+        raise HTTPException(status_code=400, detail=f"group_by 必須是 {', '.join(GROUP_BY_OPTIONS)} 之一")
+
+    await attendance_store.ensure_fresh(db, force=refresh)
+    report = attendance_store.attendance(
+        group_by, start=start, end=end, series_id=series_id, owner_id=_owner_filter(current_admin)
+    )
+    return AttendanceReport(**report)
+
+
+@router.get("/trend", response_model=AttendanceTrend)
+async def get_attendance_trend(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    series_id: Optional[str] = None,
+    current_admin: Admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    各活動的簽到人數與名單未出席人數，依活動時間排序
+    """
+    await attendance_store.ensure_fresh(db)
+    codes = attendance_store.events_in_scope(
+        start=start, end=end, series_id=series_id, owner_id=_owner_filter(current_admin)
+    )
+    counts = attendance_store.event_checkin_counts(codes)
+    event_ids = [attendance_store.events.values[code] for code in codes]
+    roster = await no_show_counts(db, event_ids)
+
+    points = []
+    for code, event_id, checkins in zip(codes, event_ids, counts):
+        roster_size, no_shows = roster.get(event_id, (0, 0))
+        points.append(AttendanceTrendPoint(
+            event_id=event_id,
+            name=attendance_store.event_names[code],
+            start_time=datetime.fromtimestamp(int(attendance_store.event_start[code]), tz=timezone.utc),
+            checkins=int(checkins),
+            roster=roster_size,
+            no_shows=no_shows
+        ))
+    return AttendanceTrend(snapshot_time=attendance_store.snapshot_time, points=points)
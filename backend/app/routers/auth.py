@@ -2,12 +2,12 @@
 認證相關 API 路由
 包含：登入、登出、檢查認證狀態、LINE OAuth 回調
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import RedirectResponse
+import html
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import RedirectResponse, HTMLResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-import httpx
 
 from app.database import get_db
 from app.models import Admin, User
@@ -16,6 +16,8 @@ from app.schemas.admin import AdminResponse, AdminListResponse, AdminCreate
 from app.core.security import verify_password, create_access_token, hash_password
 from app.core.dependencies import get_current_admin, require_system_admin
 from app.core.config import settings
+from app.services.line_service import line_client
+from app.services.login_admission import login_admission, LoginBusyError
 
 router = APIRouter(prefix="/api/auth", tags=["認證"])
 
@@ -285,8 +287,32 @@ async def toggle_admin_status(
     return {"success": True, "message": "狀態已更新"}
 
 
+def line_waiting_room(request: Request, retry_after: int) -> HTMLResponse:
+    """登入人數過多時的等候頁，倒數後以相同的 code 重新進入回調"""
+    retry_url = html.escape(str(request.url), quote=True)
+    content = f"""<!DOCTYPE html>
+<html lang="zh-Hant">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<meta http-equiv="refresh" content="{retry_after};url={retry_url}">
+<title>登入排隊中</title>
+</head>
+<body style="font-family: sans-serif; text-align: center; padding-top: 20vh;">
+<h2>目前登入人數較多</h2>
+<p>將在 {retry_after} 秒後自動重試，請勿關閉此頁面。</p>
+</body>
+</html>"""
+    return HTMLResponse(
+        content=content,
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(retry_after), "Cache-Control": "no-store"}
+    )
+
+
 @router.get("/line/callback", summary="LINE OAuth 回調")
 async def line_oauth_callback(
+    request: Request,
     code: str = Query(..., description="Authorization code"),
     state: str = Query(None, description="Event ID"),
     db: AsyncSession = Depends(get_db)
@@ -295,9 +321,9 @@ async def line_oauth_callback(
     LINE OAuth 2.0 回調處理
 
     流程:
-    1. 用 code 換取 access_token
-    2. 解析 id_token 獲取 LINE user_id
-    3. 查詢用戶是否已註冊
+    1. 取得登入名額後用 code 換取 access_token（人數過多時回傳等候頁）
+    2. 驗證 id_token 簽章並獲取 LINE user_id
+    3. 以 LINE user_id（唯一索引）查詢用戶是否已註冊
     4. 已註冊: 生成 JWT，重定向到活動頁面
     5. 未註冊: 重定向到註冊頁面
 
@@ -306,33 +332,12 @@ async def line_oauth_callback(
     - state: 自定義狀態（通常是 event_id）
     """
     try:
-        # 1. 用 code 換取 token
-        async with httpx.AsyncClient() as client:
-            token_response = await client.post(
-                "https://api.line.me/oauth2/v2.1/token",
-                data={
-                    "grant_type": "authorization_code",
-                    "code": code,
-                    "redirect_uri": settings.LINE_CALLBACK_URL,
-                    "client_id": settings.LINE_CHANNEL_ID,
-                    "client_secret": settings.LINE_CHANNEL_SECRET
-                },
-                headers={"Content-Type": "application/x-www-form-urlencoded"}
-            )
+        # 1. 用 code 換取 token（限制同時對 LINE 的請求數）
+        async with login_admission.admit():
+            token_data = await line_client.exchange_code(code)
 
-        if token_response.status_code != 200:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"LINE 認證失敗: {token_response.text}"
-            )
-
-        token_data = token_response.json()
-
-        # 2. 解析 id_token 獲取 LINE user_id
-        # 注意：這裡簡化處理，生產環境應該驗證 JWT 簽名
-        import jwt as pyjwt
-        id_token = token_data.get("id_token")
-        payload = pyjwt.decode(id_token, options={"verify_signature": False})
+            # 2. 驗證 id_token 簽章並獲取 LINE user_id
+            payload = await line_client.verify_id_token(token_data.get("id_token", ""))
         line_user_id = payload.get("sub")
 
         if not line_user_id:
@@ -341,30 +346,33 @@ async def line_oauth_callback(
                 detail="無法獲取 LINE user ID"
             )
 
-        # 3. 查詢用戶
+        # 3. 查詢用戶是否已註冊（只取 id）
         result = await db.execute(
-            select(User).where(User.line_user_id == line_user_id)
+            select(User.id).where(User.line_user_id == line_user_id)
         )
-        user = result.scalar_one_or_none()
+        user_id = result.scalar_one_or_none()
 
         # 4. 根據用戶狀態重定向
         frontend_url = settings.FRONTEND_URL
 
-        if user:
+        if user_id:
             # 已註冊：生成 token 並重定向到活動頁面
             access_token = create_access_token(
                 data={
-                    "sub": str(user.id),
+                    "sub": str(user_id),
                     "line_id": line_user_id
                 }
             )
-            redirect_url = f"{frontend_url}/event/{state}?token={access_token}&sub={user.id}"
-        else:
-            # 未註冊：重定向到註冊頁面
-            redirect_url = f"{frontend_url}/register?lineId={line_user_id}&eventId={state}"
+            redirect_url = f"{frontend_url}/event/{state}?token={access_token}&sub={user_id}"
+            return RedirectResponse(url=redirect_url)
 
+        # 未註冊：重定向到註冊頁面
+        redirect_url = f"{frontend_url}/register?lineId={line_user_id}&eventId={state}"
         return RedirectResponse(url=redirect_url)
 
+    except LoginBusyError as e:
+        return line_waiting_room(request, e.retry_after)
+
     except Exception as e:
         # 錯誤處理：重定向到錯誤頁面
         error_url = f"{settings.FRONTEND_URL}/login?error={str(e)}"
@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 
-from app.database import get_db
+from app.database import get_db, mark_recent_write
 from app.models import Checkin, Event, User
 from app.schemas.checkin import (
     CheckinCreate, 
@@ -16,6 +16,8 @@ from app.schemas.checkin import (
     UserInfo
 )
 from app.core.dependencies import get_current_user
+from app.services.roster_service import roster_cache
+from app.services.capacity_service import capacity_tracker, reserve_seat
 
 router = APIRouter(prefix="/checkins", tags=["checkins"])
 
@@ -50,13 +52,16 @@ async def create_checkin(
     用戶簽到/簽退
     """
     # 驗證活動是否存在
-    event_query = select(Event).where(Event.id == checkin_in.event_id)
+    event_query = select(Event).where(Event.id == checkin_in.event_id, Event.deleted_at.is_(None))
     event_result = await db.execute(event_query)
     event = event_result.scalar_one_or_none()
     
     if not event:
         raise HTTPException(status_code=404, detail="活動不存在")
 
+    if event.archived_at:
+        raise HTTPException(status_code=400, detail="活動已封存，無法簽到")
+
     # 位置驗證邏輯
     if event.location_validation:
         if not checkin_in.geolocation:
@@ -147,13 +152,20 @@ async def create_checkin(
             db.add(current_user)
 
         await db.commit()
+        mark_recent_write(checkin_in.event_id)
         await db.refresh(existing_checkin)
         return CheckinResponse.model_validate(existing_checkin)
     
     else:
         # 創建新簽到
-        # ... 驗證邏輯 ...
-            
+        # 名單檢查（記憶體集合，O(1)）
+        if event.roster_only and not await roster_cache.contains(db, event.id, current_user.id):
+            raise HTTPException(status_code=403, detail="您不在此活動的報名名單中")
+
+        # 已知額滿時直接拒絕，不佔用活動行鎖
+        if capacity_tracker.is_full(event.id):
+            raise HTTPException(status_code=400, detail="活動人數已滿")
+
         # 如果有 profile_data，更新使用者資料
         if checkin_in.profile_data:
             if not current_user.profile_data:
@@ -172,7 +184,15 @@ async def create_checkin(
         )
         
         db.add(new_checkin)
+        await db.flush()
+
+        # 原子佔用名額，放在提交前最後一步，縮短活動行鎖的持有時間
+        if not await reserve_seat(db, event.id):
+            await db.rollback()
+            raise HTTPException(status_code=400, detail="活動人數已滿")
+
         await db.commit()
+        mark_recent_write(checkin_in.event_id)
         await db.refresh(new_checkin)
         
         return CheckinResponse.model_validate(new_checkin)
@@ -188,7 +208,7 @@ async def validate_checkin(
     驗證簽到資格
     """
     # 驗證活動
-    event_query = select(Event).where(Event.id == checkin_in.event_id)
+    event_query = select(Event).where(Event.id == checkin_in.event_id, Event.deleted_at.is_(None))
     event_result = await db.execute(event_query)
     event = event_result.scalar_one_or_none()
     
@@ -8,52 +8,79 @@ from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 
 from app.database import get_db
-from app.models import Event, Admin, Checkin, User, RegistrationTemplate
+from app.models import Event, Admin, User, RegistrationTemplate
+from app.models.event import event_template_association
 import uuid
-import traceback
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timedelta, timezone, time as dt_time
 try:
     from zoneinfo import ZoneInfo
 except ImportError:
     from backports.zoneinfo import ZoneInfo
 
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, insert, update, delete
 from sqlalchemy.orm import selectinload
 
-from app.database import get_db
-from app.models import Event, Admin, Checkin, User
+from app.database import get_db, get_read_db, mark_recent_write
+from app.models import Event, Admin, User
 from app.schemas.event import (
     EventCreate,
     EventUpdate,
     EventResponse,
     EventWithStats,
     EventStats,
+    ArrivalBucket,
+    ArrivalHistogram,
     EventBase,
-    EventSeriesCreate
+    EventSeriesCreate,
+    EventSeriesUpdate,
+    EventSeriesBulkResponse,
+    SeriesSession,
+    SeriesAttendee,
+    SeriesAttendanceReport,
+    MAX_SERIES_OCCURRENCES
 )
 from app.schemas.checkin import CheckinListResponse, CheckinWithUser, UserInfo
 from app.core.dependencies import get_current_admin
+from app.core.http_cache import (
+    event_response_cache, cached_response, make_etag, invalidate_event_responses, EVENT_CACHE_CONTROL
+)
+from app.core.logging_config import get_logger
 from app.services.qrcode_service import generate_qr_code
-from app.services.export_service import export_data
+from app.services.export_lifecycle import get_or_create_export
+from app.services.export_columns import plan_columns, base_values
+from app.services.capacity_service import capacity_tracker
+from app.services.checkin_partitions import checkin_model_for
+from app.services.arrival_histogram import arrival_histogram, arrival_cache
+from app.services.series_report import build_series_matrix, iter_csv, iter_xlsx, export_filename
+from app.services.event_deletion import delete_events, soft_delete_events, restore_events, forget_events
+from app.services.recurrence import RecurrenceRule, occurrences
 
 router = APIRouter(prefix="/events", tags=["events"])
 
+logger = get_logger("events")
+
+# 系列活動的本地時區
+SERIES_TIMEZONE = "Asia/Taipei"
+
 
 @router.get("", response_model=List[EventWithStats])
 async def get_events(
     skip: int = 0,
     limit: int = 100,
     current_admin: Admin = Depends(get_current_admin),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     獲取所有活動列表
     - 系統管理員：查看所有活動
     - 其他角色 (管理員/會員)：僅查看自己創建的活動
     """
-    query = select(Event).options(selectinload(Event.checkins), selectinload(Event.templates))
+    # 簽到人數直接讀取計數器，不載入所有簽到記錄
+    query = select(Event).options(selectinload(Event.templates)).where(Event.deleted_at.is_(None))
     
     # 權限過濾
     if current_admin.name != "系統管理員":
@@ -65,7 +92,7 @@ async def get_events(
 
     events_with_stats = []
     for event in events:
-        checkin_count = len(event.checkins)
+        checkin_count = event.checkin_count or 0
         event_dict = {
             "id": str(event.id),
             "name": event.name,
@@ -78,6 +105,7 @@ async def get_events(
             "radius": event.radius,
             "max_participants": event.max_participants,
             "event_type": event.event_type,
+            "roster_only": event.roster_only or False,
             "location_validation": event.location_validation,
             "require_checkout": event.require_checkout,
             "checkout_mode": event.checkout_mode,
@@ -97,20 +125,38 @@ async def get_events(
     return events_with_stats
 
 
+def _event_fingerprint(event: Event) -> tuple:
+    """ETag 指紋：活動與其範本的 id / updated_at（範本關聯變更不會更新活動的 updated_at）"""
+    return (
+        event.id,
+        event.updated_at or event.created_at,
+        tuple(sorted((t.id, t.updated_at or t.created_at) for t in event.templates)),
+    )
+
+
 @router.get("/public", response_model=List[EventResponse])
 async def get_public_events(
+    request: Request,
     skip: int = 0,
     limit: int = 20,
     db: AsyncSession = Depends(get_db)
 ):
     """
     獲取公開活動列表
+    - 支援 If-None-Match；快取有效期間內不查詢資料庫
     """
-    query = select(Event).options(selectinload(Event.templates)).where(Event.visibility == "public").offset(skip).limit(limit).order_by(Event.start_time.desc())
-    result = await db.execute(query)
-    events = result.scalars().all()
+    key = ("public", skip, limit)
+    entry = event_response_cache.get(key)
+    if entry is None:
+        query = select(Event).options(selectinload(Event.templates)).where(Event.visibility == "public", Event.deleted_at.is_(None)).offset(skip).limit(limit).order_by(Event.start_time.desc())
+        result = await db.execute(query)
+        events = result.scalars().all()
+
+        body = b"[" + b",".join(EventResponse.model_validate(event).model_dump_json().encode() for event in events) + b"]"
+        etag = make_etag(key, *(_event_fingerprint(event) for event in events))
+        entry = event_response_cache.put(key, etag, body)
 
-    return [EventResponse.model_validate(event) for event in events]
+    return cached_response(request, entry, EVENT_CACHE_CONTROL)
 
 
 @router.post("", response_model=EventResponse)
@@ -143,10 +189,12 @@ async def create_event(
     checkin_url = f"{settings.FRONTEND_URL}/event/{event.id}"
     
     qr_filename = f"event_{event.id}.png"
-    qr_path = generate_qr_code(checkin_url, qr_filename)
+    qr_path = await run_in_threadpool(generate_qr_code, checkin_url, qr_filename)
     event.qrcode_url = qr_path
     await db.commit()
     
+    invalidate_event_responses()
+
     # 最終重新加載，包含所有關聯
     query = select(Event).options(selectinload(Event.templates)).where(Event.id == event.id)
     result = await db.execute(query)
@@ -158,111 +206,341 @@ async def create_event(
 @router.post("/series", response_model=List[EventResponse])
 async def create_event_series(
     series_in: EventSeriesCreate,
+    background_tasks: BackgroundTasks,
     current_admin: Admin = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """
     創建系列活動 (週期性活動)
+    - 支援每日/每週、間隔、指定星期、結束日期或次數、排除日期
+    - 所有活動與範本關聯各以一個批次 INSERT 寫入
+    - QR Code 在回應後於背景產生
     """
     series_id = str(uuid.uuid4())
-    events = []
-    
-    # 這裡的 start_date 和 end_date 應該是日期範圍
-    current_date = series_in.start_date.date()
-    end_date = series_in.end_date.date()
     
     # 解析時間 (格式為 HH:mm)
     try:
         start_h, start_m = map(int, series_in.start_time_local.split(':'))
         end_h, end_m = map(int, series_in.end_time_local.split(':'))
+        start_clock = dt_time(hour=start_h, minute=start_m)
+        end_clock = dt_time(hour=end_h, minute=end_m)
     except ValueError:
         raise HTTPException(status_code=400, detail="時間格式不正確，應為 HH:mm")
+
+    try:
+        rule = RecurrenceRule(
+            frequency=series_in.frequency,
+            interval=series_in.interval,
+            by_weekday=series_in.days_of_week,
+            until=series_in.end_date.date() if series_in.end_date else None,
+            count=series_in.count,
+            exclude_dates=set(series_in.exclude_dates),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # 最多產生上限 + 1 場，超過上限即可判斷，不必展開整個範圍
+    dates = occurrences(series_in.start_date.date(), rule, limit=MAX_SERIES_OCCURRENCES)
+    if not dates:
+        raise HTTPException(status_code=400, detail="在指定的範圍內沒有符合條件的日期")
+    if len(dates) > MAX_SERIES_OCCURRENCES:
+        raise HTTPException(status_code=400, detail=f"系列活動最多 {MAX_SERIES_OCCURRENCES} 場")
     
     try:
+        from app.core.config import settings
+
         # 設定本地時區為台北時間
-        local_tz = ZoneInfo("Asia/Taipei")
+        local_tz = ZoneInfo(SERIES_TIMEZONE)
         
-        # 預先獲取範本
-        selected_templates = []
+        # 預先獲取範本 ID（只保留存在的範本）
+        template_ids = []
         if series_in.event_base.template_ids:
-            template_query = select(RegistrationTemplate).where(RegistrationTemplate.id.in_(series_in.event_base.template_ids))
+            template_query = select(RegistrationTemplate.id).where(RegistrationTemplate.id.in_(series_in.event_base.template_ids))
             template_result = await db.execute(template_query)
-            selected_templates = list(template_result.scalars().all())
-
-        while current_date <= end_date:
-            # weekday() 0 是週一，6 是週日。days_of_week 遵循此約定。
-            if current_date.weekday() in series_in.days_of_week:
-                # ... (時間計算邏輯保持不變)
-                
-                start_dt_local = datetime.combine(current_date, datetime.min.time().replace(hour=start_h, minute=start_m))
-                end_dt_local = datetime.combine(current_date, datetime.min.time().replace(hour=end_h, minute=end_m))
-                
-                start_dt = start_dt_local.replace(tzinfo=local_tz).astimezone(timezone.utc)
-                end_dt = end_dt_local.replace(tzinfo=local_tz).astimezone(timezone.utc)
-                
-                # 如果結束時間早於開始時間（跨夜），增加一天
-                if end_dt <= start_dt:
-                    end_dt += timedelta(days=1)
-                    
-                event_data = series_in.event_base.model_dump()
-                event_data.pop("template_ids", None) # 移除 template_ids 以免傳入 Event 構造函數
-                event_data['start_time'] = start_dt
-                event_data['end_time'] = end_dt
-                event_data['series_id'] = series_id
-                event_data['created_by'] = current_admin.id
-                
-                event = Event(**event_data)
-                event.templates = selected_templates # 關聯範本
-                db.add(event)
-                events.append(event)
-                
-            current_date += timedelta(days=1)
-        
-        if not events:
-            raise HTTPException(status_code=400, detail="在指定的範圍內沒有符合條件的日期")
-            
-        await db.commit()
-        
-        # 為每個活動生成 QR Code 並重新載入
-        from app.core.config import settings
-        final_events = []
-        for event in events:
-            checkin_url = f"{settings.FRONTEND_URL}/event/{event.id}"
-            qr_filename = f"event_{event.id}.png"
-            qr_path = generate_qr_code(checkin_url, qr_filename)
-            event.qrcode_url = qr_path
+            template_ids = list(template_result.scalars().all())
+
+        base_data = series_in.event_base.model_dump()
+        base_data.pop("template_ids", None) # 移除 template_ids 以免傳入 Event
+        base_data['series_id'] = series_id
+        base_data['created_by'] = current_admin.id
+
+        event_rows = []
+        for current_date in dates:
+            start_dt = datetime.combine(current_date, start_clock, tzinfo=local_tz).astimezone(timezone.utc)
+            end_dt = datetime.combine(current_date, end_clock, tzinfo=local_tz).astimezone(timezone.utc)
             
+            # 如果結束時間早於開始時間（跨夜），增加一天
+            if end_dt <= start_dt:
+                end_dt += timedelta(days=1)
+
+            event_id = str(uuid.uuid4())
+            event_rows.append({
+                **base_data,
+                "id": event_id,
+                "start_time": start_dt,
+                "end_time": end_dt,
+                "qrcode_url": f"qrcodes/event_{event_id}.png",
+            })
+
+        # 批次寫入活動與範本關聯
+        await db.execute(insert(Event), event_rows)
+        if template_ids:
+            await db.execute(
+                insert(event_template_association),
+                [{"event_id": row["id"], "template_id": tid} for row in event_rows for tid in template_ids]
+            )
         await db.commit()
+        invalidate_event_responses()
         
         # 批量重新載入所有活動及其範本
-        event_ids = [e.id for e in events]
+        event_ids = [row["id"] for row in event_rows]
         final_query = select(Event).options(selectinload(Event.templates)).where(Event.id.in_(event_ids)).order_by(Event.start_time.asc())
         final_result = await db.execute(final_query)
         final_events = list(final_result.scalars().all())
         
     except Exception as e:
-        traceback.print_exc()
+        logger.exception("創建系列活動失敗", extra={"fields": {"series_id": series_id}})
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"創建系列活動失敗: {str(e)}")
+
+    # QR Code 於回應後產生，不延遲建立請求
+    for event_id in event_ids:
+        background_tasks.add_task(
+            generate_qr_code, f"{settings.FRONTEND_URL}/event/{event_id}", f"event_{event_id}.png"
+        )
     
     return [EventResponse.model_validate(e) for e in final_events]
 
-@router.get("/{event_id}", response_model=EventResponse)
-async def get_event(
-    event_id: str,
+async def _series_scope(db: AsyncSession, series_id: str, from_event_id: Optional[str]):
+    """
+    系列活動的篩選條件；提供 from_event_id 時為「此場次及之後」
+    """
+    conditions = [Event.series_id == series_id, Event.deleted_at.is_(None)]
+    if from_event_id:
+        result = await db.execute(
+            select(Event.start_time).where(Event.id == from_event_id, Event.series_id == series_id)
+        )
+        from_start = result.scalar_one_or_none()
+        if from_start is None:
+            raise HTTPException(status_code=404, detail="指定的場次不在此系列中")
+        conditions.append(Event.start_time >= from_start)
+    return conditions
+
+
+@router.put("/series/{series_id}", response_model=EventSeriesBulkResponse)
+async def update_event_series(
+    series_id: str,
+    series_in: EventSeriesUpdate,
+    from_event_id: Optional[str] = None,
+    current_admin: Admin = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    獲取單個活動詳情
+    批次更新系列活動
+    - 未提供 from_event_id：更新整個系列
+    - 提供 from_event_id：只更新此場次及之後的場次
+    - 以單一 UPDATE 完成，範本關聯以批次 DELETE + INSERT 取代
     """
-    query = select(Event).options(selectinload(Event.templates)).where(Event.id == event_id)
+    conditions = await _series_scope(db, series_id, from_event_id)
+
+    values = series_in.model_dump(
+        exclude_unset=True,
+        exclude={"template_ids", "start_time_local", "end_time_local", "shift_minutes"}
+    )
+
+    # 時間調整：各場次保留自己的日期，只改時段；或整體平移
+    if series_in.start_time_local is not None:
+        try:
+            start_h, start_m = map(int, series_in.start_time_local.split(':'))
+            end_h, end_m = map(int, series_in.end_time_local.split(':'))
+            start_clock = dt_time(hour=start_h, minute=start_m)
+            end_clock = dt_time(hour=end_h, minute=end_m)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="時間格式不正確，應為 HH:mm")
+
+        local_date = func.date(func.timezone(SERIES_TIMEZONE, Event.start_time))
+        overnight = timedelta(days=1) if end_clock <= start_clock else timedelta(0)
+        values["start_time"] = func.timezone(SERIES_TIMEZONE, local_date + start_clock)
+        values["end_time"] = func.timezone(SERIES_TIMEZONE, local_date + end_clock + overnight)
+    elif series_in.shift_minutes:
+        shift = timedelta(minutes=series_in.shift_minutes)
+        values["start_time"] = Event.start_time + shift
+        values["end_time"] = Event.end_time + shift
+
+    if values:
+        result = await db.execute(
+            update(Event).where(*conditions).values(**values).returning(Event.id),
+            execution_options={"synchronize_session": False}
+        )
+    else:
+        result = await db.execute(select(Event.id).where(*conditions))
+    event_ids = list(result.scalars().all())
+
+    if not event_ids:
+        raise HTTPException(status_code=404, detail="系列活動不存在")
+
+    if series_in.template_ids is not None:
+        await db.execute(
+            delete(event_template_association).where(event_template_association.c.event_id.in_(event_ids))
+        )
+        if series_in.template_ids:
+            await db.execute(
+                insert(event_template_association).from_select(
+                    ["event_id", "template_id"],
+                    select(Event.id, RegistrationTemplate.id)
+                    .where(Event.id.in_(event_ids), RegistrationTemplate.id.in_(series_in.template_ids))
+                )
+            )
+
+    await db.commit()
+    invalidate_event_responses(*event_ids)
+
+    for event_id in event_ids:
+        mark_recent_write(event_id)
+        if "max_participants" in values:
+            capacity_tracker.invalidate(event_id)
+        # 到場分布的時間範圍與是否已結束都取決於活動時間
+        if "start_time" in values or "end_time" in values:
+            arrival_cache.invalidate(event_id)
+
+    return EventSeriesBulkResponse(affected=len(event_ids), event_ids=event_ids)
+
+
+@router.delete("/series/{series_id}", response_model=EventSeriesBulkResponse)
+async def delete_event_series(
+    series_id: str,
+    from_event_id: Optional[str] = None,
+    soft: bool = False,
+    archive: bool = False,
+    current_admin: Admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    批次刪除系列活動（提供 from_event_id 時只刪除此場次及之後）
+    - 以單一 DELETE 刪除活動；簽到記錄、範本關聯與名單由外鍵串聯刪除
+    - soft=true：只標記為已刪除
+    - archive=true：刪除前先將簽到記錄封存
+    """
+    conditions = await _series_scope(db, series_id, from_event_id)
+    result = await db.execute(select(Event.id).where(*conditions))
+    target_ids = list(result.scalars().all())
+
+    if soft:
+        event_ids = await soft_delete_events(db, target_ids)
+    else:
+        event_ids = await delete_events(db, target_ids, archive=archive)
+
+    if not event_ids:
+        raise HTTPException(status_code=404, detail="系列活動不存在")
+
+    await db.commit()
+    forget_events(event_ids)
+
+    return EventSeriesBulkResponse(affected=len(event_ids), event_ids=event_ids)
+
+
+@router.get("/series/{series_id}/attendance", response_model=SeriesAttendanceReport)
+async def get_series_attendance(
+    series_id: str,
+    threshold: float = Query(0.8, ge=0, le=1, description="完成所需的出席率"),
+    format: str = "json",
+    current_admin: Admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    系列活動的用戶 × 場次出席矩陣
+    - 以單一分組查詢計算，每位用戶以位元集合記錄出席場次
+    - format=csv / excel 時直接串流下載檔案
+    """
+    result = await db.execute(
+        select(Event)
+        .where(Event.series_id == series_id, Event.deleted_at.is_(None))
+        .order_by(Event.start_time)
+    )
+    sessions = list(result.scalars().all())
+    if not sessions:
+        raise HTTPException(status_code=404, detail="系列活動不存在")
+
+    matrix = await build_series_matrix(db, sessions, threshold)
+
+    if format in ("csv", "excel"):
+        if format == "csv":
+            body, media_type, filename = iter_csv(matrix), "text/csv; charset=utf-8", export_filename(series_id, "csv")
+        else:
+            body = iter_xlsx(matrix)
+            media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            filename = export_filename(series_id, "xlsx")
+        return StreamingResponse(
+            body,
+            media_type=media_type,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+        )
+
+    counts = matrix.session_attendees()
+    attendees = [
+        SeriesAttendee(
+            user_id=row.user_id,
+            name=row.name,
+            company=row.company,
+            department=row.department,
+            attended=row.attended,
+            rate=round(matrix.rate(row), 4),
+            completed=matrix.completed(row),
+            pattern=row.pattern(matrix.session_count)
+        )
+        for row in matrix.rows
+    ]
+    return SeriesAttendanceReport(
+        series_id=series_id,
+        threshold=threshold,
+        sessions=[
+            SeriesSession(event_id=event.id, name=event.name, start_time=event.start_time, attendees=count)
+            for event, count in zip(sessions, counts)
+        ],
+        total_users=len(attendees),
+        completed_users=sum(1 for a in attendees if a.completed),
+        attendees=attendees
+    )
+
+
+async def _get_live_event(db: AsyncSession, event_id: str, with_templates: bool = False) -> Event:
+    """
+    取得未刪除的活動；不存在或已軟刪除（還原前）時回傳 404
+    """
+    query = select(Event).where(Event.id == event_id, Event.deleted_at.is_(None))
+    if with_templates:
+        query = query.options(selectinload(Event.templates))
     result = await db.execute(query)
     event = result.scalar_one_or_none()
-    
     if not event:
         raise HTTPException(status_code=404, detail="活動不存在")
-        
-    return EventResponse.model_validate(event)
+    return event
+
+
+@router.get("/{event_id}", response_model=EventResponse)
+async def get_event(
+    event_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    獲取單個活動詳情
+    - 支援 If-None-Match；快取有效期間內不查詢資料庫
+    """
+    key = ("event", event_id)
+    entry = event_response_cache.get(key)
+    if entry is None:
+        query = select(Event).options(selectinload(Event.templates)).where(Event.id == event_id, Event.deleted_at.is_(None))
+        result = await db.execute(query)
+        event = result.scalar_one_or_none()
+
+        if not event:
+            raise HTTPException(status_code=404, detail="活動不存在")
+
+        body = EventResponse.model_validate(event).model_dump_json().encode()
+        entry = event_response_cache.put(key, make_etag(_event_fingerprint(event)), body)
+
+    return cached_response(request, entry, EVENT_CACHE_CONTROL)
 
 
 @router.put("/{event_id}", response_model=EventResponse)
@@ -275,12 +553,7 @@ async def update_event(
     """
     更新活動
     """
-    query = select(Event).options(selectinload(Event.templates)).where(Event.id == event_id)
-    result = await db.execute(query)
-    event = result.scalar_one_or_none()
-    
-    if not event:
-        raise HTTPException(status_code=404, detail="活動不存在")
+    event = await _get_live_event(db, event_id, with_templates=True)
         
     update_data = event_in.model_dump(exclude_unset=True)
     
@@ -296,6 +569,13 @@ async def update_event(
         setattr(event, field, value)
         
     await db.commit()
+    mark_recent_write(event_id)
+    invalidate_event_responses(event_id)
+    if "max_participants" in update_data:
+        capacity_tracker.invalidate(event_id)
+    # 到場分布的時間範圍與是否已結束都取決於活動時間
+    if "start_time" in update_data or "end_time" in update_data:
+        arrival_cache.invalidate(event_id)
     
     # 重新加載以包含 templates 關係
     query = select(Event).options(selectinload(Event.templates)).where(Event.id == event.id)
@@ -308,48 +588,72 @@ async def update_event(
 @router.delete("/{event_id}")
 async def delete_event(
     event_id: str,
+    soft: bool = False,
+    archive: bool = False,
     current_admin: Admin = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """
     刪除活動
+    - 簽到記錄、範本關聯與名單由資料庫串聯刪除，不載入到記憶體
+    - soft=true：只標記為已刪除，可再還原
+    - archive=true：刪除前先將簽到記錄封存到 checkins_archive
     """
-    query = select(Event).where(Event.id == event_id)
-    result = await db.execute(query)
-    event = result.scalar_one_or_none()
-    
-    if not event:
+    if soft:
+        deleted = await soft_delete_events(db, [event_id])
+    else:
+        deleted = await delete_events(db, [event_id], archive=archive)
+
+    if not deleted:
         raise HTTPException(status_code=404, detail="活動不存在")
-        
-    await db.delete(event)
+
     await db.commit()
-    
+    forget_events(deleted)
+
     return {"success": True, "message": "活動已刪除"}
 
 
+@router.post("/{event_id}/restore", response_model=EventResponse)
+async def restore_event(
+    event_id: str,
+    current_admin: Admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    還原軟刪除的活動
+    """
+    restored = await restore_events(db, [event_id])
+    if not restored:
+        raise HTTPException(status_code=404, detail="活動不存在或未被刪除")
+
+    await db.commit()
+    forget_events(restored)
+
+    query = select(Event).options(selectinload(Event.templates)).where(Event.id == event_id)
+    result = await db.execute(query)
+    return EventResponse.model_validate(result.scalar_one())
+
+
 @router.get("/{event_id}/stats", response_model=EventStats)
 async def get_event_stats(
     event_id: str,
     current_admin: Admin = Depends(get_current_admin),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     獲取活動統計數據
     """
-    query = select(Event).where(Event.id == event_id)
-    result = await db.execute(query)
-    event = result.scalar_one_or_none()
+    event = await _get_live_event(db, event_id)
     
-    if not event:
-        raise HTTPException(status_code=404, detail="活動不存在")
-    
-    total_query = select(func.count(Checkin.id)).where(Checkin.event_id == event_id)
+    # 已封存的活動改從封存表統計
+    model = checkin_model_for(event)
+    total_query = select(func.count(model.id)).where(model.event_id == event_id)
     total_result = await db.execute(total_query)
     total = total_result.scalar() or 0
     
-    checked_out_query = select(func.count(Checkin.id)).where(
-        Checkin.event_id == event_id,
-        Checkin.checkout_time.is_not(None)
+    checked_out_query = select(func.count(model.id)).where(
+        model.event_id == event_id,
+        model.checkout_time.is_not(None)
     )
     checked_out_result = await db.execute(checked_out_query)
     checked_out = checked_out_result.scalar() or 0
@@ -363,24 +667,52 @@ async def get_event_stats(
     )
 
 
+@router.get("/{event_id}/arrivals", response_model=ArrivalHistogram)
+async def get_event_arrivals(
+    event_id: str,
+    interval_minutes: int = Query(1, ge=1, le=1440, description="區間長度（分鐘）"),
+    current_admin: Admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    活動到場曲線：每個時間區間的簽到/簽退人數
+    - 已結束的活動永久快取，進行中的活動快取數秒
+    """
+    event = await _get_live_event(db, event_id)
+
+    try:
+        histogram = await arrival_histogram(db, event, interval_minutes * 60)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    buckets = [
+        ArrivalBucket(start=start, checkins=checkins, checkouts=checkouts)
+        for start, checkins, checkouts in histogram["buckets"]
+    ]
+    return ArrivalHistogram(
+        event_id=event_id,
+        interval_minutes=interval_minutes,
+        final=histogram["final"],
+        total_checkins=sum(b.checkins for b in buckets),
+        total_checkouts=sum(b.checkouts for b in buckets),
+        buckets=buckets
+    )
+
+
 @router.get("/{event_id}/checkins", response_model=CheckinListResponse)
 async def get_event_checkins(
     event_id: str,
     current_admin: Admin = Depends(get_current_admin),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     獲取活動的簽到列表
     """
-    query = select(Event).where(Event.id == event_id)
-    result = await db.execute(query)
-    event = result.scalar_one_or_none()
+    event = await _get_live_event(db, event_id)
     
-    if not event:
-        raise HTTPException(status_code=404, detail="活動不存在")
-    
-    # 查詢簽到記錄並包含用戶信息
-    checkins_query = select(Checkin).options(selectinload(Checkin.user)).where(Checkin.event_id == event_id).order_by(Checkin.checkin_time.desc())
+    # 查詢簽到記錄並包含用戶信息（已封存的活動從封存表讀取）
+    model = checkin_model_for(event)
+    checkins_query = select(model).options(selectinload(model.user)).where(model.event_id == event_id).order_by(model.checkin_time.desc())
     checkins_result = await db.execute(checkins_query)
     checkins = checkins_result.scalars().all()
     
@@ -420,20 +752,20 @@ async def export_event_checkins(
     event_id: str,
     format: str = "excel",
     current_admin: Admin = Depends(get_current_admin),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     匯出活動簽到記錄
+    - 除固定欄位外，依活動範本的 fields_schema 輸出表單回答（dynamic_data）與基本資料擴充（profile_data）
     """
-    query = select(Event).where(Event.id == event_id)
-    result = await db.execute(query)
-    event = result.scalar_one_or_none()
-    
-    if not event:
-        raise HTTPException(status_code=404, detail="活動不存在")
+    event = await _get_live_event(db, event_id, with_templates=True)
     
-    # 查詢數據
-    checkins_query = select(Checkin).options(selectinload(Checkin.user)).where(Checkin.event_id == event_id).order_by(Checkin.checkin_time.desc())
+    # 欄位順序由範本一次決定
+    plan = plan_columns(event.templates)
+
+    # 查詢數據（已封存的活動從封存表讀取）
+    model = checkin_model_for(event)
+    checkins_query = select(model).options(selectinload(model.user)).where(model.event_id == event_id).order_by(model.checkin_time.desc())
     checkins_result = await db.execute(checkins_query)
     checkins = checkins_result.scalars().all()
     
@@ -442,20 +774,14 @@ async def export_event_checkins(
     for checkin in checkins:
         if not checkin.user:
             continue
-            
-        row = {
-            "姓名": checkin.user.name,
-            "手機": checkin.user.phone,
-            "單位": checkin.user.company,
-            "部門": checkin.user.department,
-            "簽到時間": checkin.checkin_time.strftime("%Y-%m-%d %H:%M:%S"),
-            "簽退時間": checkin.checkout_time.strftime("%Y-%m-%d %H:%M:%S") if checkin.checkout_time else "",
-            "狀態": checkin.status,
-            "位置": checkin.geolocation
-        }
-        data.append(row)
+
+        base = base_values(
+            checkin.user.name, checkin.user.phone, checkin.user.company, checkin.user.department,
+            checkin.checkin_time, checkin.checkout_time, checkin.status, checkin.geolocation
+        )
+        data.append(plan.extract_dict(base, checkin.dynamic_data, checkin.user.profile_data))
         
-    # 匯出
-    file_path = export_data(data, format, prefix=f"checkins_{event_id}")
+    # 匯出（內容相同時重用既有檔案；寫檔與上傳不在事件迴圈上執行）
+    file_path = await get_or_create_export(data, format, f"checkins_{event_id}")
     
     return {"url": f"/api/files/{file_path}"}
\ No newline at end of file
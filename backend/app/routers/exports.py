@@ -0,0 +1,112 @@
+"""
+匯出檔案管理 API
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_read_db, read_session_factory
+from app.models import Admin, Event
+from app.schemas.export import ExportStorageMetrics, ExportSweepResult
+from app.core.dependencies import get_current_admin
+from app.services.combined_export import (
+    iter_combined_csv, iter_combined_xlsx, combined_filename, MAX_XLSX_SHEETS
+)
+from app.services.export_lifecycle import export_storage_metrics, sweep_exports
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+# 單次合併匯出的活動數上限
+MAX_COMBINED_EVENTS = 2000
+
+
+@router.get("/checkins")
+async def export_combined_checkins(
+    event_ids: Optional[List[str]] = Query(None, description="活動 ID，可重複或以逗號分隔"),
+    series_id: Optional[str] = None,
+    start: Optional[datetime] = Query(None, description="活動開始時間下限"),
+    end: Optional[datetime] = Query(None, description="活動開始時間上限（不含）"),
+    format: str = "excel",
+    current_admin: Admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    多活動合併匯出簽到記錄（串流下載）
+    - 以 event_ids、series_id 或 start/end 選擇活動，可同時使用（取交集）
+    - format=excel：活動總覽 + 每個活動一個工作表；format=csv：單一檔案，含活動欄位
+    - 依活動範本附加表單回答與基本資料擴充欄位
+    """
+    if format not in ("excel", "csv"):
+        raise HTTPException(status_code=400, detail="format 必須是 excel 或 csv")
+
+    ids = [i.strip() for value in event_ids or [] for i in value.split(",") if i.strip()]
+    if not ids and not series_id and start is None and end is None:
+        raise HTTPException(status_code=400, detail="請指定 event_ids、series_id 或日期範圍")
+
+    conditions = [Event.deleted_at.is_(None)]
+    if ids:
+        conditions.append(Event.id.in_(ids))
+    if series_id:
+        conditions.append(Event.series_id == series_id)
+    if start is not None:
+        conditions.append(Event.start_time >= start)
+    if end is not None:
+        conditions.append(Event.start_time < end)
+    # 系統管理員可匯出全部活動，其他角色只能匯出自己創建的活動
+    if current_admin.name != "系統管理員":
+        conditions.append(Event.created_by == current_admin.id)
+
+    result = await db.execute(
+        select(Event)
+        .options(selectinload(Event.templates))
+        .where(*conditions)
+        .order_by(Event.start_time, Event.id)
+        .limit(MAX_COMBINED_EVENTS + 1)
+    )
+    events = list(result.scalars().all())
+    if not events:
+        raise HTTPException(status_code=404, detail="找不到符合條件的活動")
+    if len(events) > MAX_COMBINED_EVENTS:
+        raise HTTPException(status_code=400, detail=f"一次最多匯出 {MAX_COMBINED_EVENTS} 個活動，請縮小範圍")
+    if format == "excel" and len(events) > MAX_XLSX_SHEETS:
+        raise HTTPException(
+            status_code=400, detail=f"Excel 最多 {MAX_XLSX_SHEETS} 個活動（每個活動一個工作表），請改用 CSV"
+        )
+
+    # 回應串流期間依賴注入的 session 已關閉，匯出查詢自行開啟 session
+    session_factory = await read_session_factory()
+    if format == "csv":
+        body, media_type = iter_combined_csv(session_factory, events), "text/csv; charset=utf-8"
+        filename = combined_filename(series_id, "csv")
+    else:
+        body = iter_combined_xlsx(session_factory, events)
+        media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        filename = combined_filename(series_id, "xlsx")
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/metrics", response_model=ExportStorageMetrics)
+async def get_export_metrics(current_admin: Admin = Depends(get_current_admin)):
+    """
+    匯出檔案儲存用量與去重、清理統計
+    """
+    return ExportStorageMetrics(**await export_storage_metrics())
+
+
+@router.post("/sweep", response_model=ExportSweepResult)
+async def run_export_sweep(current_admin: Admin = Depends(get_current_admin)):
+    """
+    立即清理過期與超出容量的匯出檔案（僅系統管理員）
+    """
+    if current_admin.name != "系統管理員":
+        raise HTTPException(status_code=403, detail="僅系統管理員可執行清理")
+    return ExportSweepResult(**await sweep_exports())
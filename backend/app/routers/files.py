@@ -1,34 +1,118 @@
 """
 文件服務 API
 """
+import mimetypes
 import os
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+import stat
+from typing import Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import RedirectResponse
+from starlette.concurrency import run_in_threadpool
+
 from app.core.config import settings
+from app.core.compression import PRECOMPRESSED, choose_encoding
+from app.core.file_response import file_response
+from app.services.storage import get_storage, normalize_key
 
 router = APIRouter(prefix="/files", tags=["files"])
 
+# QR Code 檔名由活動 ID 決定、內容不變，可長期快取
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# 匯出檔案含個人資料，只允許瀏覽器快取
+EXPORT_CACHE_CONTROL = "private, max-age=3600"
+
+
+def _resolve(file_path: str) -> str:
+    """
+    轉為 UPLOAD_DIR 下的絕對路徑（純字串運算，不存取檔案系統）
+    防止目錄遍歷：結果必須位於 UPLOAD_DIR 之內
+    """
+    upload_dir = os.path.abspath(settings.UPLOAD_DIR)
+    full_path = os.path.abspath(os.path.join(upload_dir, file_path))
+    if os.path.commonpath([upload_dir, full_path]) != upload_dir or full_path == upload_dir:
+        raise HTTPException(status_code=403, detail="禁止訪問該路徑")
+    return full_path
+
+
+def _stat_candidates(full_path: str, encodings: Tuple[str, ...]) -> Optional[Tuple[str, os.stat_result, Optional[str]]]:
+    """
+    在執行緒中依序 stat 可接受的預先壓縮檔與原檔，回傳第一個存在的 (路徑, stat, 編碼)
+    """
+    for encoding, suffix in PRECOMPRESSED:
+        if encoding in encodings:
+            try:
+                return full_path + suffix, os.stat(full_path + suffix), encoding
+            except OSError:
+                pass
+    try:
+        return full_path, os.stat(full_path), None
+    except OSError:
+        return None
+
+
+def _accepted_encodings(request: Request) -> Tuple[str, ...]:
+    accept_encoding = request.headers.get("accept-encoding", "")
+    preferred = choose_encoding(accept_encoding) if accept_encoding else None
+    if preferred == "br":
+        return ("br", "gzip")
+    if preferred == "gzip":
+        return ("gzip",)
+    return ()
+
 
 @router.get("/{file_path:path}")
-async def get_file(file_path: str):
+async def get_file(file_path: str, request: Request):
     """
     獲取靜態文件 (QR Code, 匯出文件)
+    - 支援 ETag / Last-Modified、Range 請求
+    - QR Code 以 immutable 長期快取；匯出檔案有預先壓縮版本時直接回傳
+    - 設定 FILES_ACCEL_REDIRECT_PREFIX 時交由 nginx 以 X-Accel-Redirect 傳送（預先壓縮版本由 nginx gzip_static 選用）
+    - 物件儲存（STORAGE_TYPE=s3）時轉址到預簽名 URL，檔案不經過 API
     """
-    # 構建完整路徑
-    full_path = os.path.join(settings.UPLOAD_DIR, file_path)
-    
-    # 安全檢查: 防止目錄遍歷
-    # os.path.abspath(full_path) 必須以 os.path.abspath(settings.UPLOAD_DIR) 開頭
-    abs_full_path = os.path.abspath(full_path)
-    abs_upload_dir = os.path.abspath(settings.UPLOAD_DIR)
-    
-    if not abs_full_path.startswith(abs_upload_dir):
+    key = normalize_key(file_path)
+    if key is None:
         raise HTTPException(status_code=403, detail="禁止訪問該路徑")
-    
-    if not os.path.exists(full_path):
-        raise HTTPException(status_code=404, detail="文件不存在")
-        
-    if not os.path.isfile(full_path):
+    is_export = key.startswith("exports/")
+
+    redirect_url = get_storage().download_url(key, filename=os.path.basename(key) if is_export else None)
+    if redirect_url:
+        # 轉址本身可短暫快取，但不能超過預簽名 URL 的有效期
+        max_age = settings.S3_PRESIGN_EXPIRES // 2
+        return RedirectResponse(redirect_url, status_code=307, headers={"Cache-Control": f"private, max-age={max_age}"})
+
+    full_path = _resolve(file_path)
+
+    # 匯出檔案才有預先壓縮版本；QR Code 圖片不需嘗試。
+    # X-Accel-Redirect 時 nginx 不會轉送上游的 Content-Encoding / Vary，
+    # 一律指向原檔，由 nginx 的 gzip_static 選擇 .gz 版本並自行加上標頭
+    accel = bool(settings.FILES_ACCEL_REDIRECT_PREFIX)
+    encodings = _accepted_encodings(request) if is_export and not accel else ()
+
+    # 只 stat 一次（有預先壓縮檔時先試壓縮檔），且不在事件迴圈上執行
+    found = await run_in_threadpool(_stat_candidates, full_path, encodings)
+    if found is None or not stat.S_ISREG(found[1].st_mode):
         raise HTTPException(status_code=404, detail="文件不存在")
-        
-    return FileResponse(full_path)
+    send_path, st, encoding = found
+
+    media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+    cache_control = EXPORT_CACHE_CONTROL if is_export else IMMUTABLE_CACHE_CONTROL
+    extra_headers = {}
+    if is_export:
+        extra_headers["Vary"] = "Accept-Encoding"
+    if encoding:
+        extra_headers["Content-Encoding"] = encoding
+
+    if accel:
+        # nginx 以 sendfile 直接傳送（含 Range 處理與預先壓縮版本），Python 只回傳標頭
+        relative = os.path.relpath(send_path, os.path.abspath(settings.UPLOAD_DIR)).replace(os.sep, "/")
+        return Response(
+            media_type=media_type,
+            headers={
+                "X-Accel-Redirect": settings.FILES_ACCEL_REDIRECT_PREFIX.rstrip("/") + "/" + relative,
+                # ETag / Last-Modified 由 nginx 依實際傳送的檔案（原檔或 .gz）產生
+                "Cache-Control": cache_control,
+            }
+        )
+
+    return file_response(request, send_path, st, media_type, cache_control, extra_headers)
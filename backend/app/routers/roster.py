@@ -0,0 +1,71 @@
+"""
+活動名單 API
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.database import get_db
+from app.models import Event, Admin
+from app.schemas.roster import RosterLoadRequest, RosterLoadResponse, RosterRemoveRequest, RosterResponse
+from app.core.dependencies import get_current_admin
+from app.services.roster_service import roster_cache, load_roster, clear_roster
+
+router = APIRouter(prefix="/events", tags=["roster"])
+
+
+async def _get_event_or_404(db: AsyncSession, event_id: str) -> Event:
+    result = await db.execute(select(Event).where(Event.id == event_id, Event.deleted_at.is_(None)))
+    event = result.scalar_one_or_none()
+    if not event:
+        raise HTTPException(status_code=404, detail="活動不存在")
+    return event
+
+
+@router.get("/{event_id}/roster", response_model=RosterResponse)
+async def get_roster(
+    event_id: str,
+    current_admin: Admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    獲取活動名單
+    """
+    await _get_event_or_404(db, event_id)
+    roster = await roster_cache.get(db, event_id)
+    return RosterResponse(event_id=event_id, total=len(roster), user_ids=sorted(roster))
+
+
+@router.post("/{event_id}/roster", response_model=RosterLoadResponse)
+async def add_to_roster(
+    event_id: str,
+    roster_in: RosterLoadRequest,
+    current_admin: Admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    批次加入活動名單
+    - 以用戶 ID、LINE ID 或手機號碼比對已註冊用戶
+    - 已在名單中的用戶會略過
+    """
+    await _get_event_or_404(db, event_id)
+    added, unmatched = await load_roster(
+        db, event_id, roster_in.user_ids, roster_in.line_user_ids, roster_in.phones
+    )
+    roster = await roster_cache.get(db, event_id)
+    return RosterLoadResponse(added=added, total=len(roster), unmatched=unmatched)
+
+
+@router.delete("/{event_id}/roster")
+async def remove_from_roster(
+    event_id: str,
+    roster_in: RosterRemoveRequest,
+    current_admin: Admin = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    移除名單中的用戶，未指定 user_ids 時清空名單
+    """
+    await _get_event_or_404(db, event_id)
+    removed = await clear_roster(db, event_id, roster_in.user_ids)
+    return {"success": True, "message": f"已移除 {removed} 人"}
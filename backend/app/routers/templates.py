@@ -1,46 +1,114 @@
 """
 註冊表單範本管理 API
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import select, func, or_
 
 from app.database import get_db
 from app.models import RegistrationTemplate, Admin
+from app.schemas.common import PaginatedResponse
 from app.schemas.registration_template import (
     RegistrationTemplateCreate,
     RegistrationTemplateUpdate,
-    RegistrationTemplateResponse
+    RegistrationTemplateResponse,
+    RegistrationTemplateSummary
 )
+from app.core.config import settings
 from app.core.dependencies import get_current_admin
+from app.core.http_cache import ResponseCache, cached_response, event_response_cache, make_etag
 
 router = APIRouter(prefix="/templates", tags=["templates"])
 
+# 範本摘要列表，依可見範圍快取：系統管理員為 "all"，其他管理員為自己的 ID
+template_list_cache = ResponseCache(ttl=settings.TEMPLATE_LIST_CACHE_TTL)
 
-@router.get("", response_model=List[RegistrationTemplateResponse])
+TEMPLATE_LIST_CACHE_CONTROL = "private, no-cache"
+
+SYSTEM_ADMIN_SCOPE = "all"
+
+
+def _list_scope(current_admin: Admin):
+    return SYSTEM_ADMIN_SCOPE if current_admin.name == "系統管理員" else current_admin.id
+
+
+def _invalidate_template_lists(owner_id: Optional[int], affects_everyone: bool) -> None:
+    """
+    範本異動後清除受影響的列表快取：公共範本影響所有人，私人範本只影響建立者與系統管理員
+    """
+    if affects_everyone:
+        template_list_cache.invalidate("templates")
+    else:
+        template_list_cache.invalidate("templates", owner_id, SYSTEM_ADMIN_SCOPE)
+
+
+@router.get("", response_model=PaginatedResponse[RegistrationTemplateSummary])
 async def get_templates(
+    request: Request,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=200),
+    type: Optional[str] = Query(None, description="registration / survey / profile_extension"),
     current_admin: Admin = Depends(get_current_admin),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    獲取可用的範本列表
+    獲取可用的範本摘要列表（不含 fields_schema，完整內容請用 GET /templates/{id}）
     - 系統管理員：查看所有範本
     - 其他角色：查看所有公共範本 + 自己創建的私人範本
     """
-    if current_admin.name == "系統管理員":
-        query = select(RegistrationTemplate)
-    else:
-        query = select(RegistrationTemplate).where(
+    scope = _list_scope(current_admin)
+    conditions = []
+    if scope != SYSTEM_ADMIN_SCOPE:
+        conditions.append(
             or_(
                 RegistrationTemplate.is_public == True,
                 RegistrationTemplate.created_by_admin_id == current_admin.id
             )
         )
-    
-    result = await db.execute(query)
-    templates = result.scalars().all()
-    return templates
+    if type:
+        conditions.append(RegistrationTemplate.type == type)
+
+    # 以資料庫中的版本（筆數 + 最後異動時間）作為快取 key 的一部分：
+    # 其他 worker 的異動不會清除本進程的快取，但會改變版本，不會回傳舊列表
+    total, last_modified = (await db.execute(
+        select(
+            func.count(),
+            func.max(func.coalesce(RegistrationTemplate.updated_at, RegistrationTemplate.created_at))
+        ).select_from(RegistrationTemplate).where(*conditions)
+    )).one()
+
+    key = ("templates", scope, page, page_size, type, total, last_modified)
+    entry = template_list_cache.get(key)
+    if entry is None:
+        # 欄位數量由資料庫計算，不傳回完整 fields_schema
+        result = await db.execute(
+            select(
+                RegistrationTemplate.id,
+                RegistrationTemplate.name,
+                RegistrationTemplate.type,
+                RegistrationTemplate.survey_trigger,
+                RegistrationTemplate.is_public,
+                RegistrationTemplate.created_by_admin_id,
+                func.coalesce(func.json_array_length(RegistrationTemplate.fields_schema), 0).label("field_count"),
+                RegistrationTemplate.updated_at,
+            )
+            .where(*conditions)
+            .order_by(RegistrationTemplate.name, RegistrationTemplate.id)
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+        )
+        response = PaginatedResponse[RegistrationTemplateSummary](
+            data=[RegistrationTemplateSummary(**row._mapping) for row in result],
+            total=total,
+            page=page,
+            page_size=page_size,
+            total_pages=(total + page_size - 1) // page_size
+        )
+        body = response.model_dump_json().encode("utf-8")
+        entry = template_list_cache.put(key, make_etag(body), body)
+
+    return cached_response(request, entry, TEMPLATE_LIST_CACHE_CONTROL)
 
 
 @router.post("", response_model=RegistrationTemplateResponse)
@@ -63,6 +131,7 @@ async def create_template(
     
     db.add(template)
     await db.commit()
+    _invalidate_template_lists(current_admin.id, template.is_public)
     await db.refresh(template)
     return template
 
@@ -117,10 +186,14 @@ async def update_template(
     if update_data.get("is_public") and current_admin.name != "系統管理員":
         raise HTTPException(status_code=403, detail="只有系統管理員可以將範本設為公共")
         
+    was_public = template.is_public
     for field, value in update_data.items():
         setattr(template, field, value)
         
     await db.commit()
+    _invalidate_template_lists(template.created_by_admin_id, was_public or template.is_public)
+    # 活動響應內嵌範本內容
+    event_response_cache.clear()
     await db.refresh(template)
     return template
 
@@ -144,6 +217,9 @@ async def delete_template(
     if template.created_by_admin_id != current_admin.id and current_admin.name != "系統管理員":
         raise HTTPException(status_code=403, detail="無權刪除此範本")
         
+    owner_id, was_public = template.created_by_admin_id, template.is_public
     await db.delete(template)
     await db.commit()
+    _invalidate_template_lists(owner_id, was_public)
+    event_response_cache.clear()
     return {"success": True, "message": "範本已刪除"}
@@ -1,14 +1,15 @@
 """
 用戶相關 API 路由
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import User
-from app.schemas.user import UserCreate, UserResponse, UserListResponse
+from app.schemas.user import UserCreate, UserResponse, UserListResponse, UserImportResponse
 from app.core.dependencies import get_current_admin
+from app.services.user_import_service import import_users
 
 router = APIRouter(prefix="/api/users", tags=["用戶"])
 
@@ -16,7 +17,7 @@ router = APIRouter(prefix="/api/users", tags=["用戶"])
 @router.get("", response_model=UserListResponse, summary="獲取用戶列表")
 async def get_users(
     admin: User = Depends(get_current_admin),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     獲取所有用戶列表
@@ -74,6 +75,26 @@ async def create_user(
     return new_user
 
 
+@router.post("/import", response_model=UserImportResponse, summary="批次匯入用戶")
+async def import_users_file(
+    file: UploadFile = File(..., description="CSV 或 XLSX，表頭需含 line_user_id, 姓名, 手機, 單位, 部門"),
+    on_conflict: str = Query("skip", pattern="^(skip|update)$", description="LINE ID 已存在時略過或更新"),
+    admin: User = Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    批次匯入用戶（例如企業訓練的 HR 名單）
+
+    權限: 需要管理員認證
+
+    每行以與註冊相同的規則驗證，驗證失敗的行列在 errors 中，其餘照常匯入
+    """
+    try:
+        return await import_users(db, file.file, file.filename or "", on_conflict=on_conflict)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.get("/{user_id}", response_model=UserResponse, summary="獲取用戶詳情")
 async def get_user(
     user_id: int,
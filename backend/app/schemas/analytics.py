@@ -0,0 +1,44 @@
+"""
+出席分析相關 Schema
+"""
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class AttendanceGroup(BaseModel):
+    """單一分組的出席統計"""
+    key: str = Field(description="分組值（活動分組時為活動 ID）")
+    label: str = Field(description="顯示名稱")
+    checkins: int = Field(description="簽到筆數")
+    attendees: int = Field(description="不重複出席人數")
+    events: int = Field(description="涉及的活動數")
+    repeat_attendees: int = Field(description="出席 2 場以上的人數")
+    population: Optional[int] = Field(None, description="該單位/部門的用戶總數")
+    attendance_rate: Optional[float] = Field(None, description="出席率 = 簽到筆數 / (總人數 × 範圍內活動數)")
+
+
+class AttendanceReport(BaseModel):
+    """出席分組報表"""
+    group_by: str
+    total_checkins: int
+    total_attendees: int
+    total_events: int
+    snapshot_time: Optional[datetime] = Field(None, description="快照資料時間")
+    rows: List[AttendanceGroup]
+
+
+class AttendanceTrendPoint(BaseModel):
+    """單一活動的出席與未出席人數"""
+    event_id: str
+    name: str
+    start_time: datetime
+    checkins: int
+    roster: int = Field(0, description="名單人數")
+    no_shows: int = Field(0, description="名單中未簽到的人數")
+
+
+class AttendanceTrend(BaseModel):
+    """依活動時間排序的出席趨勢"""
+    snapshot_time: Optional[datetime] = None
+    points: List[AttendanceTrendPoint]
@@ -1,9 +1,9 @@
 """
 Event 相關 Schema
 """
-from datetime import datetime
+from datetime import datetime, date
 from typing import Optional, List, Any
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
 from app.schemas.registration_template import RegistrationTemplateResponse
 
@@ -20,6 +20,7 @@ class EventBase(BaseModel):
     radius: int = Field(100, description="簽到半徑(公尺)")
     max_participants: Optional[int] = Field(None, ge=1, description="最大參與人數")
     event_type: str = Field(default="會議", description="活動類型")
+    roster_only: bool = Field(default=False, description="是否只允許名單內的用戶簽到")
     location_validation: bool = Field(default=False, description="是否需要位置驗證")
     require_checkout: bool = Field(default=False, description="是否需要簽退")
     checkout_mode: Optional[str] = Field(None, description="簽退模式: after_duration 或 at_end_time")
@@ -58,6 +59,7 @@ class EventUpdate(BaseModel):
     radius: Optional[int] = None
     max_participants: Optional[int] = Field(None, ge=1)
     event_type: Optional[str] = None
+    roster_only: Optional[bool] = None
     location_validation: Optional[bool] = None
     require_checkout: Optional[bool] = None
     checkout_mode: Optional[str] = None
@@ -101,11 +103,119 @@ class EventStats(BaseModel):
     checked_out: Optional[int] = Field(None, description="已簽退人數")
 
 
+class ArrivalBucket(BaseModel):
+    """到場曲線的單一時間區間"""
+    start: datetime = Field(description="區間開始時間")
+    checkins: int = Field(description="簽到人數")
+    checkouts: int = Field(description="簽退人數")
+
+
+class ArrivalHistogram(BaseModel):
+    """活動到場曲線"""
+    event_id: str
+    interval_minutes: int
+    final: bool = Field(description="活動已結束，資料不再變動")
+    total_checkins: int
+    total_checkouts: int
+    buckets: List[ArrivalBucket]
+
+
+# 單一系列活動的最大場次（約三年的每日活動）
+MAX_SERIES_OCCURRENCES = 1100
+
+
 class EventSeriesCreate(BaseModel):
     """系列活動創建請求"""
     event_base: EventBase
     start_date: datetime = Field(..., description="系列開始日期")
-    end_date: datetime = Field(..., description="系列結束日期")
-    days_of_week: List[int] = Field(..., description="每週幾 (0-6, 0 是週一)")
+    end_date: Optional[datetime] = Field(None, description="系列結束日期（與 count 至少提供一個）")
+    frequency: str = Field(default="weekly", description="重複頻率: daily 或 weekly")
+    interval: int = Field(default=1, ge=1, description="每隔幾天/幾週")
+    days_of_week: List[int] = Field(default=[], description="每週幾 (0-6, 0 是週一)，未提供時使用開始日期的星期")
+    count: Optional[int] = Field(None, ge=1, le=MAX_SERIES_OCCURRENCES, description="重複次數")
+    exclude_dates: List[date] = Field(default=[], description="排除的日期")
     start_time_local: str = Field(..., description="開始時間 (HH:mm)")
     end_time_local: str = Field(..., description="結束時間 (HH:mm)")
+
+    @model_validator(mode="after")
+    def validate_range(self) -> "EventSeriesCreate":
+        """驗證結束日期或次數至少提供一個"""
+        if self.end_date is None and self.count is None:
+            raise ValueError("必須提供結束日期或重複次數")
+        return self
+
+
+class EventSeriesUpdate(BaseModel):
+    """系列活動批次更新請求（未提供的欄位不變更）"""
+    name: Optional[str] = Field(None, min_length=1)
+    description: Optional[str] = None
+    location: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    radius: Optional[int] = None
+    max_participants: Optional[int] = Field(None, ge=1)
+    event_type: Optional[str] = None
+    roster_only: Optional[bool] = None
+    location_validation: Optional[bool] = None
+    require_checkout: Optional[bool] = None
+    checkout_mode: Optional[str] = None
+    checkout_duration: Optional[int] = None
+    visibility: Optional[str] = None
+    template_ids: Optional[List[str]] = Field(None, description="取代各場次的表單範本")
+    start_time_local: Optional[str] = Field(None, description="各場次改為此開始時間 (HH:mm，台北時間)")
+    end_time_local: Optional[str] = Field(None, description="各場次改為此結束時間 (HH:mm，台北時間)")
+    shift_minutes: Optional[int] = Field(None, description="各場次整體平移的分鐘數")
+
+    @field_validator('name')
+    @classmethod
+    def validate_name(cls, v: Optional[str]) -> str:
+        """活動名稱不可為空（明確傳入 null 時拒絕，未提供時不變更）"""
+        if v is None:
+            raise ValueError('活動名稱不能為空')
+        return v
+
+    @model_validator(mode="after")
+    def validate_schedule(self) -> "EventSeriesUpdate":
+        """驗證時間調整參數"""
+        if (self.start_time_local is None) != (self.end_time_local is None):
+            raise ValueError("start_time_local 與 end_time_local 必須同時提供")
+        if self.start_time_local is not None and self.shift_minutes is not None:
+            raise ValueError("不能同時指定新時間與平移分鐘數")
+        return self
+
+
+class EventSeriesBulkResponse(BaseModel):
+    """系列活動批次操作響應"""
+    success: bool = True
+    affected: int = Field(description="受影響的場次數")
+    event_ids: List[str] = Field(default=[], description="受影響的活動 ID")
+
+
+class SeriesSession(BaseModel):
+    """系列中的單一場次"""
+    event_id: str
+    name: str
+    start_time: datetime
+    attendees: int = Field(description="出席人數")
+
+
+class SeriesAttendee(BaseModel):
+    """單一用戶的系列出席情況"""
+    user_id: int
+    name: str
+    company: str
+    department: str
+    attended: int = Field(description="出席場次數")
+    rate: float = Field(description="出席率 (0-1)")
+    completed: bool = Field(description="是否達到完成門檻")
+    pattern: str = Field(description="出席字串，第 i 個字元為第 i 場（1 出席 / 0 缺席）")
+
+
+class SeriesAttendanceReport(BaseModel):
+    """系列活動出席矩陣"""
+    series_id: str
+    threshold: float
+    sessions: List[SeriesSession]
+    total_users: int
+    completed_users: int
+    attendees: List[SeriesAttendee]
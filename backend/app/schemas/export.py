@@ -0,0 +1,32 @@
+"""
+匯出檔案相關 Schema
+"""
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class ExportStorageMetrics(BaseModel):
+    """匯出檔案儲存用量（計數類欄位為本 worker 啟動後的累計）"""
+    storage_type: str
+    files: int = Field(description="已登記的匯出檔案數")
+    total_bytes: int = Field(description="已登記檔案的總大小")
+    max_bytes: int = Field(description="容量上限，超過時依最久未使用淘汰")
+    retention_hours: float
+    oldest_access: Optional[datetime] = Field(None, description="最久未使用檔案的最後使用時間")
+    total_reuses: int = Field(description="所有檔案累計被重複匯出重用的次數")
+    dedupe_hits: int
+    dedupe_misses: int
+    evicted_files: int
+    evicted_bytes: int
+    orphans_removed: int
+    last_sweep_at: Optional[datetime] = None
+    last_sweep_seconds: Optional[float] = None
+
+
+class ExportSweepResult(BaseModel):
+    """手動清理結果"""
+    skipped: bool = Field(description="其他 worker 正在清理時略過")
+    evicted: int
+    evicted_bytes: int
+    orphans: int
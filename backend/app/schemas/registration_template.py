@@ -38,3 +38,15 @@ class RegistrationTemplateResponse(RegistrationTemplateBase):
 
     class Config:
         from_attributes = True
+
+
+class RegistrationTemplateSummary(BaseModel):
+    """範本摘要（列表與選單用，不含 fields_schema）"""
+    id: str
+    name: str
+    type: str
+    survey_trigger: Optional[str] = None
+    is_public: bool = False
+    created_by_admin_id: Optional[int] = None
+    field_count: int = Field(0, description="欄位數量")
+    updated_at: Optional[datetime] = None
@@ -0,0 +1,31 @@
+"""
+活動名單相關 Schema
+"""
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+
+class RosterLoadRequest(BaseModel):
+    """批次加入名單請求（三種識別方式可混用）"""
+    user_ids: List[int] = Field(default=[], description="用戶 ID 列表")
+    line_user_ids: List[str] = Field(default=[], description="LINE User ID 列表")
+    phones: List[str] = Field(default=[], description="手機號碼列表")
+
+
+class RosterLoadResponse(BaseModel):
+    """批次加入名單響應"""
+    added: int = Field(description="新加入名單的人數")
+    total: int = Field(description="名單總人數")
+    unmatched: List[str] = Field(default=[], description="找不到對應用戶的識別值")
+
+
+class RosterRemoveRequest(BaseModel):
+    """移除名單請求"""
+    user_ids: Optional[List[int]] = Field(None, description="要移除的用戶 ID，未提供時清空名單")
+
+
+class RosterResponse(BaseModel):
+    """活動名單響應"""
+    event_id: str
+    total: int
+    user_ids: List[int]
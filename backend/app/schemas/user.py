@@ -2,7 +2,7 @@
 User 相關 Schema
 """
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 from pydantic import BaseModel, Field, field_validator
 import re
 
@@ -60,3 +60,20 @@ class UserResponse(UserBase):
 class UserListResponse(BaseModel):
     """User 列表響應"""
     users: list[UserResponse]
+
+
+class UserImportError(BaseModel):
+    """批次匯入錯誤"""
+    row: int = Field(description="檔案中的行號（含表頭）")
+    line_user_id: Optional[str] = None
+    message: str
+
+
+class UserImportResponse(BaseModel):
+    """批次匯入結果"""
+    total: int = Field(description="讀取的資料行數")
+    inserted: int = Field(description="新增的用戶數")
+    updated: int = Field(description="更新的用戶數")
+    skipped: int = Field(description="已存在而略過的用戶數")
+    failed: int = Field(description="驗證失敗的行數")
+    errors: List[UserImportError] = Field(default=[], description="錯誤明細（最多 1000 筆）")
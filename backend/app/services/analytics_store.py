@@ -0,0 +1,404 @@
+"""
+出席分析快照
+以 NumPy 欄位陣列在記憶體中保存所有簽到記錄（含封存表）與用戶單位/部門，
+依 checkins.updated_at / users.updated_at 增量更新，跨活動的分組統計直接在程序內計算，
+不需要逐一匯出活動
+
+每個 worker 各自持有一份快照，查詢時若超過 ANALYTICS_REFRESH_SECONDS 才增量更新；
+刪除的簽到記錄無法從 updated_at 得知，每 ANALYTICS_FULL_REFRESH_SECONDS 完整重建一次
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+# 增量更新時回看的時間，涵蓋查詢期間尚未提交的交易
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# 串流讀取簽到記錄的批次大小
+FETCH_BATCH = 50000
+
+GROUP_BY_OPTIONS = ("department", "company", "event", "series")
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class Dictionary:
+    """字串字典編碼，值轉為連續整數代碼"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def _epoch(value: Optional[datetime]) -> int:
+    if value is None:
+        return 0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int((value - EPOCH).total_seconds())
+
+
+def _upsert(keys: np.ndarray, new_keys: np.ndarray):
+    """
+    在已排序的 keys 中查找 new_keys，回傳 (found, positions)：
+    found 標記已存在的項目，positions[found] 為其在 keys 中的位置
+    """
+    positions = np.searchsorted(keys, new_keys)
+    clipped = np.minimum(positions, max(len(keys) - 1, 0))
+    found = (positions < len(keys)) & (keys[clipped] == new_keys) if len(keys) else np.zeros(len(new_keys), bool)
+    return found, clipped
+
+
+class AttendanceStore:
+    """簽到記錄欄位式快照"""
+
+    def __init__(self, refresh_seconds: float, full_refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self.full_refresh_seconds = full_refresh_seconds
+        self._lock = asyncio.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        # 簽到記錄（依 checkin_id 排序）
+        self.checkin_ids = np.empty(0, np.int64)
+        self.event_codes = np.empty(0, np.int32)
+        self.user_ids = np.empty(0, np.int64)
+        self.checked_out = np.empty(0, bool)
+
+        # 活動（以代碼索引）
+        self.events = Dictionary()
+        self.series = Dictionary()
+        self.event_names: List[str] = []
+        self.event_start = np.empty(0, np.int64)
+        self.event_series = np.empty(0, np.int32)
+        self.event_owner = np.empty(0, np.int64)
+        self.event_alive = np.empty(0, bool)
+
+        # 用戶（依 user_id 排序）
+        self.companies = Dictionary()
+        self.departments = Dictionary()
+        self.users = np.empty(0, np.int64)
+        self.user_company = np.empty(0, np.int32)
+        self.user_department = np.empty(0, np.int32)
+
+        self.checkins_watermark: Optional[datetime] = None
+        self.users_watermark: Optional[datetime] = None
+        self.refreshed_at: Optional[float] = None
+        self.rebuilt_at: Optional[float] = None
+        self.snapshot_time: Optional[datetime] = None
+
+    @property
+    def size(self) -> int:
+        return len(self.checkin_ids)
+
+    async def ensure_fresh(self, db: AsyncSession, force: bool = False) -> None:
+        """視快照新舊程度增量更新或完整重建"""
+        async with self._lock:
+            now = time.monotonic()
+            if self.rebuilt_at is None or now - self.rebuilt_at >= self.full_refresh_seconds:
+                await self._rebuild(db)
+            elif force or now - self.refreshed_at >= self.refresh_seconds:
+                await self._refresh(db)
+
+    async def _rebuild(self, db: AsyncSession) -> None:
+        started = time.perf_counter()
+        self._reset()
+        await self._load_events(db)
+        await self._load_users(db, None)
+        await self._load_checkins(db, None)
+        self.rebuilt_at = self.refreshed_at = time.monotonic()
+        print(f"📊 出席分析快照重建完成：{self.size} 筆簽到 ({time.perf_counter() - started:.2f}s)")
+
+    async def _refresh(self, db: AsyncSession) -> None:
+        await self._load_events(db)
+        await self._load_users(db, self.users_watermark)
+        await self._load_checkins(db, self.checkins_watermark)
+        self.refreshed_at = time.monotonic()
+
+    async def _load_events(self, db: AsyncSession) -> None:
+        """活動資料量小，每次整批重新載入"""
+        result = await db.execute(text(
+            "SELECT id, name, start_time, series_id, created_by, deleted_at IS NULL FROM events"
+        ))
+        rows = result.all()
+        for row in rows:
+            self.events.encode(row[0])
+
+        count = len(self.events)
+        names = [""] * count
+        start = np.zeros(count, np.int64)
+        series = np.full(count, -1, np.int32)
+        owner = np.zeros(count, np.int64)
+        alive = np.zeros(count, bool)
+        for event_id, name, start_time, series_id, created_by, not_deleted in rows:
+            code = self.events.codes[event_id]
+            names[code] = name
+            start[code] = _epoch(start_time)
+            series[code] = self.series.encode(series_id) if series_id else -1
+            owner[code] = created_by
+            alive[code] = not_deleted
+
+        self.event_names = names
+        self.event_start, self.event_series, self.event_owner, self.event_alive = start, series, owner, alive
+
+    async def _load_users(self, db: AsyncSession, since: Optional[datetime]) -> None:
+        sql = "SELECT id, company, department, COALESCE(updated_at, created_at) FROM users"
+        params = {}
+        if since is not None:
+            # 條件須與 ix_users_modified_at 的運算式一致才會使用索引
+            sql += " WHERE COALESCE(updated_at, created_at) >= :since"
+            params["since"] = since - WATERMARK_OVERLAP
+        result = await db.execute(text(sql), params)
+        rows = result.all()
+        if not rows:
+            return
+
+        ids = np.fromiter((r[0] for r in rows), np.int64, len(rows))
+        company = np.fromiter((self.companies.encode(r[1] or "") for r in rows), np.int32, len(rows))
+        department = np.fromiter((self.departments.encode(r[2] or "") for r in rows), np.int32, len(rows))
+        latest = max((r[3] for r in rows if r[3]), default=None)
+        if latest and (self.users_watermark is None or latest > self.users_watermark):
+            self.users_watermark = latest
+
+        found, positions = _upsert(self.users, ids)
+        self.user_company[positions[found]] = company[found]
+        self.user_department[positions[found]] = department[found]
+
+        added = ~found
+        if added.any():
+            users = np.concatenate([self.users, ids[added]])
+            order = np.argsort(users, kind="stable")
+            self.users = users[order]
+            self.user_company = np.concatenate([self.user_company, company[added]])[order]
+            self.user_department = np.concatenate([self.user_department, department[added]])[order]
+
+    async def _load_checkins(self, db: AsyncSession, since: Optional[datetime]) -> None:
+        columns = "id, event_id, user_id, checkout_time IS NOT NULL, COALESCE(updated_at, created_at)"
+        if since is None:
+            # 完整重建時一併讀取封存表（兩表的 id 不重疊）
+            sql = f"SELECT {columns} FROM checkins UNION ALL SELECT {columns} FROM checkins_archive"
+            params = {}
+        else:
+            # 條件須與 ix_checkins_modified_at（各分區皆有）的運算式一致才會使用索引
+            sql = f"SELECT {columns} FROM checkins WHERE COALESCE(updated_at, created_at) >= :since"
+            params = {"since": since - WATERMARK_OVERLAP}
+
+        watermark = since
+        result = await db.stream(text(sql), params)
+        async for part in result.partitions(FETCH_BATCH):
+            n = len(part)
+            ids = np.fromiter((r[0] for r in part), np.int64, n)
+            events = np.fromiter((self.events.encode(r[1]) for r in part), np.int32, n)
+            users = np.fromiter((r[2] for r in part), np.int64, n)
+            checked_out = np.fromiter((bool(r[3]) for r in part), bool, n)
+            latest = max((r[4] for r in part if r[4]), default=None)
+            if latest and (watermark is None or latest > watermark):
+                watermark = latest
+            self._merge_checkins(ids, events, users, checked_out)
+
+        self.checkins_watermark = watermark
+        self.snapshot_time = datetime.now(timezone.utc)
+        # 新出現的活動代碼（簽到早於活動載入）補齊活動陣列
+        self._pad_events()
+
+    def _merge_checkins(self, ids, events, users, checked_out) -> None:
+        found, positions = _upsert(self.checkin_ids, ids)
+        self.event_codes[positions[found]] = events[found]
+        self.user_ids[positions[found]] = users[found]
+        self.checked_out[positions[found]] = checked_out[found]
+
+        added = ~found
+        if not added.any():
+            return
+        checkin_ids = np.concatenate([self.checkin_ids, ids[added]])
+        event_codes = np.concatenate([self.event_codes, events[added]])
+        user_ids = np.concatenate([self.user_ids, users[added]])
+        flags = np.concatenate([self.checked_out, checked_out[added]])
+        if len(checkin_ids) > 1 and not (np.diff(checkin_ids) > 0).all():
+            order = np.argsort(checkin_ids, kind="stable")
+            checkin_ids, event_codes, user_ids, flags = checkin_ids[order], event_codes[order], user_ids[order], flags[order]
+        self.checkin_ids, self.event_codes, self.user_ids, self.checked_out = checkin_ids, event_codes, user_ids, flags
+
+    def _pad_events(self) -> None:
+        missing = len(self.events) - len(self.event_start)
+        if missing <= 0:
+            return
+        self.event_names += [""] * missing
+        self.event_start = np.concatenate([self.event_start, np.zeros(missing, np.int64)])
+        self.event_series = np.concatenate([self.event_series, np.full(missing, -1, np.int32)])
+        self.event_owner = np.concatenate([self.event_owner, np.zeros(missing, np.int64)])
+        self.event_alive = np.concatenate([self.event_alive, np.zeros(missing, bool)])
+
+    def _scope(
+        self,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        series_id: Optional[str],
+        owner_id: Optional[int]
+    ) -> np.ndarray:
+        """回傳符合條件的活動代碼遮罩"""
+        events = self.event_alive.copy()
+        if start is not None:
+            events &= self.event_start >= _epoch(start)
+        if end is not None:
+            events &= self.event_start < _epoch(end)
+        if series_id is not None:
+            code = self.series.codes.get(series_id, -2)
+            events &= self.event_series == code
+        if owner_id is not None:
+            events &= self.event_owner == owner_id
+        return events
+
+    def attendance(
+        self,
+        group_by: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        series_id: Optional[str] = None,
+        owner_id: Optional[int] = None
+    ) -> dict:
+        """
+        依 group_by 分組統計出席
+
+        每組回傳：簽到筆數、不重複出席人數、涉及活動數、重複出席人數（出席 2 場以上），
+        依單位/部門分組時另附該組總人數與出席率（簽到筆數 / (總人數 × 範圍內活動數)）
+        """
+        in_scope = self._scope(start, end, series_id, owner_id)
+        mask = in_scope[self.event_codes]
+
+        # 簽到記錄對應到用戶陣列索引（程序內 join）
+        user_index = np.searchsorted(self.users, self.user_ids)
+        user_index = np.minimum(user_index, max(len(self.users) - 1, 0))
+        if len(self.users):
+            mask &= self.users[user_index] == self.user_ids
+        else:
+            mask[:] = False
+
+        events = self.event_codes[mask].astype(np.int64)
+        users = user_index[mask].astype(np.int64)
+
+        if group_by == "department":
+            keys, labels = self.user_department[users].astype(np.int64), self.departments.values
+        elif group_by == "company":
+            keys, labels = self.user_company[users].astype(np.int64), self.companies.values
+        elif group_by == "series":
+            keys = self.event_series[events].astype(np.int64)
+            keep = keys >= 0
+            keys, events, users = keys[keep], events[keep], users[keep]
+            labels = self.series.values
+        else:
+            keys, labels = events, self.event_names
+
+        groups = len(labels)
+        n_users = max(len(self.users), 1)
+        n_events = max(len(self.events), 1)
+
+        checkins = np.bincount(keys, minlength=groups)
+        group_user = np.unique(keys * n_users + users)
+        attendees = np.bincount(group_user // n_users, minlength=groups)
+        event_count = np.bincount(np.unique(keys * n_events + events) // n_events, minlength=groups)
+
+        # 同組同一用戶出席的不同活動數 ≥ 2 視為重複出席
+        group_user_event = np.unique((keys * n_users + users) * n_events + events)
+        per_user, visits = np.unique(group_user_event // n_events, return_counts=True)
+        repeat = np.bincount(per_user[visits >= 2] // n_users, minlength=groups)
+
+        population = None
+        if group_by == "department":
+            population = np.bincount(self.user_department, minlength=groups)
+        elif group_by == "company":
+            population = np.bincount(self.user_company, minlength=groups)
+        total_events = int(in_scope.sum())
+
+        rows = []
+        for code in np.flatnonzero(checkins):
+            row = {
+                "key": self.events.values[code] if group_by == "event" else labels[code],
+                "label": labels[code],
+                "checkins": int(checkins[code]),
+                "attendees": int(attendees[code]),
+                "events": int(event_count[code]),
+                "repeat_attendees": int(repeat[code]),
+                "population": None,
+                "attendance_rate": None,
+            }
+            if population is not None:
+                row["population"] = int(population[code])
+                if population[code] and total_events:
+                    row["attendance_rate"] = round(float(checkins[code]) / (population[code] * total_events), 4)
+            rows.append(row)
+        rows.sort(key=lambda r: r["checkins"], reverse=True)
+
+        return {
+            "group_by": group_by,
+            "total_checkins": int(mask.sum()),
+            "total_attendees": int(len(np.unique(users))),
+            "total_events": total_events,
+            "snapshot_time": self.snapshot_time,
+            "rows": rows,
+        }
+
+    def event_checkin_counts(self, event_codes: np.ndarray) -> np.ndarray:
+        """指定活動的簽到筆數"""
+        counts = np.bincount(self.event_codes, minlength=len(self.events))
+        return counts[event_codes]
+
+    def events_in_scope(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        series_id: Optional[str] = None,
+        owner_id: Optional[int] = None
+    ) -> np.ndarray:
+        """範圍內的活動代碼，依開始時間排序"""
+        codes = np.flatnonzero(self._scope(start, end, series_id, owner_id))
+        return codes[np.argsort(self.event_start[codes], kind="stable")]
+
+
+attendance_store = AttendanceStore(
+    refresh_seconds=settings.ANALYTICS_REFRESH_SECONDS,
+    full_refresh_seconds=settings.ANALYTICS_FULL_REFRESH_SECONDS,
+)
+
+
+async def no_show_counts(db: AsyncSession, event_ids: List[str]) -> Dict[str, tuple]:
+    """
+    各活動名單人數與未出席人數 (roster, no_shows)
+
+    名單只存在資料庫，以單一分組查詢計算；已封存活動的簽到記錄一併比對
+    """
+    if not event_ids:
+        return {}
+    result = await db.execute(
+        text("""
+            SELECT r.event_id,
+                   count(*) AS roster,
+                   count(*) FILTER (
+                       WHERE NOT EXISTS (SELECT 1 FROM checkins c WHERE c.event_id = r.event_id AND c.user_id = r.user_id)
+                         AND NOT EXISTS (SELECT 1 FROM checkins_archive a WHERE a.event_id = r.event_id AND a.user_id = r.user_id)
+                   ) AS no_shows
+            FROM event_roster r
+            WHERE r.event_id = ANY(:event_ids)
+            GROUP BY r.event_id
+        """),
+        {"event_ids": event_ids}
+    )
+    return {row[0]: (row[1], row[2]) for row in result.all()}
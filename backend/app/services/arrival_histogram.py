@@ -0,0 +1,138 @@
+"""
+活動到場曲線
+以 generate_series 產生時間區間、在資料庫內分組計算每個區間的簽到/簽退人數，只回傳區間統計；
+已結束的活動結果不會再變動，永久快取（LRU 上限），進行中的活動只快取 ARRIVALS_LIVE_TTL 秒
+"""
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import Event
+from app.services.checkin_partitions import checkin_model_for
+
+# 單次查詢最多的區間數
+MAX_BUCKETS = 2000
+
+# 已結束活動的快取數量上限
+MAX_FINAL_ENTRIES = 1024
+
+
+class ArrivalCache:
+    """到場曲線快取：key 為 (event_id, 區間秒數)"""
+
+    def __init__(self, live_ttl: float, max_final: int):
+        self.live_ttl = live_ttl
+        self.max_final = max_final
+        self._final: "OrderedDict[Tuple[str, int], dict]" = OrderedDict()
+        self._live: dict = {}
+
+    def get(self, key: Tuple[str, int]) -> Optional[dict]:
+        if key in self._final:
+            self._final.move_to_end(key)
+            return self._final[key]
+        cached = self._live.get(key)
+        if cached and time.monotonic() - cached[1] < self.live_ttl:
+            return cached[0]
+        return None
+
+    def put(self, key: Tuple[str, int], value: dict, final: bool) -> None:
+        if final:
+            self._live.pop(key, None)
+            self._final[key] = value
+            self._final.move_to_end(key)
+            while len(self._final) > self.max_final:
+                self._final.popitem(last=False)
+        else:
+            self._live[key] = (value, time.monotonic())
+
+    def invalidate(self, event_id: str) -> None:
+        for store in (self._final, self._live):
+            for key in [k for k in store if k[0] == event_id]:
+                del store[key]
+
+
+arrival_cache = ArrivalCache(live_ttl=settings.ARRIVALS_LIVE_TTL, max_final=MAX_FINAL_ENTRIES)
+
+
+def is_final(event: Event) -> bool:
+    """活動結束超過 ARRIVALS_FINAL_AFTER_MINUTES（保留簽退時間）後視為資料不再變動"""
+    end_time = event.end_time
+    if end_time.tzinfo is None:
+        end_time = end_time.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) >= end_time + timedelta(minutes=settings.ARRIVALS_FINAL_AFTER_MINUTES)
+
+
+async def arrival_histogram(db: AsyncSession, event: Event, interval_seconds: int) -> dict:
+    """
+    計算活動的到場曲線
+
+    Returns:
+        {"buckets": [(區間開始, 簽到數, 簽退數), ...], "final": bool}
+
+    Raises:
+        ValueError: 區間數超過 MAX_BUCKETS
+    """
+    key = (event.id, interval_seconds)
+    cached = arrival_cache.get(key)
+    if cached is not None:
+        return cached
+
+    final = is_final(event)
+    table = checkin_model_for(event).__tablename__
+    params = {"event_id": event.id, "width": interval_seconds}
+
+    # 先取範圍（走 (event_id, checkin_time) 索引），避免產生過多區間
+    result = await db.execute(
+        text(f"""
+            SELECT min(checkin_time), greatest(max(checkin_time), max(checkout_time))
+            FROM {table} WHERE event_id = :event_id
+        """),
+        {"event_id": event.id}
+    )
+    low, high = result.one()
+    if low is None:
+        value = {"buckets": [], "final": final}
+        arrival_cache.put(key, value, final)
+        return value
+
+    if (high - low).total_seconds() / interval_seconds > MAX_BUCKETS:
+        raise ValueError(f"區間數超過上限 {MAX_BUCKETS}，請加大區間")
+
+    result = await db.execute(
+        text(f"""
+            WITH src AS (
+                SELECT checkin_time, checkout_time FROM {table} WHERE event_id = :event_id
+            ),
+            buckets AS (
+                SELECT generate_series(
+                    to_timestamp(floor(extract(epoch FROM CAST(:low AS timestamptz)) / CAST(:width AS integer)) * CAST(:width AS integer)),
+                    CAST(:high AS timestamptz),
+                    make_interval(secs => CAST(:width AS integer))
+                ) AS bucket
+            ),
+            arrivals AS (
+                SELECT to_timestamp(floor(extract(epoch FROM checkin_time) / CAST(:width AS integer)) * CAST(:width AS integer)) AS bucket,
+                       count(*) AS n
+                FROM src GROUP BY 1
+            ),
+            departures AS (
+                SELECT to_timestamp(floor(extract(epoch FROM checkout_time) / CAST(:width AS integer)) * CAST(:width AS integer)) AS bucket,
+                       count(*) AS n
+                FROM src WHERE checkout_time IS NOT NULL GROUP BY 1
+            )
+            SELECT b.bucket, COALESCE(a.n, 0), COALESCE(d.n, 0)
+            FROM buckets b
+            LEFT JOIN arrivals a ON a.bucket = b.bucket
+            LEFT JOIN departures d ON d.bucket = b.bucket
+            ORDER BY b.bucket
+        """),
+        {**params, "low": low, "high": high}
+    )
+    value = {"buckets": [tuple(row) for row in result.all()], "final": final}
+    arrival_cache.put(key, value, final)
+    return value
@@ -0,0 +1,104 @@
+"""
+活動名額控制
+以 events.checkin_count 計數器搭配帶條件的 UPDATE 原子佔用名額，不需要 COUNT(*)；
+本進程記住已額滿的活動，在 CAPACITY_FULL_TTL 秒內直接拒絕，不再競爭活動行鎖
+"""
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+
+
+class CapacityTracker:
+    """記錄本進程已知額滿的活動"""
+
+    def __init__(self, full_ttl: float):
+        self.full_ttl = full_ttl
+        self._full: Dict[str, float] = {}
+
+    def is_full(self, event_id: str) -> bool:
+        marked_at = self._full.get(event_id)
+        if marked_at is None:
+            return False
+        if time.monotonic() - marked_at >= self.full_ttl:
+            # 過期後重新以資料庫為準（可能有交易回滾歸還名額，或上限被調高）
+            del self._full[event_id]
+            return False
+        return True
+
+    def mark_full(self, event_id: str) -> None:
+        self._full[event_id] = time.monotonic()
+
+    def invalidate(self, event_id: str) -> None:
+        self._full.pop(event_id, None)
+
+
+capacity_tracker = CapacityTracker(full_ttl=settings.CAPACITY_FULL_TTL)
+
+
+async def reserve_seat(db: AsyncSession, event_id: str) -> bool:
+    """
+    原子地佔用一個簽到名額
+
+    以帶條件的 UPDATE 遞增計數器，達到 max_participants 時不更新。
+    UPDATE 會鎖住活動行直到交易結束，因此應作為提交前的最後一個語句；
+    交易回滾時名額也會一併歸還
+
+    Returns:
+        是否成功佔用
+    """
+    if capacity_tracker.is_full(event_id):
+        return False
+
+    result = await db.execute(
+        text(
+            "UPDATE events SET checkin_count = checkin_count + 1 "
+            "WHERE id = :event_id "
+            "AND (max_participants IS NULL OR checkin_count < max_participants) "
+            "RETURNING checkin_count, max_participants"
+        ),
+        {"event_id": event_id}
+    )
+    row = result.one_or_none()
+
+    if row is None:
+        capacity_tracker.mark_full(event_id)
+        return False
+    if row.max_participants is not None and row.checkin_count >= row.max_participants:
+        # 拿到最後一個名額
+        capacity_tracker.mark_full(event_id)
+    return True
+
+
+async def reconcile_checkin_counts(db: AsyncSession, event_ids: Optional[List[str]] = None) -> int:
+    """
+    以實際簽到記錄校正計數器（已封存的活動簽到記錄已移出 checkins，不校正）
+
+    Args:
+        event_ids: 要校正的活動，未提供時校正全部
+
+    Returns:
+        被校正的活動數
+    """
+    condition = "AND e.id = ANY(:event_ids)" if event_ids else ""
+    result = await db.execute(
+        text(
+            "UPDATE events SET checkin_count = actual.cnt "
+            "FROM ("
+            "  SELECT e.id AS event_id, count(c.id) AS cnt FROM events e "
+            "  LEFT JOIN checkins c ON c.event_id = e.id "
+            f"  WHERE e.archived_at IS NULL {condition} GROUP BY e.id"
+            ") AS actual "
+            "WHERE events.id = actual.event_id AND events.checkin_count <> actual.cnt "
+            "RETURNING events.id"
+        ),
+        {"event_ids": event_ids} if event_ids else {}
+    )
+    corrected = list(result.scalars().all())
+    await db.commit()
+    for event_id in corrected:
+        capacity_tracker.invalidate(event_id)
+    return len(corrected)
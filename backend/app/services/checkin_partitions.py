@@ -0,0 +1,214 @@
+"""
+簽到記錄分區與封存
+checkins 依 checkin_time 按月分區（checkins_pYYYYMM，另有 checkins_default 收納超出範圍的資料）；
+活動結束超過 CHECKIN_ARCHIVE_AFTER_MONTHS 個月後，其簽到記錄移至 checkins_archive 冷資料表，
+清空的舊分區直接卸除，線上查詢只會掃描近期分區
+"""
+import asyncio
+from datetime import date, datetime, timezone
+from typing import List, Optional, Type, Union
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.models import Checkin, CheckinArchive, Event
+
+logger = get_logger("checkin_partitions")
+
+# 分區維護間隔（秒）
+MAINTENANCE_INTERVAL = 6 * 3600
+
+# 分區維護的 advisory lock，避免多個 worker 同時建立分區
+PARTITION_LOCK_KEY = 20240602
+
+
+def add_months(month: date, months: int) -> date:
+    """回傳 month 所在月份加上 months 個月後的月初"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"checkins_p{month.year:04d}{month.month:02d}"
+
+
+def checkin_model_for(event: Event) -> Type[Union[Checkin, CheckinArchive]]:
+    """已封存的活動從封存表讀取簽到記錄"""
+    return CheckinArchive if event.archived_at else Checkin
+
+
+async def is_partitioned(conn: Union[AsyncConnection, AsyncSession]) -> bool:
+    result = await conn.execute(
+        text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('checkins')")
+    )
+    return bool(result.scalar())
+
+
+async def ensure_partitions(
+    conn: Union[AsyncConnection, AsyncSession],
+    months_ahead: Optional[int] = None,
+    start: Optional[date] = None
+) -> List[str]:
+    """
+    建立本月（或 start 所在月）到未來 months_ahead 個月的分區（不提交交易）
+
+    Returns:
+        新建立的分區名稱
+    """
+    if not await is_partitioned(conn):
+        return []
+
+    months_ahead = settings.CHECKIN_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    first = (start or datetime.now(timezone.utc).date()).replace(day=1)
+
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": PARTITION_LOCK_KEY})
+    await conn.execute(text("CREATE TABLE IF NOT EXISTS checkins_default PARTITION OF checkins DEFAULT"))
+
+    result = await conn.execute(
+        text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+             "WHERE i.inhparent = 'checkins'::regclass")
+    )
+    existing = set(result.scalars().all())
+
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(first, offset)
+        name = partition_name(month)
+        if name in existing:
+            continue
+        bounds = {"lower": month, "upper": add_months(month, 1)}
+        result = await conn.execute(
+            text("SELECT EXISTS (SELECT 1 FROM checkins_default "
+                 "WHERE checkin_time >= :lower AND checkin_time < :upper)"),
+            bounds
+        )
+        if result.scalar():
+            # default 分區已有該月資料：先建獨立表並搬移資料，再掛上為分區
+            await conn.execute(text(f"CREATE TABLE {name} (LIKE checkins INCLUDING DEFAULTS)"))
+            await conn.execute(
+                text(f"""
+                    WITH moved AS (
+                        DELETE FROM checkins_default
+                        WHERE checkin_time >= :lower AND checkin_time < :upper
+                        RETURNING *
+                    )
+                    INSERT INTO {name} SELECT * FROM moved
+                """),
+                bounds
+            )
+            await conn.execute(text(
+                f"ALTER TABLE checkins ATTACH PARTITION {name} "
+                f"FOR VALUES FROM ('{bounds['lower'].isoformat()}') TO ('{bounds['upper'].isoformat()}')"
+            ))
+        else:
+            await conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF checkins "
+                f"FOR VALUES FROM ('{bounds['lower'].isoformat()}') TO ('{bounds['upper'].isoformat()}')"
+            ))
+        created.append(name)
+    return created
+
+
+async def partition_maintenance_loop() -> None:
+    """
+    背景定期補建未來的月分區，避免長時間運行後新資料落入 default 分區
+    （default 分區一旦有該月資料，就無法再建立該月分區）
+    """
+    from app.database import engine
+
+    while True:
+        try:
+            async with engine.begin() as conn:
+                created = await ensure_partitions(conn)
+            if created:
+                logger.info("建立簽到分區: %s", ", ".join(created))
+        except Exception:
+            logger.exception("簽到分區維護失敗")
+        await asyncio.sleep(MAINTENANCE_INTERVAL)
+
+
+async def archive_old_checkins(
+    db: AsyncSession,
+    older_than_months: Optional[int] = None,
+    batch_events: int = 50,
+    dry_run: bool = False
+) -> dict:
+    """
+    將已結束超過 older_than_months 個月的活動簽到記錄移到封存表
+
+    每批 batch_events 個活動一個交易：複製到 checkins_archive、刪除原記錄、標記 events.archived_at；
+    完成後卸除已清空且整月早於截止日的分區
+
+    Returns:
+        {"events": 活動數, "checkins": 封存筆數, "dropped_partitions": [...]}
+    """
+    older_than_months = settings.CHECKIN_ARCHIVE_AFTER_MONTHS if older_than_months is None else older_than_months
+    cutoff = add_months(datetime.now(timezone.utc).date().replace(day=1), -older_than_months)
+
+    result = await db.execute(
+        text("""
+            SELECT id FROM events
+            WHERE end_time < :cutoff AND archived_at IS NULL
+            ORDER BY end_time
+        """),
+        {"cutoff": cutoff}
+    )
+    event_ids = list(result.scalars().all())
+    summary = {"events": len(event_ids), "checkins": 0, "dropped_partitions": []}
+    if dry_run:
+        return summary
+
+    for i in range(0, len(event_ids), batch_events):
+        batch = event_ids[i:i + batch_events]
+        moved = await db.execute(
+            text("""
+                WITH moved AS (
+                    DELETE FROM checkins WHERE event_id = ANY(:event_ids)
+                    RETURNING id, user_id, event_id, checkin_time, checkout_time, geolocation,
+                              is_valid, status, dynamic_data, created_at, updated_at
+                )
+                INSERT INTO checkins_archive (
+                    id, user_id, event_id, checkin_time, checkout_time, geolocation,
+                    is_valid, status, dynamic_data, created_at, updated_at
+                )
+                SELECT * FROM moved
+                ON CONFLICT (id) DO NOTHING
+            """),
+            {"event_ids": batch}
+        )
+        await db.execute(
+            text("UPDATE events SET archived_at = now() WHERE id = ANY(:event_ids)"),
+            {"event_ids": batch}
+        )
+        await db.commit()
+        summary["checkins"] += moved.rowcount or 0
+        print(f"   📦 已封存 {min(i + batch_events, len(event_ids))}/{len(event_ids)} 個活動")
+
+    summary["dropped_partitions"] = await drop_empty_partitions(db, cutoff)
+    return summary
+
+
+async def drop_empty_partitions(db: AsyncSession, cutoff: date) -> List[str]:
+    """卸除整月早於 cutoff 且已無資料的月分區"""
+    if not await is_partitioned(db):
+        return []
+
+    result = await db.execute(
+        text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+             "WHERE i.inhparent = 'checkins'::regclass AND c.relname LIKE 'checkins\\_p%' ORDER BY 1")
+    )
+    dropped = []
+    for name in result.scalars().all():
+        month = date(int(name[-6:-2]), int(name[-2:]), 1)
+        if add_months(month, 1) > cutoff:
+            continue
+        has_rows = await db.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name})"))
+        if has_rows.scalar():
+            continue
+        await db.execute(text(f"ALTER TABLE checkins DETACH PARTITION {name}"))
+        await db.execute(text(f"DROP TABLE {name}"))
+        await db.commit()
+        dropped.append(name)
+    return dropped
@@ -0,0 +1,164 @@
+"""
+多活動合併匯出
+以單一串流查詢（簽到記錄 UNION ALL 封存記錄，JOIN 用戶，依傳入的活動順序排序）
+取得所有活動的簽到資料，邊讀邊寫：CSV 直接串流輸出並附活動欄位，
+XLSX 以 write-only 模式每個活動一個工作表，記憶體用量不隨筆數增加；
+範本欄位依 export_columns 規劃（CSV 為所有活動範本的聯集，XLSX 每個工作表依該活動的範本）
+"""
+import csv
+import io
+import re
+import tempfile
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette.concurrency import run_in_threadpool
+
+from app.models import Event
+from app.services.export_columns import ColumnPlan, base_values, plan_columns
+
+# 串流讀取的批次大小
+FETCH_BATCH = 5000
+
+# XLSX 串流輸出的區塊大小
+CHUNK_SIZE = 64 * 1024
+
+# XLSX 每個活動一個工作表，過多時建議改用 CSV
+MAX_XLSX_SHEETS = 250
+
+COMBINED_CHECKINS_SQL = """
+    SELECT a.event_id, u.name, u.phone, u.company, u.department,
+           a.checkin_time, a.checkout_time, a.status, a.geolocation,
+           a.dynamic_data, u.profile_data::jsonb AS profile_data
+    FROM (
+        SELECT event_id, user_id, checkin_time, checkout_time, status, geolocation, dynamic_data::jsonb
+        FROM checkins WHERE event_id = ANY(:event_ids)
+        UNION ALL
+        SELECT event_id, user_id, checkin_time, checkout_time, status, geolocation, dynamic_data::jsonb
+        FROM checkins_archive WHERE event_id = ANY(:event_ids)
+    ) a
+    JOIN users u ON u.id = a.user_id
+    ORDER BY array_position(CAST(:event_ids AS VARCHAR[]), a.event_id), a.checkin_time
+"""
+
+_SHEET_INVALID = re.compile(r"[\[\]:*?/\\]")
+
+
+def _checkin_record(plan: ColumnPlan, row) -> list:
+    return plan.extract(base_values(*row[1:9]), row[9], row[10])
+
+
+def sheet_titles(events: List[Event]) -> Dict[str, str]:
+    """每個活動的工作表名稱（Excel 限制 31 字元、不可重複、不可含 []:*?/\\）"""
+    titles: Dict[str, str] = {}
+    used = set()
+    for event in events:
+        base = _SHEET_INVALID.sub("_", f"{event.start_time.strftime('%m%d')} {event.name}")[:31]
+        title, n = base, 2
+        while title.lower() in used:
+            suffix = f" ({n})"
+            title = base[:31 - len(suffix)] + suffix
+            n += 1
+        used.add(title.lower())
+        titles[event.id] = title
+    return titles
+
+
+async def _stream_rows(session_factory: async_sessionmaker, events: List[Event]):
+    """依 events 的順序逐批產生簽到資料列"""
+    async with session_factory() as db:
+        try:
+            result = await db.stream(
+                text(COMBINED_CHECKINS_SQL).columns(dynamic_data=JSONB, profile_data=JSONB),
+                {"event_ids": [e.id for e in events]}
+            )
+            async for part in result.partitions(FETCH_BATCH):
+                yield part
+        finally:
+            await db.rollback()
+
+
+async def iter_combined_csv(session_factory: async_sessionmaker, events: List[Event]) -> AsyncIterator[bytes]:
+    """單一 CSV，每列前加上活動名稱、開始時間與活動 ID（含 BOM，Excel 可直接開啟）"""
+    by_id = {event.id: event for event in events}
+    plan = plan_columns(template for event in events for template in event.templates)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(["活動名稱", "活動開始時間", "活動ID", *plan.headers])
+    yield buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+
+    async for part in _stream_rows(session_factory, events):
+        for row in part:
+            event = by_id[row[0]]
+            writer.writerow([event.name, event.start_time.strftime("%Y-%m-%d %H:%M"), event.id, *_checkin_record(plan, row)])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+
+async def iter_combined_xlsx(session_factory: async_sessionmaker, events: List[Event]) -> AsyncIterator[bytes]:
+    """
+    XLSX：第一個工作表為活動總覽，之後每個活動一個工作表
+    write-only 工作表各自寫入暫存檔，完成後分塊輸出（XLSX 為 zip 格式，必須完整寫完才能開始傳送）
+    """
+    from openpyxl import Workbook
+
+    titles = sheet_titles(events)
+    plans = {event.id: plan_columns(event.templates) for event in events}
+    counts: Dict[str, int] = {event.id: 0 for event in events}
+    workbook = Workbook(write_only=True)
+    summary = workbook.create_sheet("活動總覽")
+
+    # 依查詢順序建立工作表；沒有簽到記錄的活動也保留空白工作表
+    position = 0
+
+    def open_sheets_until(event_id: Optional[str]):
+        nonlocal position
+        sheet = None
+        while position < len(events):
+            event = events[position]
+            sheet = workbook.create_sheet(titles[event.id])
+            sheet.append(plans[event.id].headers)
+            position += 1
+            if event.id == event_id:
+                return sheet
+        return sheet
+
+    current_id, current_sheet = None, None
+    async for part in _stream_rows(session_factory, events):
+        for row in part:
+            event_id = row[0]
+            if event_id != current_id:
+                current_id, current_sheet = event_id, open_sheets_until(event_id)
+            current_sheet.append(_checkin_record(plans[event_id], row))
+            counts[event_id] += 1
+    open_sheets_until(None)
+
+    summary.append(["活動名稱", "開始時間", "結束時間", "地點", "簽到人數", "工作表"])
+    for event in events:
+        summary.append([
+            event.name,
+            event.start_time.strftime("%Y-%m-%d %H:%M"),
+            event.end_time.strftime("%Y-%m-%d %H:%M") if event.end_time else "",
+            event.location or "",
+            counts[event.id],
+            titles[event.id],
+        ])
+
+    with tempfile.TemporaryFile() as f:
+        await run_in_threadpool(workbook.save, f)
+        f.seek(0)
+        while chunk := await run_in_threadpool(f.read, CHUNK_SIZE):
+            yield chunk
+
+
+def combined_filename(series_id: Optional[str], extension: str) -> str:
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    scope = f"series_{series_id}" if series_id else "events"
+    return f"checkins_{scope}_{timestamp}.{extension}"
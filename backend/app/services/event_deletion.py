@@ -0,0 +1,102 @@
+"""
+活動刪除
+刪除以集合式 SQL 完成：簽到記錄、名單與範本關聯由資料庫 ON DELETE CASCADE 一併刪除，
+不再由 ORM 逐筆載入簽到記錄；可選擇先將簽到記錄封存到 checkins_archive，或改為軟刪除
+"""
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.http_cache import invalidate_event_responses
+from app.database import mark_recent_write
+from app.services.arrival_histogram import arrival_cache
+from app.services.capacity_service import capacity_tracker
+from app.services.roster_service import roster_cache
+
+
+async def archive_checkins(db: AsyncSession, event_ids: List[str]) -> int:
+    """
+    將活動的簽到記錄複製到封存表（不提交交易）
+
+    Returns:
+        封存的筆數
+    """
+    if not event_ids:
+        return 0
+    result = await db.execute(
+        text("""
+            INSERT INTO checkins_archive (
+                id, user_id, event_id, checkin_time, checkout_time, geolocation,
+                is_valid, status, dynamic_data, created_at, updated_at
+            )
+            SELECT id, user_id, event_id, checkin_time, checkout_time, geolocation,
+                   is_valid, status, dynamic_data, created_at, updated_at
+            FROM checkins
+            WHERE event_id = ANY(:event_ids)
+            ON CONFLICT (id) DO NOTHING
+        """),
+        {"event_ids": event_ids}
+    )
+    return result.rowcount or 0
+
+
+async def delete_events(db: AsyncSession, event_ids: List[str], archive: bool = False) -> List[str]:
+    """
+    以單一 DELETE 刪除活動，關聯資料由外鍵串聯刪除（不提交交易）
+
+    Args:
+        archive: 刪除前先封存簽到記錄
+
+    Returns:
+        實際刪除的活動 ID
+    """
+    if not event_ids:
+        return []
+    if archive:
+        await archive_checkins(db, event_ids)
+    result = await db.execute(
+        text("DELETE FROM events WHERE id = ANY(:event_ids) RETURNING id"),
+        {"event_ids": event_ids}
+    )
+    return list(result.scalars().all())
+
+
+async def soft_delete_events(db: AsyncSession, event_ids: List[str]) -> List[str]:
+    """標記活動為已刪除，保留所有資料（不提交交易）"""
+    if not event_ids:
+        return []
+    result = await db.execute(
+        text("""
+            UPDATE events SET deleted_at = now()
+            WHERE id = ANY(:event_ids) AND deleted_at IS NULL
+            RETURNING id
+        """),
+        {"event_ids": event_ids}
+    )
+    return list(result.scalars().all())
+
+
+async def restore_events(db: AsyncSession, event_ids: List[str]) -> List[str]:
+    """還原軟刪除的活動（不提交交易）"""
+    if not event_ids:
+        return []
+    result = await db.execute(
+        text("""
+            UPDATE events SET deleted_at = NULL
+            WHERE id = ANY(:event_ids) AND deleted_at IS NOT NULL
+            RETURNING id
+        """),
+        {"event_ids": event_ids}
+    )
+    return list(result.scalars().all())
+
+
+def forget_events(event_ids: List[str]) -> None:
+    """提交後清除本進程對這些活動的快取狀態"""
+    invalidate_event_responses(*event_ids)
+    for event_id in event_ids:
+        mark_recent_write(event_id)
+        capacity_tracker.invalidate(event_id)
+        roster_cache.invalidate(event_id)
+        arrival_cache.invalidate(event_id)
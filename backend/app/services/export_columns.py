@@ -0,0 +1,158 @@
+"""
+匯出欄位規劃
+由活動範本的 fields_schema 一次決定動態欄位與順序（每個範本版本的欄位清單會快取），
+產生的 ColumnPlan 以預先計算好的 (來源, key) 清單攤平每一列，
+不必逐列檢查 dynamic_data / profile_data 有哪些 key，欄位很多時匯出仍然快速且欄位順序固定
+"""
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# 固定欄位（簽到記錄與用戶基本資料）
+BASE_HEADER = ["姓名", "手機", "單位", "部門", "簽到時間", "簽退時間", "狀態", "位置"]
+
+# 範本欄位的排列順序，與簽到頁面表單一致：註冊表單 → 開始調查 → 基本資料擴充 → 結束調查
+_TEMPLATE_ORDER = {
+    ("registration", None): 0,
+    ("survey", "course_start"): 1,
+    ("profile_extension", None): 2,
+    ("survey", "course_end"): 3,
+}
+
+# 各版本範本欄位的快取上限
+MAX_CACHED_TEMPLATES = 2048
+
+DYNAMIC = 0  # 來自 checkins.dynamic_data
+PROFILE = 1  # 來自 users.profile_data
+
+
+class TemplateField(NamedTuple):
+    source: int
+    key: str
+    label: str
+    template_name: str
+
+
+class ColumnPlan:
+    """固定欄位 + 範本欄位的輸出欄位順序與攤平方式"""
+
+    def __init__(self, fields: Sequence[TemplateField]):
+        self.headers = list(BASE_HEADER)
+        self._getters: List[Tuple[int, str]] = []
+        used = set(self.headers)
+        for field in fields:
+            header = field.label
+            if header in used:
+                header = f"{field.label}（{field.template_name}）"
+            n = 2
+            while header in used:
+                header = f"{field.label}（{field.template_name} {n}）"
+                n += 1
+            used.add(header)
+            self.headers.append(header)
+            self._getters.append((field.source, field.key))
+
+    def extract(self, base: list, dynamic_data: Optional[dict], profile_data: Optional[dict]) -> list:
+        """固定欄位值加上依計畫順序取出的範本欄位值"""
+        sources = (dynamic_data or {}, profile_data or {})
+        return base + [format_value(sources[source].get(key)) for source, key in self._getters]
+
+    def extract_dict(self, base: list, dynamic_data: Optional[dict], profile_data: Optional[dict]) -> Dict[str, Any]:
+        return dict(zip(self.headers, self.extract(base, dynamic_data, profile_data)))
+
+
+def format_value(value: Any) -> Any:
+    """表單回答轉為儲存格值（複選以頓號連接）"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "是" if value else "否"
+    if isinstance(value, (list, tuple)):
+        return "、".join(str(v) for v in value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def format_time(value: Optional[datetime]) -> str:
+    return value.strftime("%Y-%m-%d %H:%M:%S") if value else ""
+
+
+def base_values(
+    name: str,
+    phone: Optional[str],
+    company: Optional[str],
+    department: Optional[str],
+    checkin_time: Optional[datetime],
+    checkout_time: Optional[datetime],
+    status: Optional[str],
+    geolocation: Optional[str],
+) -> list:
+    return [
+        name, phone or "", company or "", department or "",
+        format_time(checkin_time), format_time(checkout_time), status or "", geolocation or "",
+    ]
+
+
+def _template_version(template) -> tuple:
+    return (template.id, template.updated_at or template.created_at)
+
+
+_template_fields: Dict[tuple, Tuple[TemplateField, ...]] = {}
+_plans: Dict[tuple, ColumnPlan] = {}
+
+
+def template_fields(template) -> Tuple[TemplateField, ...]:
+    """範本的匯出欄位（依範本 id 與更新時間快取）"""
+    version = _template_version(template)
+    cached = _template_fields.get(version)
+    if cached is not None:
+        return cached
+
+    source = PROFILE if template.type == "profile_extension" else DYNAMIC
+    fields = []
+    for field in template.fields_schema or []:
+        if not isinstance(field, dict) or not field.get("name"):
+            continue
+        fields.append(TemplateField(
+            source=source,
+            key=field["name"],
+            label=str(field.get("label") or field["name"]),
+            template_name=template.name,
+        ))
+
+    if len(_template_fields) >= MAX_CACHED_TEMPLATES:
+        _template_fields.clear()
+        _plans.clear()
+    cached = _template_fields[version] = tuple(fields)
+    return cached
+
+
+def _template_sort_key(template) -> tuple:
+    trigger = template.survey_trigger if template.type == "survey" else None
+    return (_TEMPLATE_ORDER.get((template.type, trigger), len(_TEMPLATE_ORDER)), template.name, template.id)
+
+
+def plan_columns(templates: Iterable) -> ColumnPlan:
+    """
+    由範本決定輸出欄位；同一個欄位名稱（相同來源）只輸出一次
+    """
+    ordered = sorted({t.id: t for t in templates}.values(), key=_template_sort_key)
+    plan_key = tuple(_template_version(t) for t in ordered)
+    plan = _plans.get(plan_key)
+    if plan is not None:
+        return plan
+
+    seen = set()
+    fields = []
+    for template in ordered:
+        for field in template_fields(template):
+            if (field.source, field.key) in seen:
+                continue
+            seen.add((field.source, field.key))
+            fields.append(field)
+
+    if len(_plans) >= MAX_CACHED_TEMPLATES:
+        _plans.clear()
+    plan = _plans[plan_key] = ColumnPlan(fields)
+    return plan
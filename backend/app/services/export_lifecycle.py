@@ -0,0 +1,225 @@
+"""
+匯出檔案生命週期
+匯出內容（前綴、格式、資料列）的 SHA-256 作為去重依據：相同內容直接重用既有檔案；
+export_files 記錄每個檔案的大小與最後使用時間，背景清理依保留時數刪除過期檔案，
+總容量超過 EXPORT_MAX_TOTAL_MB 時依最久未使用 (LRU) 淘汰，並移除未登記的舊檔（例如舊版的時間戳檔名）
+"""
+import asyncio
+import hashlib
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+from app.services.export_service import export_suffix, write_export
+from app.services.storage import get_storage
+
+logger = get_logger("export_lifecycle")
+
+# 清理作業的 advisory lock，多個 worker / 副本同時只有一個執行
+SWEEP_LOCK_KEY = 20240603
+
+
+class ExportCounters:
+    """本進程的匯出與清理計數（供監控）"""
+
+    def __init__(self):
+        self.dedupe_hits = 0
+        self.dedupe_misses = 0
+        self.evicted_files = 0
+        self.evicted_bytes = 0
+        self.orphans_removed = 0
+        self.last_sweep_at: Optional[datetime] = None
+        self.last_sweep_seconds: Optional[float] = None
+
+
+export_counters = ExportCounters()
+
+
+def content_hash(data: List[Dict[str, Any]], format: str, prefix: str) -> str:
+    """以前綴、格式與資料列計算內容雜湊（與產生時間無關，xlsx 的中繼資料不影響去重）"""
+    digest = hashlib.sha256()
+    digest.update(f"{prefix}\0{format}\0".encode("utf-8"))
+    for row in data:
+        digest.update(json.dumps(row, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def _write_if_new(data: List[Dict[str, Any]], format: str, key: str) -> int:
+    """物件已存在時只回傳 -1，否則寫入並回傳大小"""
+    if get_storage().exists(key):
+        return -1
+    return write_export(data, format, key)
+
+
+async def get_or_create_export(data: List[Dict[str, Any]], format: str, prefix: str) -> str:
+    """
+    取得內容相同的既有匯出檔，沒有時產生新檔並登記
+
+    Returns:
+        str: 儲存 key；無資料時回傳空字串
+    """
+    if not data:
+        return ""
+
+    from app.database import AsyncSessionLocal
+
+    digest = await run_in_threadpool(content_hash, data, format, prefix)
+    key = f"exports/{prefix}_{digest[:16]}{export_suffix(format)}"
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            text("""
+                UPDATE export_files SET last_accessed_at = now(), hits = hits + 1
+                WHERE content_hash = :hash
+                RETURNING key
+            """),
+            {"hash": digest}
+        )
+        existing = result.scalar_one_or_none()
+        await db.commit()
+
+    if existing is not None and await run_in_threadpool(get_storage().exists, existing):
+        export_counters.dedupe_hits += 1
+        return existing
+
+    export_counters.dedupe_misses += 1
+    size = await run_in_threadpool(_write_if_new, data, format, key)
+
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            text("""
+                INSERT INTO export_files (key, content_hash, size)
+                VALUES (:key, :hash, :size)
+                ON CONFLICT (content_hash) DO UPDATE SET
+                    key = EXCLUDED.key,
+                    size = CASE WHEN EXCLUDED.size >= 0 THEN EXCLUDED.size ELSE export_files.size END,
+                    last_accessed_at = now()
+            """),
+            {"key": key, "hash": digest, "size": size}
+        )
+        await db.commit()
+    return key
+
+
+async def sweep_exports(
+    retention_hours: Optional[float] = None,
+    max_total_mb: Optional[int] = None,
+) -> dict:
+    """
+    刪除過期與超出容量的匯出檔案
+
+    1. 最後使用超過 retention_hours 的檔案
+    2. 依最後使用時間由新到舊累計大小，超過 max_total_mb 之後的檔案（LRU 淘汰）
+    3. 儲存中未登記、且超過保留時數的檔案
+
+    Returns:
+        {"skipped": 是否因其他 worker 正在清理而略過, "evicted": 刪除的登記檔案數,
+         "evicted_bytes": 釋放大小, "orphans": 刪除的未登記檔案數}
+    """
+    from app.database import engine
+
+    retention_hours = settings.EXPORT_RETENTION_HOURS if retention_hours is None else retention_hours
+    max_total_mb = settings.EXPORT_MAX_TOTAL_MB if max_total_mb is None else max_total_mb
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=retention_hours)
+    storage = get_storage()
+    started = time.monotonic()
+
+    async with engine.begin() as conn:
+        result = await conn.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": SWEEP_LOCK_KEY})
+        if not result.scalar():
+            return {"skipped": True, "evicted": 0, "evicted_bytes": 0, "orphans": 0}
+
+        # 先刪除登記再刪除檔案：同時進行的去重查詢會等待這些行的鎖，提交後找不到而重新產生，
+        # 不會拿到即將被刪除的 key；刪檔失敗的檔案成為未登記檔案，由下方的孤兒清理處理
+        result = await conn.execute(
+            text("""
+                DELETE FROM export_files WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, last_accessed_at,
+                               sum(size) OVER (ORDER BY last_accessed_at DESC, key) AS running_total
+                        FROM export_files
+                    ) ranked
+                    WHERE last_accessed_at < :cutoff OR running_total > :max_bytes
+                )
+                RETURNING key, size
+            """),
+            {"cutoff": cutoff, "max_bytes": max_total_mb * 1024 * 1024}
+        )
+        evicted = result.all()
+        removed_keys = [key for key, _ in evicted]
+        removed_bytes = sum(size for _, size in evicted)
+
+        for key in removed_keys:
+            try:
+                await run_in_threadpool(storage.delete, key)
+            except Exception:
+                logger.exception("刪除匯出檔案失敗", extra={"fields": {"key": key}})
+
+        result = await conn.execute(text("SELECT key FROM export_files"))
+        registered = set(result.scalars().all())
+
+        # 未登記的舊檔（升級前產生或登記失敗）；未滿保留時數的可能正在寫入，先保留
+        objects = await run_in_threadpool(lambda: list(storage.list("exports")))
+        orphans = [obj.key for obj in objects if obj.key not in registered and obj.modified < cutoff]
+        for key in orphans:
+            try:
+                await run_in_threadpool(storage.delete, key)
+            except Exception:
+                logger.exception("刪除匯出檔案失敗", extra={"fields": {"key": key}})
+
+    export_counters.evicted_files += len(removed_keys)
+    export_counters.evicted_bytes += removed_bytes
+    export_counters.orphans_removed += len(orphans)
+    export_counters.last_sweep_at = datetime.now(timezone.utc)
+    export_counters.last_sweep_seconds = time.monotonic() - started
+    return {"skipped": False, "evicted": len(removed_keys), "evicted_bytes": removed_bytes, "orphans": len(orphans)}
+
+
+async def export_sweeper_loop() -> None:
+    """背景定期清理匯出檔案"""
+    while True:
+        await asyncio.sleep(settings.EXPORT_SWEEP_INTERVAL_SECONDS)
+        try:
+            result = await sweep_exports()
+            if result["evicted"] or result["orphans"]:
+                logger.info("清理匯出檔案", extra={"fields": result})
+        except Exception:
+            logger.exception("匯出檔案清理失敗")
+
+
+async def export_storage_metrics() -> dict:
+    """匯出檔案儲存用量與本進程的去重/清理計數"""
+    from app.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            text("""
+                SELECT count(*), COALESCE(sum(size), 0), COALESCE(sum(hits), 0), min(last_accessed_at)
+                FROM export_files
+            """)
+        )
+        files, total_bytes, total_hits, oldest = result.one()
+
+    return {
+        "storage_type": settings.STORAGE_TYPE,
+        "files": files,
+        "total_bytes": int(total_bytes),
+        "max_bytes": settings.EXPORT_MAX_TOTAL_MB * 1024 * 1024,
+        "retention_hours": settings.EXPORT_RETENTION_HOURS,
+        "oldest_access": oldest,
+        "total_reuses": int(total_hits),
+        "dedupe_hits": export_counters.dedupe_hits,
+        "dedupe_misses": export_counters.dedupe_misses,
+        "evicted_files": export_counters.evicted_files,
+        "evicted_bytes": export_counters.evicted_bytes,
+        "orphans_removed": export_counters.orphans_removed,
+        "last_sweep_at": export_counters.last_sweep_at,
+        "last_sweep_seconds": export_counters.last_sweep_seconds,
+    }
@@ -2,47 +2,43 @@
 數據匯出服務
 """
 import os
+import tempfile
 import pandas as pd
-from datetime import datetime
 from typing import List, Dict, Any
-from app.core.config import settings
+from app.services.storage import get_storage
 
-def export_data(data: List[Dict[str, Any]], format: str, prefix: str = "export") -> str:
+EXCEL_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_CONTENT_TYPE = "text/csv; charset=utf-8"
+
+
+def export_suffix(format: str) -> str:
+    return ".xlsx" if format == "excel" else ".csv"
+
+
+def write_export(data: List[Dict[str, Any]], format: str, key: str) -> int:
     """
-    匯出數據為 Excel 或 CSV 文件
-    
-    Args:
-        data: 數據列表 (字典格式)
-        format: 格式 'excel' 或 'csv'
-        prefix: 文件名前綴
-        
+    將數據寫成 Excel 或 CSV 並存入儲存後端的 key
+
     Returns:
-        str: 相對文件路徑
+        int: 檔案大小（位元組）
     """
-    if not data:
-        return ""
-        
-    # 創建 DataFrame
     df = pd.DataFrame(data)
-    
-    # 確保目錄存在
-    export_dir = os.path.join(settings.UPLOAD_DIR, "exports")
-    os.makedirs(export_dir, exist_ok=True)
-    
-    # 生成文件名
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    if format == "excel":
-        filename = f"{prefix}_{timestamp}.xlsx"
-        file_path = os.path.join(export_dir, filename)
-        df.to_excel(file_path, index=False)
-    else:  # csv
-        filename = f"{prefix}_{timestamp}.csv"
-        file_path = os.path.join(export_dir, filename)
-        df.to_csv(file_path, index=False, encoding="utf-8-sig")
-        
-    return f"exports/{filename}"
-
-def get_export_path(filename: str) -> str:
-    """獲取匯出文件的完整路徑"""
-    return os.path.join(settings.UPLOAD_DIR, "exports", filename)
+
+    # 先寫到本機暫存檔，再交給儲存後端（S3 時以 multipart 串流上傳）
+    fd, tmp_path = tempfile.mkstemp(suffix=export_suffix(format))
+    os.close(fd)
+    try:
+        if format == "excel":
+            df.to_excel(tmp_path, index=False)
+            size = os.path.getsize(tmp_path)
+            get_storage().save_file(key, tmp_path, EXCEL_CONTENT_TYPE)
+        else:  # csv
+            df.to_csv(tmp_path, index=False, encoding="utf-8-sig")
+            size = os.path.getsize(tmp_path)
+            # xlsx 本身已是 zip，只有 CSV 需要預先壓縮
+            get_storage().save_file(key, tmp_path, CSV_CONTENT_TYPE, precompress=True)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return size
+
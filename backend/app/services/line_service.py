@@ -0,0 +1,170 @@
+"""
+LINE OAuth 服務
+共用的 HTTP 連線池（由應用 lifespan 管理），負責 token 交換與 id_token 簽章驗證
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+import jwt
+
+from app.core.config import settings
+from app.core.logging_config import get_logger
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+logger = get_logger("line")
+
+LINE_ISSUER = "https://access.line.me"
+
+
+class LineAuthError(Exception):
+    """LINE 認證失敗"""
+
+
+class LineClient:
+    """
+    LINE API 客戶端
+
+    - 單一 httpx.AsyncClient，保持 keep-alive 連線（可用時啟用 HTTP/2）
+    - 連線錯誤由 transport 重試；JWKS 讀取另以指數退避重試
+    - JWKS 快取 LINE_JWKS_TTL 秒，遇到未知 kid 時立即刷新
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._jwks: Dict[str, Any] = {}
+        self._jwks_fetched_at = 0.0
+        self._jwks_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        """建立連線池（在 lifespan 啟動時呼叫）"""
+        if self._client is not None:
+            return
+        # 指定 transport 時 AsyncClient 的 limits / http2 參數不會生效，連線池設定必須交給 transport
+        self._client = httpx.AsyncClient(
+            base_url=settings.LINE_API_BASE_URL,
+            timeout=httpx.Timeout(settings.LINE_HTTP_TIMEOUT, connect=3.0),
+            transport=httpx.AsyncHTTPTransport(
+                retries=2,
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60),
+            ),
+        )
+
+    async def close(self) -> None:
+        """關閉連線池"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            raise RuntimeError("LineClient 尚未啟動")
+        return self._client
+
+    async def exchange_code(self, code: str) -> Dict[str, Any]:
+        """
+        用 authorization code 換取 token
+
+        code 只能使用一次，因此只在連線建立失敗（請求未送出）時由 transport 重試
+
+        Raises:
+            LineAuthError: LINE 回傳非 200
+        """
+        response = await self.client.post(
+            "/oauth2/v2.1/token",
+            data={
+                "grant_type": "authorization_code",
+                "code": code,
+                "redirect_uri": settings.LINE_CALLBACK_URL,
+                "client_id": settings.LINE_CHANNEL_ID,
+                "client_secret": settings.LINE_CHANNEL_SECRET
+            },
+        )
+        if response.status_code != 200:
+            raise LineAuthError(f"LINE 認證失敗: {response.text}")
+        return response.json()
+
+    async def _get_with_backoff(self, url: str, attempts: int = 3) -> httpx.Response:
+        """GET 請求，遇到逾時或 5xx 時以指數退避重試"""
+        delay = 0.2
+        for attempt in range(attempts):
+            try:
+                response = await self.client.get(url)
+                if response.status_code < 500:
+                    return response
+            except httpx.TransportError:
+                if attempt == attempts - 1:
+                    raise
+            if attempt < attempts - 1:
+                await asyncio.sleep(delay)
+                delay *= 2
+        return response
+
+    async def _get_jwks(self, force: bool = False) -> Dict[str, Any]:
+        """獲取 JWKS（kid -> 公鑰），過期或 force 時刷新"""
+        if not force and self._jwks and time.monotonic() - self._jwks_fetched_at < settings.LINE_JWKS_TTL:
+            return self._jwks
+
+        async with self._jwks_lock:
+            # 等鎖期間可能已被其他請求刷新
+            if not force and self._jwks and time.monotonic() - self._jwks_fetched_at < settings.LINE_JWKS_TTL:
+                return self._jwks
+
+            response = await self._get_with_backoff("/oauth2/v2.1/certs")
+            response.raise_for_status()
+            self._jwks = {
+                key["kid"]: jwt.PyJWK(key).key
+                for key in response.json().get("keys", [])
+            }
+            self._jwks_fetched_at = time.monotonic()
+            return self._jwks
+
+    async def verify_id_token(self, id_token: str) -> Dict[str, Any]:
+        """
+        驗證 id_token 簽章、aud 與 iss
+
+        LINE Login 網頁登入以 channel secret 簽署 (HS256)，
+        其他來源以 ES256 簽署並提供 JWKS 公鑰
+
+        Raises:
+            LineAuthError: 簽章或聲明無效
+        """
+        try:
+            header = jwt.get_unverified_header(id_token)
+            algorithm = header.get("alg")
+
+            if algorithm == "HS256":
+                key = settings.LINE_CHANNEL_SECRET
+            elif algorithm == "ES256":
+                kid = header.get("kid")
+                jwks = await self._get_jwks()
+                if kid not in jwks:
+                    jwks = await self._get_jwks(force=True)
+                if kid not in jwks:
+                    raise LineAuthError(f"未知的簽章金鑰: {kid}")
+                key = jwks[kid]
+            else:
+                raise LineAuthError(f"不支援的簽章演算法: {algorithm}")
+
+            return jwt.decode(
+                id_token,
+                key,
+                algorithms=[algorithm],
+                audience=settings.LINE_CHANNEL_ID,
+                issuer=LINE_ISSUER,
+            )
+        except jwt.PyJWTError as e:
+            raise LineAuthError(f"id_token 驗證失敗: {e}")
+
+
+# 全局客戶端實例
+line_client = LineClient()
@@ -0,0 +1,76 @@
+"""
+登入流量控制
+活動開場時大量 LINE 登入同時湧入，限制同時對 LINE 發出的 token 交換數量；
+排隊過久或隊伍過長時回傳等候頁，讓瀏覽器稍後重試，而不是耗盡 worker 與資料庫連線池
+"""
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+
+from app.core.config import settings
+
+
+class LoginBusyError(Exception):
+    """登入排隊已滿或等候逾時"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"登入人數過多，請 {retry_after} 秒後重試")
+        self.retry_after = retry_after
+
+
+class LoginAdmission:
+    """
+    登入准入控制（每個 worker 各自計算）
+
+    - 同時最多 max_concurrency 個登入在與 LINE 交換 token
+    - 最多 max_waiting 個請求排隊，每個最多等候 wait_timeout 秒
+    - 以上游延遲的移動平均估算建議的重試秒數
+    """
+
+    def __init__(self, max_concurrency: int, max_waiting: int, wait_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+        self._avg_latency = 0.5
+
+    def retry_after(self) -> int:
+        """依排隊人數與上游平均延遲估算重試秒數 (1~30)"""
+        rounds = self._waiting / self.max_concurrency + 1
+        return max(1, min(30, math.ceil(rounds * self._avg_latency)))
+
+    @asynccontextmanager
+    async def admit(self):
+        """
+        取得登入名額
+
+        Raises:
+            LoginBusyError: 隊伍已滿或等候逾時
+        """
+        if self._semaphore.locked() and self._waiting >= self.max_waiting:
+            raise LoginBusyError(self.retry_after())
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.wait_timeout)
+        except asyncio.TimeoutError:
+            raise LoginBusyError(self.retry_after())
+        finally:
+            self._waiting -= 1
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+            self._avg_latency = 0.8 * self._avg_latency + 0.2 * (time.monotonic() - started)
+
+
+# 全局實例
+login_admission = LoginAdmission(
+    max_concurrency=settings.LOGIN_MAX_CONCURRENCY,
+    max_waiting=settings.LOGIN_MAX_WAITING,
+    wait_timeout=settings.LOGIN_QUEUE_TIMEOUT,
+)
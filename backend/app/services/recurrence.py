@@ -0,0 +1,105 @@
+"""
+週期規則計算
+支援 RRULE 常用子集：FREQ (daily/weekly)、INTERVAL、BYDAY、UNTIL、COUNT 與 EXDATE。
+直接以日期算術產生每次發生日期，耗時只與發生次數有關，不需逐日迭代
+"""
+import math
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import List, Optional, Set
+
+
+@dataclass
+class RecurrenceRule:
+    """週期規則"""
+    frequency: str = "weekly"  # daily, weekly
+    interval: int = 1
+    by_weekday: List[int] = field(default_factory=list)  # 0 是週一，僅 weekly 使用
+    until: Optional[date] = None
+    count: Optional[int] = None
+    exclude_dates: Set[date] = field(default_factory=set)
+
+    def __post_init__(self):
+        if self.frequency not in ("daily", "weekly"):
+            raise ValueError("重複頻率必須是 daily 或 weekly")
+        if self.interval < 1:
+            raise ValueError("間隔必須大於 0")
+        if self.until is None and self.count is None:
+            raise ValueError("必須提供結束日期或次數")
+        if any(d < 0 or d > 6 for d in self.by_weekday):
+            raise ValueError("星期必須在 0-6 之間")
+
+
+def _add_days(start: date, days: int) -> Optional[date]:
+    """日期加上天數，超出 date 可表示的範圍時回傳 None"""
+    try:
+        return start + timedelta(days=days)
+    except OverflowError:
+        return None
+
+
+def occurrences(start: date, rule: RecurrenceRule, limit: Optional[int] = None) -> List[date]:
+    """
+    計算從 start 開始的所有發生日期
+
+    依 RFC 5545，COUNT 計算的是展開後的次數，EXDATE 之後才排除，
+    因此被排除的日期仍佔用 COUNT 名額。
+
+    提供 limit 時最多回傳 limit + 1 個日期（呼叫端以長度大於 limit 判斷超過上限），
+    展開的數量也隨之受限，很大的 COUNT 或很遠的 UNTIL 不會產生大量日期；
+    超出日期範圍 (date.max) 的部分直接截止
+    """
+    # 展開時多保留被排除日期的名額，排除後仍能湊滿 limit + 1
+    max_dates = None if limit is None else limit + 1 + len(rule.exclude_dates)
+
+    if rule.frequency == "daily":
+        step = rule.interval
+        if rule.count is not None:
+            n = rule.count
+            if rule.until is not None:
+                n = min(n, (rule.until - start).days // step + 1)
+        else:
+            n = (rule.until - start).days // step + 1
+        if max_dates is not None:
+            n = min(n, max_dates)
+
+        dates = []
+        for i in range(max(n, 0)):
+            d = _add_days(start, i * step)
+            if d is None:
+                break
+            dates.append(d)
+    else:
+        weekdays = sorted(set(rule.by_weekday)) or [start.weekday()]
+        week_start = start - timedelta(days=start.weekday())
+        step = 7 * rule.interval
+
+        if rule.until is not None:
+            weeks = (rule.until - week_start).days // step + 1
+        else:
+            # 第一週可能有部分星期早於 start，多算一週保證足夠
+            weeks = math.ceil(rule.count / len(weekdays)) + 1
+        if rule.count is not None and rule.until is not None:
+            weeks = min(weeks, math.ceil(rule.count / len(weekdays)) + 1)
+        if max_dates is not None:
+            weeks = min(weeks, math.ceil(max_dates / len(weekdays)) + 1)
+
+        dates = []
+        for w in range(max(weeks, 0)):
+            week = _add_days(week_start, w * step)
+            if week is None:
+                break
+            for wd in weekdays:
+                d = _add_days(week, wd)
+                if d is None:
+                    break
+                if d >= start and (rule.until is None or d <= rule.until):
+                    dates.append(d)
+        if rule.count is not None:
+            dates = dates[:rule.count]
+
+    if rule.exclude_dates:
+        dates = [d for d in dates if d not in rule.exclude_dates]
+    if limit is not None:
+        dates = dates[:limit + 1]
+    return dates
@@ -0,0 +1,126 @@
+"""
+活動名單服務
+名單以集合形式延遲載入到記憶體，簽到時以 O(1) 判斷用戶是否在名單內；
+名單異動時清除本進程快取，其他 worker 的快取在 ROSTER_CACHE_TTL 秒內過期
+"""
+import asyncio
+import time
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models import EventRoster
+
+
+class RosterCache:
+    """每個活動一份 user_id 集合的快取"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._rosters: Dict[str, Tuple[FrozenSet[int], float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def get(self, db: AsyncSession, event_id: str) -> FrozenSet[int]:
+        """獲取活動名單，未載入或過期時從資料庫載入（同一活動只會有一個請求去載入）"""
+        cached = self._rosters.get(event_id)
+        if cached and time.monotonic() - cached[1] < self.ttl:
+            return cached[0]
+
+        lock = self._locks.setdefault(event_id, asyncio.Lock())
+        async with lock:
+            cached = self._rosters.get(event_id)
+            if cached and time.monotonic() - cached[1] < self.ttl:
+                return cached[0]
+
+            result = await db.execute(
+                select(EventRoster.user_id).where(EventRoster.event_id == event_id)
+            )
+            roster = frozenset(result.scalars().all())
+            self._rosters[event_id] = (roster, time.monotonic())
+            return roster
+
+    async def contains(self, db: AsyncSession, event_id: str, user_id: int) -> bool:
+        """用戶是否在活動名單內"""
+        return user_id in await self.get(db, event_id)
+
+    def invalidate(self, event_id: str) -> None:
+        """清除活動名單快取"""
+        self._rosters.pop(event_id, None)
+        self._locks.pop(event_id, None)
+
+
+roster_cache = RosterCache(ttl=settings.ROSTER_CACHE_TTL)
+
+
+async def load_roster(
+    db: AsyncSession,
+    event_id: str,
+    user_ids: List[int],
+    line_user_ids: List[str],
+    phones: List[str],
+) -> Tuple[int, List[str]]:
+    """
+    批次加入名單，以單一 INSERT ... SELECT 依 user_id / LINE ID / 手機比對 users
+
+    Returns:
+        (新增筆數, 找不到對應用戶的識別值)
+    """
+    params = {
+        "event_id": event_id,
+        "user_ids": user_ids,
+        "line_user_ids": line_user_ids,
+        "phones": phones,
+    }
+    matched = await db.execute(
+        text(
+            "SELECT id, line_user_id, phone FROM users "
+            "WHERE id = ANY(:user_ids) OR line_user_id = ANY(:line_user_ids) OR phone = ANY(:phones)"
+        ),
+        params
+    )
+    rows = matched.all()
+
+    found_ids = {row.id for row in rows}
+    found_line_ids = {row.line_user_id for row in rows}
+    found_phones = {row.phone for row in rows}
+    unmatched = (
+        [str(i) for i in user_ids if i not in found_ids]
+        + [i for i in line_user_ids if i not in found_line_ids]
+        + [p for p in phones if p not in found_phones]
+    )
+
+    added = 0
+    if found_ids:
+        result = await db.execute(
+            text(
+                "INSERT INTO event_roster (event_id, user_id) "
+                "SELECT :event_id, unnest(CAST(:found_ids AS INTEGER[])) "
+                "ON CONFLICT DO NOTHING"
+            ),
+            {"event_id": event_id, "found_ids": list(found_ids)}
+        )
+        added = result.rowcount
+
+    await db.commit()
+    roster_cache.invalidate(event_id)
+    return added, unmatched
+
+
+async def clear_roster(db: AsyncSession, event_id: str, user_ids: Optional[List[int]] = None) -> int:
+    """移除名單中的指定用戶，未指定時清空整份名單"""
+    if user_ids:
+        result = await db.execute(
+            text("DELETE FROM event_roster WHERE event_id = :event_id AND user_id = ANY(:user_ids)"),
+            {"event_id": event_id, "user_ids": user_ids}
+        )
+    else:
+        result = await db.execute(
+            text("DELETE FROM event_roster WHERE event_id = :event_id"),
+            {"event_id": event_id}
+        )
+    await db.commit()
+    roster_cache.invalidate(event_id)
+    return result.rowcount
+
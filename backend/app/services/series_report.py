@@ -0,0 +1,174 @@
+"""
+系列活動出席矩陣
+以單一分組查詢取得每位用戶出席過的場次，每位用戶以一個整數位元集合記錄出席情況
+（第 i 位代表第 i 場），完成率與輸出都直接由位元集合計算
+"""
+import csv
+import io
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Event
+
+# 串流讀取分組結果的批次大小
+FETCH_BATCH = 5000
+
+# XLSX 串流輸出的區塊大小
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class AttendeeRow:
+    """單一用戶的出席位元集合"""
+    user_id: int
+    name: str
+    phone: str
+    company: str
+    department: str
+    bits: int
+
+    @property
+    def attended(self) -> int:
+        return self.bits.bit_count()
+
+    def pattern(self, sessions: int) -> str:
+        """出席字串，第 i 個字元為第 i 場（1 出席 / 0 缺席）"""
+        return format(self.bits, f"0{sessions}b")[::-1] if sessions else ""
+
+
+@dataclass
+class SeriesMatrix:
+    """系列活動的用戶 × 場次出席矩陣"""
+    sessions: List[Event]
+    rows: List[AttendeeRow]
+    threshold: float
+
+    @property
+    def session_count(self) -> int:
+        return len(self.sessions)
+
+    def rate(self, row: AttendeeRow) -> float:
+        return row.attended / self.session_count if self.session_count else 0.0
+
+    def completed(self, row: AttendeeRow) -> bool:
+        return self.session_count > 0 and self.rate(row) >= self.threshold
+
+    def session_attendees(self) -> List[int]:
+        """各場次出席人數"""
+        counts = [0] * self.session_count
+        for row in self.rows:
+            bits = row.bits
+            while bits:
+                low = bits & -bits
+                counts[low.bit_length() - 1] += 1
+                bits ^= low
+        return counts
+
+    def header(self) -> List[str]:
+        labels = [
+            f"{event.start_time.strftime('%Y-%m-%d %H:%M')} {event.name}" for event in self.sessions
+        ]
+        return ["姓名", "手機", "單位", "部門", *labels, "出席場次", "出席率", "完成"]
+
+    def iter_records(self) -> Iterator[list]:
+        """逐列產生輸出資料，不建立完整矩陣"""
+        for row in self.rows:
+            marks = ["V" if row.bits >> i & 1 else "" for i in range(self.session_count)]
+            yield [
+                row.name, row.phone, row.company, row.department,
+                *marks,
+                row.attended,
+                f"{self.rate(row):.0%}",
+                "是" if self.completed(row) else "否",
+            ]
+
+
+async def build_series_matrix(
+    db: AsyncSession,
+    sessions: List[Event],
+    threshold: float
+) -> SeriesMatrix:
+    """
+    以單一分組查詢建立出席矩陣（已封存場次的簽到記錄一併納入）
+
+    Args:
+        sessions: 系列中的場次，依開始時間排序
+        threshold: 完成所需的出席率 (0-1)
+    """
+    index = {event.id: i for i, event in enumerate(sessions)}
+    rows: List[AttendeeRow] = []
+    if not sessions:
+        return SeriesMatrix(sessions=sessions, rows=rows, threshold=threshold)
+
+    result = await db.stream(
+        text("""
+            SELECT u.id, u.name, u.phone, u.company, u.department, array_agg(DISTINCT a.event_id)
+            FROM (
+                SELECT user_id, event_id FROM checkins WHERE event_id = ANY(:event_ids)
+                UNION ALL
+                SELECT user_id, event_id FROM checkins_archive WHERE event_id = ANY(:event_ids)
+            ) a
+            JOIN users u ON u.id = a.user_id
+            GROUP BY u.id
+            ORDER BY u.company, u.department, u.name
+        """),
+        {"event_ids": list(index)}
+    )
+    async for part in result.partitions(FETCH_BATCH):
+        for user_id, name, phone, company, department, event_ids in part:
+            bits = 0
+            for event_id in event_ids:
+                bits |= 1 << index[event_id]
+            rows.append(AttendeeRow(user_id, name, phone or "", company or "", department or "", bits))
+
+    return SeriesMatrix(sessions=sessions, rows=rows, threshold=threshold)
+
+
+def iter_csv(matrix: SeriesMatrix) -> Iterator[bytes]:
+    """逐列產生 CSV（含 BOM，Excel 可直接開啟）"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(matrix.header())
+    for i, record in enumerate(matrix.iter_records(), 1):
+        writer.writerow(record)
+        if i % 500 == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def iter_xlsx(matrix: SeriesMatrix) -> Iterator[bytes]:
+    """
+    以 openpyxl write-only 模式寫入暫存檔後分塊輸出，記憶體用量不隨列數增加
+    （XLSX 為 zip 格式，必須完整寫完才能開始傳送）
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("出席矩陣")
+    sheet.append(matrix.header())
+    for record in matrix.iter_records():
+        sheet.append(record)
+
+    summary = workbook.create_sheet("場次統計")
+    summary.append(["場次", "開始時間", "出席人數"])
+    for event, attendees in zip(matrix.sessions, matrix.session_attendees()):
+        summary.append([event.name, event.start_time.strftime("%Y-%m-%d %H:%M"), attendees])
+
+    with tempfile.TemporaryFile() as f:
+        workbook.save(f)
+        f.seek(0)
+        while chunk := f.read(CHUNK_SIZE):
+            yield chunk
+
+
+def export_filename(series_id: str, extension: str) -> str:
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"series_{series_id}_{timestamp}.{extension}"
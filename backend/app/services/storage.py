@@ -0,0 +1,223 @@
+"""
+檔案儲存後端
+依 STORAGE_TYPE 選擇本機磁碟（UPLOAD_DIR）或 S3 相容物件儲存（AWS S3、MinIO 等）；
+QR Code 與匯出檔案以 key（例如 qrcodes/event_x.png、exports/x.csv）存取，
+S3 模式下大檔以 multipart 由磁碟串流上傳，下載改以預簽名 URL 轉址，檔案內容不經過 API worker
+"""
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from typing import Iterator, NamedTuple, Optional
+
+from app.core.config import settings
+from app.core.compression import PRECOMPRESSED, precompress_file
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config as BotoConfig
+    from botocore.exceptions import ClientError
+except ImportError:  # 未安裝 boto3 時只能使用本機儲存
+    boto3 = None
+
+
+class StoredObject(NamedTuple):
+    key: str
+    size: int
+    modified: datetime
+
+
+def normalize_key(key: str) -> Optional[str]:
+    """
+    正規化 key，拒絕絕對路徑與目錄遍歷（回傳 None）
+    """
+    parts = [part for part in key.replace("\\", "/").split("/") if part not in ("", ".")]
+    if not parts or ".." in parts or key.startswith("/"):
+        return None
+    return "/".join(parts)
+
+
+class StorageBackend:
+    """儲存後端介面"""
+
+    def save_file(self, key: str, source_path: str, content_type: str, precompress: bool = False) -> None:
+        """將本機檔案存入 key（會移動或刪除 source_path）"""
+        raise NotImplementedError
+
+    def save_bytes(self, key: str, data: bytes, content_type: str) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def list(self, prefix: str) -> Iterator[StoredObject]:
+        raise NotImplementedError
+
+    def download_url(self, key: str, filename: Optional[str] = None) -> Optional[str]:
+        """
+        直接下載的 URL；回傳 None 表示由 /api/files 自行傳送檔案
+        """
+        return None
+
+
+class LocalStorage(StorageBackend):
+    """本機磁碟儲存（單機或共用磁碟掛載）"""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def save_file(self, key: str, source_path: str, content_type: str, precompress: bool = False) -> None:
+        target = self.path(key)
+        directory = os.path.dirname(target)
+        os.makedirs(directory, exist_ok=True)
+        # 先搬到目標目錄的暫存檔再 rename（來源可能在其他檔案系統，直接 move 會是非原子的複製），
+        # 讀取端不會看到寫到一半的檔案
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        os.close(fd)
+        suffixes = [suffix for _, suffix in PRECOMPRESSED]
+        try:
+            shutil.move(source_path, tmp_path)
+            if precompress:
+                # 預先壓縮，下載時依 Accept-Encoding 直接回傳；壓縮版本先就位，主檔最後出現
+                precompress_file(tmp_path)
+                for suffix in suffixes:
+                    if os.path.exists(tmp_path + suffix):
+                        os.replace(tmp_path + suffix, target + suffix)
+            os.replace(tmp_path, target)
+        except BaseException:
+            for path in [tmp_path] + [tmp_path + suffix for suffix in suffixes]:
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+
+    def save_bytes(self, key: str, data: bytes, content_type: str) -> None:
+        target = self.path(key)
+        directory = os.path.dirname(target)
+        os.makedirs(directory, exist_ok=True)
+        # 先寫暫存檔再 rename，讀取端不會看到寫到一半的檔案
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete(self, key: str) -> None:
+        """刪除檔案（含預先壓縮版本）"""
+        target = self.path(key)
+        for path in [target] + [target + suffix for _, suffix in PRECOMPRESSED]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self.path(key))
+
+    def list(self, prefix: str) -> Iterator[StoredObject]:
+        directory = self.path(prefix.rstrip("/"))
+        if not os.path.isdir(directory):
+            return
+        suffixes = tuple(suffix for _, suffix in PRECOMPRESSED)
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.name.startswith(".tmp-") or entry.name.endswith(suffixes):
+                    continue
+                st = entry.stat()
+                yield StoredObject(
+                    key=f"{prefix.rstrip('/')}/{entry.name}",
+                    size=st.st_size,
+                    modified=datetime.fromtimestamp(st.st_mtime, tz=timezone.utc),
+                )
+
+
+class S3Storage(StorageBackend):
+    """S3 相容物件儲存"""
+
+    def __init__(self, bucket: str):
+        if boto3 is None:
+            raise RuntimeError("STORAGE_TYPE=s3 需要安裝 boto3")
+        if not bucket:
+            raise RuntimeError("STORAGE_TYPE=s3 需要設定 S3_BUCKET_NAME")
+        self.bucket = bucket
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL or None,
+            region_name=settings.AWS_REGION,
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            config=BotoConfig(
+                signature_version="s3v4",
+                # 自架的 S3 相容服務（MinIO 等）通常只支援 path-style
+                s3={"addressing_style": "path" if settings.S3_ENDPOINT_URL else "auto"},
+            ),
+        )
+        chunk_size = settings.S3_MULTIPART_CHUNK_MB * 1024 * 1024
+        self.transfer_config = TransferConfig(multipart_threshold=chunk_size, multipart_chunksize=chunk_size)
+
+    def save_file(self, key: str, source_path: str, content_type: str, precompress: bool = False) -> None:
+        # 超過 multipart 門檻時由 boto3 分段串流上傳，不會整個讀進記憶體；
+        # 預簽名 URL 無法依 Accept-Encoding 協商，因此不上傳預先壓縮版本
+        try:
+            self.client.upload_file(
+                source_path,
+                self.bucket,
+                key,
+                ExtraArgs={"ContentType": content_type},
+                Config=self.transfer_config,
+            )
+        finally:
+            os.remove(source_path)
+
+    def save_bytes(self, key: str, data: bytes, content_type: str) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=key, Body=data, ContentType=content_type)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def list(self, prefix: str) -> Iterator[StoredObject]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix.rstrip("/") + "/"):
+            for item in page.get("Contents", []):
+                yield StoredObject(key=item["Key"], size=item["Size"], modified=item["LastModified"])
+
+    def download_url(self, key: str, filename: Optional[str] = None) -> Optional[str]:
+        params = {"Bucket": self.bucket, "Key": key}
+        if filename:
+            params["ResponseContentDisposition"] = f'attachment; filename="{filename}"'
+        return self.client.generate_presigned_url(
+            "get_object", Params=params, ExpiresIn=settings.S3_PRESIGN_EXPIRES
+        )
+
+
+_storage: Optional[StorageBackend] = None
+
+
+def get_storage() -> StorageBackend:
+    """依 STORAGE_TYPE 建立（並重用）儲存後端"""
+    global _storage
+    if _storage is None:
+        if settings.STORAGE_TYPE == "s3":
+            _storage = S3Storage(settings.S3_BUCKET_NAME)
+        else:
+            _storage = LocalStorage(settings.UPLOAD_DIR)
+    return _storage
@@ -0,0 +1,215 @@
+"""
+批次匯入用戶服務
+串流讀取 CSV/XLSX，分批以 UserCreate 規則驗證，
+透過 COPY 載入暫存表後以單一 INSERT ... ON CONFLICT 合併到 users
+"""
+import csv
+import io
+import json
+from itertools import islice
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.schemas.user import UserCreate
+
+
+BATCH_SIZE = 5000
+MAX_REPORTED_ERRORS = 1000
+
+COLUMNS = ["line_user_id", "name", "phone", "company", "department", "profile_data"]
+
+# 表頭別名（與匯出檔的中文欄位相容）
+HEADER_ALIASES = {
+    "line_user_id": "line_user_id",
+    "line id": "line_user_id",
+    "lineid": "line_user_id",
+    "name": "name",
+    "姓名": "name",
+    "phone": "phone",
+    "手機": "phone",
+    "電話": "phone",
+    "company": "company",
+    "公司": "company",
+    "單位": "company",
+    "department": "department",
+    "部門": "department",
+}
+
+
+def _normalize_header(header: Any) -> Optional[str]:
+    if header is None:
+        return None
+    return HEADER_ALIASES.get(str(header).strip().lower())
+
+
+def _normalize_value(field: str, value: Any) -> str:
+    if value is None:
+        return ""
+    # Excel 會把手機號碼存成數字並去掉開頭的 0
+    if field == "phone" and isinstance(value, (int, float)):
+        value = str(int(value))
+        if len(value) == 9:
+            value = "0" + value
+    return str(value).strip()
+
+
+def _iter_rows(file: BinaryIO, filename: str) -> Iterator[List[Any]]:
+    """逐行讀取 CSV 或 XLSX（第一行為表頭）"""
+    if filename.lower().endswith((".xlsx", ".xlsm")):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            for row in workbook.active.iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            workbook.close()
+    else:
+        reader = csv.reader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+        yield from reader
+
+
+class _BatchReader:
+    """把列迭代器轉成 (行號, 資料) 的批次，表頭只解析一次"""
+
+    def __init__(self, rows: Iterator[List[Any]]):
+        self.rows = rows
+        self.row_number = 1
+        header = next(rows, None)
+        if header is None:
+            raise ValueError("檔案是空的")
+
+        self.mapping = {i: field for i, h in enumerate(header) if (field := _normalize_header(h))}
+        missing = {"line_user_id", "name", "phone", "company", "department"} - set(self.mapping.values())
+        if missing:
+            raise ValueError(f"缺少必要欄位: {', '.join(sorted(missing))}")
+
+    def next_batch(self, size: int) -> List[tuple]:
+        batch = []
+        for row in islice(self.rows, size):
+            self.row_number += 1
+            if not any(cell not in (None, "") for cell in row):
+                continue
+            data = {
+                field: _normalize_value(field, row[i] if i < len(row) else None)
+                for i, field in self.mapping.items()
+            }
+            batch.append((self.row_number, data))
+        return batch
+
+
+async def import_users(
+    db: AsyncSession,
+    file: BinaryIO,
+    filename: str,
+    on_conflict: str = "skip",
+    batch_size: int = BATCH_SIZE,
+) -> Dict[str, Any]:
+    """
+    批次匯入用戶
+
+    Args:
+        db: 資料庫 session（匯入在同一個交易中完成）
+        file: 檔案二進位串流
+        filename: 檔名，用副檔名判斷格式
+        on_conflict: line_user_id 已存在時 "skip" 略過或 "update" 更新
+        batch_size: 每批讀取與驗證的行數
+
+    Returns:
+        dict: total, inserted, updated, skipped, failed, errors
+    """
+    if on_conflict not in ("skip", "update"):
+        raise ValueError("on_conflict 必須是 skip 或 update")
+
+    reader = await run_in_threadpool(_BatchReader, _iter_rows(file, filename))
+
+    await db.execute(text(
+        "CREATE TEMP TABLE user_import_staging ON COMMIT DROP AS "
+        f"SELECT {', '.join(COLUMNS)} FROM users WITH NO DATA"
+    ))
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver = raw_connection.driver_connection
+
+    seen = set()
+    errors: List[Dict[str, Any]] = []
+    total = failed = staged = 0
+
+    def validate(batch):
+        records = []
+        batch_errors = []
+        for row_number, data in batch:
+            line_user_id = (data.get("line_user_id") or "").strip()
+            if not line_user_id:
+                # 空白的 LINE ID 不能作為去重與衝突判斷的依據
+                batch_errors.append({"row": row_number, "line_user_id": line_user_id, "message": "缺少 LINE ID"})
+                continue
+            if line_user_id in seen:
+                batch_errors.append({"row": row_number, "line_user_id": line_user_id, "message": "檔案中重複的 LINE ID"})
+                continue
+            try:
+                user = UserCreate.model_validate(data)
+            except ValidationError as e:
+                message = "; ".join(
+                    f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+                )
+                batch_errors.append({"row": row_number, "line_user_id": line_user_id, "message": message})
+                continue
+            seen.add(user.line_user_id)
+            records.append((
+                user.line_user_id, user.name, user.phone, user.company, user.department,
+                json.dumps(user.profile_data, ensure_ascii=False)
+            ))
+        return records, batch_errors
+
+    while True:
+        batch = await run_in_threadpool(reader.next_batch, batch_size)
+        if not batch:
+            break
+        records, batch_errors = await run_in_threadpool(validate, batch)
+
+        total += len(batch)
+        failed += len(batch_errors)
+        errors.extend(batch_errors[:max(0, MAX_REPORTED_ERRORS - len(errors))])
+
+        if records:
+            await driver.copy_records_to_table("user_import_staging", records=records, columns=COLUMNS)
+            staged += len(records)
+
+    inserted = updated = 0
+    if staged:
+        if on_conflict == "update":
+            conflict_clause = (
+                "ON CONFLICT (line_user_id) DO UPDATE SET "
+                "name = EXCLUDED.name, phone = EXCLUDED.phone, company = EXCLUDED.company, "
+                "department = EXCLUDED.department, updated_at = now()"
+            )
+        else:
+            conflict_clause = "ON CONFLICT (line_user_id) DO NOTHING"
+
+        # xmax = 0 表示本次新插入的行，否則為更新
+        result = await db.execute(text(
+            f"INSERT INTO users ({', '.join(COLUMNS)}) "
+            f"SELECT {', '.join(COLUMNS)} FROM user_import_staging "
+            f"{conflict_clause} RETURNING (xmax = 0) AS inserted"
+        ))
+        for (was_inserted,) in result:
+            if was_inserted:
+                inserted += 1
+            else:
+                updated += 1
+
+    await db.commit()
+
+    return {
+        "total": total,
+        "inserted": inserted,
+        "updated": updated,
+        "skipped": staged - inserted - updated,
+        "failed": failed,
+        "errors": errors,
+    }
@@ -1,13 +1,21 @@
 """
 FastAPI 主應用程序
 """
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
-from app.database import init_db, close_db
-from app.routers import auth, users, events, checkins, files, templates
+from app.core.access_log import AccessLogMiddleware, install_db_timing
+from app.core.compression import CompressionMiddleware
+from app.core.logging_config import setup_logging, shutdown_logging
+from app.database import init_db, close_db, engine
+from app.database.connection import replica_engine
+from app.services.line_service import line_client
+from app.services.checkin_partitions import partition_maintenance_loop
+from app.services.export_lifecycle import export_sweeper_loop
+from app.routers import auth, users, events, checkins, files, templates, roster, analytics, exports
 
 
 @asynccontextmanager
@@ -15,15 +23,24 @@ async def lifespan(app: FastAPI):
     """應用程式生命週期管理"""
     # 啟動時：建立資料庫和表
     print("🚀 應用程式啟動中...")
-    await init_db()
-    print("✅ 資料庫初始化完成")
+    setup_logging()
+    if settings.INIT_DB_ON_STARTUP:
+        await init_db()
+        print("✅ 資料庫初始化完成")
+    await line_client.start()
+    partition_task = asyncio.create_task(partition_maintenance_loop())
+    export_sweeper_task = asyncio.create_task(export_sweeper_loop())
 
     yield
 
     # 關閉時
     print("👋 應用程式關閉中...")
+    partition_task.cancel()
+    export_sweeper_task.cancel()
+    await line_client.close()
     await close_db()
     print("✅ 資料庫連接已關閉")
+    shutdown_logging()
 
 
 # 創建 FastAPI 應用
@@ -37,6 +54,11 @@ app = FastAPI(
     openapi_url="/api/openapi.json"
 )
 
+# SQL 計時，供存取日誌記錄每個請求的資料庫耗時
+install_db_timing(engine)
+if replica_engine is not None:
+    install_db_timing(replica_engine)
+
 # 配置 CORS
 app.add_middleware(
     CORSMiddleware,
@@ -44,15 +66,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
 
+# 回應壓縮（gzip / brotli，支援串流回應）
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
+# 存取日誌（最外層，包含 CORS 在內的完整處理時間）
+app.add_middleware(AccessLogMiddleware)
+
 # 註冊路由
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(events.router, prefix="/api")
+app.include_router(roster.router, prefix="/api")
 app.include_router(templates.router, prefix="/api")
 app.include_router(checkins.router, prefix="/api")
 app.include_router(files.router, prefix="/api")
+app.include_router(analytics.router, prefix="/api")
+app.include_router(exports.router, prefix="/api")
 
 # 根路由
 @app.get("/")
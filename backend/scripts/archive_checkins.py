@@ -0,0 +1,53 @@
+"""
+簽到記錄封存、分區維護與簽到計數器校正（建議以 cron 每日執行）
+
+用法:
+    python scripts/archive_checkins.py [--months 12] [--dry-run]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import AsyncSessionLocal, engine
+from app.services.checkin_partitions import archive_old_checkins, ensure_partitions
+from app.services.capacity_service import reconcile_checkin_counts
+
+
+async def main(args: argparse.Namespace):
+    """主函數"""
+    started = time.perf_counter()
+    try:
+        async with engine.begin() as conn:
+            created = await ensure_partitions(conn)
+        for name in created:
+            print(f"📅 建立分區 {name}")
+
+        async with AsyncSessionLocal() as session:
+            summary = await archive_old_checkins(session, args.months, dry_run=args.dry_run)
+            # 修正 events.checkin_count 與實際簽到記錄的偏差（例如手動刪除簽到記錄）
+            corrected = 0 if args.dry_run else await reconcile_checkin_counts(session)
+    finally:
+        await engine.dispose()
+
+    print("=" * 50)
+    if args.dry_run:
+        print(f"🔍 預計封存 {summary['events']} 個活動（未執行）")
+    else:
+        print(f"✅ 封存完成 ({time.perf_counter() - started:.2f}s)")
+        print(f"   活動: {summary['events']}")
+        print(f"   簽到記錄: {summary['checkins']}")
+        print(f"   卸除分區: {', '.join(summary['dropped_partitions']) or '無'}")
+        print(f"   校正簽到計數: {corrected} 個活動")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="封存舊活動的簽到記錄、維護分區並校正簽到計數器")
+    parser.add_argument("--months", type=int, default=None, help="活動結束超過幾個月後封存 (預設 CHECKIN_ARCHIVE_AFTER_MONTHS)")
+    parser.add_argument("--dry-run", action="store_true", help="只列出預計封存的活動數")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,142 @@
+"""
+LINE 連線池延遲測試
+
+在本機啟動模擬 LINE token 端點的 stub 伺服器（每條新連線加上 --handshake-ms 的建立延遲，
+模擬 TCP/TLS 握手），比較每次請求建立新連線（冷啟動）與共用 line_client 連線池（暖連線）的
+exchange_code 延遲，並回報兩者實際建立的連線數。不會連到真正的 LINE API。
+
+用法:
+    python scripts/bench_line_client.py [--requests 200] [--concurrency 20] [--handshake-ms 50]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.services.line_service import LineClient
+
+TOKEN_RESPONSE = json.dumps({
+    "access_token": "stub", "token_type": "Bearer", "expires_in": 2592000, "id_token": "stub"
+}).encode("utf-8")
+
+
+class StubServer:
+    """最小的 HTTP/1.1 keep-alive 伺服器，所有請求都回傳固定的 token JSON"""
+
+    def __init__(self, handshake: float):
+        self.handshake = handshake
+        self.connections = 0
+        self.requests = 0
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        await asyncio.sleep(self.handshake)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+                self.requests += 1
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: " + str(len(TOKEN_RESPONSE)).encode() + b"\r\n\r\n" + TOKEN_RESPONSE
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+
+async def measure(call, requests: int, concurrency: int) -> dict:
+    """以固定並發數執行 requests 次 call，回傳延遲統計"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def once():
+        async with semaphore:
+            started = time.perf_counter()
+            await call()
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(once() for _ in range(requests)))
+    return {
+        "elapsed": time.perf_counter() - started,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "mean": statistics.mean(latencies) * 1000,
+    }
+
+
+async def main(args: argparse.Namespace):
+    """主函數"""
+    stub = StubServer(args.handshake_ms / 1000)
+    server = await asyncio.start_server(stub.handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    settings.LINE_API_BASE_URL = f"http://127.0.0.1:{port}"
+
+    async def cold_call():
+        # 每次請求建立新的客戶端與連線（改用連線池之前的行為）
+        client = LineClient()
+        await client.start()
+        try:
+            await client.exchange_code("stub")
+        finally:
+            await client.close()
+
+    warm = LineClient()
+    await warm.start()
+
+    try:
+        print("=" * 50)
+        print(f"{args.requests} 次 exchange_code，並發 {args.concurrency}，連線建立延遲 {args.handshake_ms}ms")
+        print("=" * 50)
+
+        results = {}
+        for label, call in (("冷啟動", cold_call), ("暖連線", lambda: warm.exchange_code("stub"))):
+            connections = stub.connections
+            results[label] = await measure(call, args.requests, args.concurrency)
+            results[label]["connections"] = stub.connections - connections
+
+        for label, r in results.items():
+            print(f"{label}: 新連線 {r['connections']}, 總耗時 {r['elapsed']:.2f}s, "
+                  f"p50 {r['p50']:.1f}ms p95 {r['p95']:.1f}ms p99 {r['p99']:.1f}ms 平均 {r['mean']:.1f}ms")
+
+        cold, pooled = results["冷啟動"], results["暖連線"]
+        print("\n" + "=" * 50)
+        print(f"平均延遲差: {pooled['mean'] - cold['mean']:+.1f}ms, "
+              f"p95 差: {pooled['p95'] - cold['p95']:+.1f}ms")
+        reused = pooled["connections"] <= args.concurrency
+        print(f"{'✅ 連線池有重用連線' if reused else '❌ 連線池沒有重用連線'}")
+        print("=" * 50)
+        if not reused:
+            sys.exit(1)
+    finally:
+        await warm.close()
+        server.close()
+        await server.wait_closed()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LINE 連線池延遲測試")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--handshake-ms", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,57 @@
+"""
+批次匯入用戶
+
+用法:
+    python scripts/import_users.py attendees.xlsx [--update]
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import AsyncSessionLocal, engine
+from app.services.user_import_service import import_users
+
+
+async def main(args: argparse.Namespace):
+    """主函數"""
+    path = Path(args.file)
+    if not path.is_file():
+        print(f"❌ 找不到檔案: {path}")
+        sys.exit(1)
+
+    started = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as session:
+            with open(path, "rb") as f:
+                report = await import_users(
+                    session, f, path.name,
+                    on_conflict="update" if args.update else "skip"
+                )
+    except ValueError as e:
+        print(f"❌ 匯入失敗: {e}")
+        sys.exit(1)
+    finally:
+        await engine.dispose()
+
+    print("=" * 50)
+    print(f"✅ 匯入完成 ({time.perf_counter() - started:.2f}s)")
+    print(f"   讀取: {report['total']}")
+    print(f"   新增: {report['inserted']}")
+    print(f"   更新: {report['updated']}")
+    print(f"   略過: {report['skipped']}")
+    print(f"   失敗: {report['failed']}")
+    print("=" * 50)
+    for error in report["errors"]:
+        print(f"   第 {error['row']} 行 ({error['line_user_id']}): {error['message']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="批次匯入用戶 (CSV/XLSX)")
+    parser.add_argument("file", help="CSV 或 XLSX 檔案")
+    parser.add_argument("--update", action="store_true", help="LINE ID 已存在時更新資料")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,56 @@
+"""
+資料庫遷移腳本
+
+用法:
+    python scripts/migrate.py status
+    python scripts/migrate.py upgrade [--target 0008] [--dry-run]
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import engine
+from app.database.migrations import MigrationRunner, MIGRATIONS
+
+
+async def main(args: argparse.Namespace):
+    """主函數"""
+    runner = MigrationRunner(engine, MIGRATIONS)
+
+    try:
+        if args.command == "status":
+            await runner.status()
+        elif args.dry_run:
+            await runner.dry_run(args.target)
+        else:
+            print("=" * 50)
+            print("開始遷移資料庫")
+            print("=" * 50)
+            applied = await runner.upgrade(args.target)
+            print("\n" + "=" * 50)
+            print(f"🎉 資料庫遷移成功！本次套用 {len(applied)} 個版本")
+            print("=" * 50)
+    except Exception as e:
+        print(f"\n❌ 資料庫遷移失敗: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CheckinFlow 資料庫遷移")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("status", help="顯示遷移狀態")
+
+    upgrade_parser = subparsers.add_parser("upgrade", help="套用待執行的遷移")
+    upgrade_parser.add_argument("--target", help="套用到指定版本為止")
+    upgrade_parser.add_argument("--dry-run", action="store_true", help="只列出操作與預估耗時")
+
+    asyncio.run(main(parser.parse_args()))
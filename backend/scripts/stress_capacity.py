@@ -0,0 +1,141 @@
+"""
+名額控制壓力測試
+
+建立一個有人數上限與一個無上限的臨時活動，各以 N 個並發簽到寫入，
+驗證有上限的活動沒有超額，並比較兩者的延遲以估算名額控制帶來的額外成本。
+結束後刪除所有臨時資料。
+
+用法:
+    python scripts/stress_capacity.py [--concurrency 1000] [--capacity 300]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text, select, func, delete
+from app.database import AsyncSessionLocal, engine
+from app.models import Admin, Event, User, Checkin
+from app.services.capacity_service import reserve_seat, capacity_tracker
+
+
+async def checkin_once(event_id: str, user_id: int) -> tuple:
+    """模擬 create_checkin 的新增簽到寫入路徑，回傳 (是否成功, 延遲秒數)"""
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        session.add(Checkin(
+            user_id=user_id,
+            event_id=event_id,
+            checkin_time=datetime.now(timezone.utc),
+            status="已簽到",
+            is_valid=True
+        ))
+        await session.flush()
+        if await reserve_seat(session, event_id):
+            await session.commit()
+            ok = True
+        else:
+            await session.rollback()
+            ok = False
+    return ok, time.perf_counter() - started
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+
+async def run(event_id: str, user_ids: list) -> dict:
+    capacity_tracker.invalidate(event_id)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(checkin_once(event_id, uid) for uid in user_ids))
+    elapsed = time.perf_counter() - started
+
+    latencies = [latency for _, latency in results]
+    async with AsyncSessionLocal() as session:
+        actual = await session.scalar(select(func.count(Checkin.id)).where(Checkin.event_id == event_id))
+        counter = await session.scalar(select(Event.checkin_count).where(Event.id == event_id))
+
+    return {
+        "accepted": sum(1 for ok, _ in results if ok),
+        "actual": actual,
+        "counter": counter,
+        "elapsed": elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+        "p99": percentile(latencies, 0.99),
+        "mean": statistics.mean(latencies) * 1000,
+    }
+
+
+async def main(args: argparse.Namespace):
+    """主函數"""
+    tag = uuid.uuid4().hex[:8]
+    now = datetime.now(timezone.utc)
+
+    async with AsyncSessionLocal() as session:
+        admin = Admin(username=f"stress_{tag}", password="-", name="管理員")
+        session.add(admin)
+        await session.flush()
+
+        capped = Event(name=f"stress capped {tag}", start_time=now, end_time=now + timedelta(hours=1),
+                       max_participants=args.capacity, created_by=admin.id)
+        uncapped = Event(name=f"stress uncapped {tag}", start_time=now, end_time=now + timedelta(hours=1),
+                         created_by=admin.id)
+        session.add_all([capped, uncapped])
+
+        result = await session.execute(
+            text(
+                "INSERT INTO users (line_user_id, name, phone, company, department, profile_data) "
+                "SELECT 'stress_' || :tag || '_' || g, 'stress', '0900000000', 'stress', 'stress', '{}' "
+                "FROM generate_series(1, :n) AS g RETURNING id"
+            ),
+            {"tag": tag, "n": args.concurrency}
+        )
+        user_ids = [row[0] for row in result]
+        await session.commit()
+        capped_id, uncapped_id, admin_id = capped.id, uncapped.id, admin.id
+
+    try:
+        print("=" * 50)
+        print(f"並發 {args.concurrency} 個簽到，名額上限 {args.capacity}")
+        print("=" * 50)
+
+        baseline = await run(uncapped_id, user_ids)
+        limited = await run(capped_id, user_ids)
+
+        for label, r in (("無上限", baseline), ("有上限", limited)):
+            print(f"{label}: 成功 {r['accepted']} / 記錄 {r['actual']} / 計數器 {r['counter']}, "
+                  f"總耗時 {r['elapsed']:.2f}s, p50 {r['p50']:.1f}ms p95 {r['p95']:.1f}ms "
+                  f"p99 {r['p99']:.1f}ms 平均 {r['mean']:.1f}ms")
+
+        overbooked = limited["actual"] > args.capacity
+        consistent = limited["actual"] == limited["counter"] == min(args.capacity, args.concurrency)
+        print("\n" + "=" * 50)
+        print(f"{'❌ 超額' if overbooked else '✅ 未超額'}，計數器{'一致' if consistent else '不一致'}")
+        print(f"平均延遲差: {limited['mean'] - baseline['mean']:+.1f}ms")
+        print("=" * 50)
+        if overbooked or not consistent:
+            sys.exit(1)
+    finally:
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Checkin).where(Checkin.event_id.in_([capped_id, uncapped_id])))
+            await session.execute(delete(Event).where(Event.id.in_([capped_id, uncapped_id])))
+            await session.execute(delete(User).where(User.id.in_(user_ids)))
+            await session.execute(delete(Admin).where(Admin.id == admin_id))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="名額控制壓力測試")
+    parser.add_argument("--concurrency", type=int, default=1000)
+    parser.add_argument("--capacity", type=int, default=300)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,225 @@
+"""
+生產環境啟動入口
+
+在主進程中預先載入應用並初始化資料庫，再 fork 多個 uvicorn worker (uvloop + httptools)
+共用同一個監聽 socket。worker 處理 MAX_REQUESTS 個請求後自動退出並由主進程補上。
+
+信號:
+- SIGHUP: 逐一替換 worker（先啟動新 worker，再優雅關閉舊 worker），服務不中斷
+- SIGTERM / SIGINT: 優雅關閉所有 worker 後退出
+
+用法:
+    python serve.py [--workers 4] [--port 8000] [--no-preload]
+"""
+import argparse
+import asyncio
+import os
+import random
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Set
+
+import uvicorn
+
+from app.core.config import settings
+
+
+def default_workers() -> int:
+    """依可用 CPU 核心數決定 worker 數量（容器中會考慮 CPU affinity）"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+async def prepare_database():
+    """在 fork 前初始化資料庫一次，並釋放連線避免被子進程繼承"""
+    from app.database import init_db, close_db
+
+    await init_db()
+    await close_db()
+
+
+class Supervisor:
+    """pre-fork worker 管理器"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.app = "main:app"
+        self.sock = None
+        self.workers: Dict[int, float] = {}  # pid -> 啟動時間
+        self.retiring: Set[int] = set()
+        self.should_exit = False
+        self.reload_requested = False
+
+    def bind(self) -> None:
+        """建立所有 worker 共用的監聽 socket"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.args.host, self.args.port))
+        sock.listen(self.args.backlog)
+        sock.set_inheritable(True)
+        self.sock = sock
+
+    def preload(self) -> None:
+        """預先匯入應用，worker 透過 copy-on-write 共用已載入的模組"""
+        asyncio.run(prepare_database())
+        settings.INIT_DB_ON_STARTUP = False
+        os.environ["INIT_DB_ON_STARTUP"] = "false"
+
+        if self.args.preload:
+            from main import app
+            self.app = app
+
+    def spawn_worker(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                self.run_worker()
+            except BaseException as e:
+                print(f"❌ Worker {os.getpid()} 異常退出: {e}", file=sys.stderr)
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+
+        self.workers[pid] = time.monotonic()
+        return pid
+
+    def run_worker(self) -> None:
+        """子進程：在共用 socket 上執行 uvicorn"""
+        for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(sig, signal.SIG_DFL)
+
+        # 加入隨機抖動，避免所有 worker 同時回收
+        limit_max_requests = None
+        if self.args.max_requests > 0:
+            limit_max_requests = self.args.max_requests + random.randint(0, self.args.max_requests_jitter)
+
+        config = uvicorn.Config(
+            self.app,
+            loop="uvloop",
+            http="httptools",
+            lifespan="on",
+            proxy_headers=True,
+            forwarded_allow_ips="*",
+            limit_max_requests=limit_max_requests,
+            timeout_graceful_shutdown=self.args.graceful_timeout,
+        )
+        uvicorn.Server(config).run(sockets=[self.sock])
+
+    def reap(self) -> None:
+        """回收已退出的 worker，非主動關閉的自動補上"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+
+            started = self.workers.pop(pid, None)
+            if pid in self.retiring:
+                self.retiring.discard(pid)
+                continue
+            if started is None or self.should_exit:
+                continue
+
+            # 啟動後立即退出通常是設定錯誤，稍等再重啟以免空轉
+            if time.monotonic() - started < 1:
+                print(f"⚠️  Worker {pid} 啟動後立即退出，1 秒後重啟", file=sys.stderr)
+                time.sleep(1)
+            self.spawn_worker()
+
+    def rolling_restart(self) -> None:
+        """逐一替換 worker，任何時刻都至少有 N 個 worker 在服務"""
+        print(f"🔄 收到 SIGHUP，逐一替換 {len(self.workers)} 個 worker...")
+        for old_pid in list(self.workers):
+            if self.should_exit:
+                return
+            new_pid = self.spawn_worker()
+            time.sleep(self.args.reload_delay)
+            self.retiring.add(old_pid)
+            self.workers.pop(old_pid, None)
+            try:
+                os.kill(old_pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.retiring.discard(old_pid)
+            print(f"   ✅ Worker {old_pid} → {new_pid}")
+
+    def shutdown(self) -> None:
+        """優雅關閉所有 worker，逾時則強制終止"""
+        pids = list(self.workers) + list(self.retiring)
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        deadline = time.monotonic() + self.args.graceful_timeout + 5
+        while pids and time.monotonic() < deadline:
+            for pid in list(pids):
+                try:
+                    done, _ = os.waitpid(pid, os.WNOHANG)
+                except ChildProcessError:
+                    done = pid
+                if done:
+                    pids.remove(pid)
+            time.sleep(0.1)
+
+        for pid in pids:
+            print(f"⚠️  Worker {pid} 逾時未退出，強制終止", file=sys.stderr)
+            os.kill(pid, signal.SIGKILL)
+
+    def handle_exit(self, sig, frame):
+        self.should_exit = True
+
+    def handle_hup(self, sig, frame):
+        self.reload_requested = True
+
+    def run(self) -> None:
+        self.bind()
+        self.preload()
+
+        signal.signal(signal.SIGTERM, self.handle_exit)
+        signal.signal(signal.SIGINT, self.handle_exit)
+        signal.signal(signal.SIGHUP, self.handle_hup)
+
+        print(f"🚀 啟動 {self.args.workers} 個 worker: http://{self.args.host}:{self.args.port} (主進程 {os.getpid()})")
+        for _ in range(self.args.workers):
+            self.spawn_worker()
+
+        while not self.should_exit:
+            self.reap()
+            if self.reload_requested:
+                self.reload_requested = False
+                self.rolling_restart()
+            time.sleep(0.5)
+
+        print("👋 停止所有 worker...")
+        self.shutdown()
+        self.sock.close()
+        print("✅ 所有 worker 已停止")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="CheckinFlow API 生產環境啟動")
+    parser.add_argument("--host", default=settings.HOST)
+    parser.add_argument("--port", type=int, default=settings.PORT)
+    parser.add_argument("--workers", type=int, default=settings.WEB_CONCURRENCY or default_workers())
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--max-requests", type=int, default=settings.MAX_REQUESTS)
+    parser.add_argument("--max-requests-jitter", type=int, default=settings.MAX_REQUESTS_JITTER)
+    parser.add_argument("--graceful-timeout", type=int, default=settings.GRACEFUL_TIMEOUT)
+    parser.add_argument("--reload-delay", type=float, default=2.0, help="SIGHUP 時新 worker 啟動後等待秒數")
+    parser.add_argument(
+        "--no-preload", dest="preload", action="store_false",
+        help="worker 各自匯入應用，SIGHUP 時可載入新程式碼"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    Supervisor(parse_args()).run()
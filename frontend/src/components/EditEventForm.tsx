@@ -2,7 +2,7 @@ import { useState, useEffect } from 'react';
 import { useNavigate, Link } from 'react-router-dom';
 import { eventService } from '../services/eventService';
 import { templateService } from '../services/templateService';
-import type {EventUpdate, RegistrationTemplate} from '../types';
+import type {EventUpdate, RegistrationTemplateSummary} from '../types';
 import MapLocationPicker from './MapLocationPicker';
 
 interface EventData {
@@ -40,7 +40,7 @@ export default function EditEventForm({ eventId }: EditEventFormProps) {
   const [success, setSuccess] = useState(false);
   const [showDeleteConfirm, setShowDeleteConfirm] = useState(false);
   const [checkinCount, setCheckinCount] = useState(0);
-  const [templates, setTemplates] = useState<RegistrationTemplate[]>([]);
+  const [templates, setTemplates] = useState<RegistrationTemplateSummary[]>([]);
 
   // 表單資料
   const [formData, setFormData] = useState<EventData>({
@@ -72,7 +72,7 @@ export default function EditEventForm({ eventId }: EditEventFormProps) {
         setLoading(true);
         const [event, allTemplates] = await Promise.all([
           eventService.getEvent(eventId),
-          templateService.getTemplates()
+          templateService.getAllTemplateSummaries()
         ]);
 
         setTemplates(allTemplates);
@@ -2,7 +2,7 @@ import { useState, useEffect } from 'react';
 import { useNavigate, Link } from 'react-router-dom';
 import { eventService } from '../../services/eventService';
 import { templateService } from '../../services/templateService';
-import type {EventCreate, EventSeriesCreate, RegistrationTemplate} from '../../types';
+import type {EventCreate, EventSeriesCreate, RegistrationTemplateSummary} from '../../types';
 
 import MapLocationPicker from '../../components/MapLocationPicker';
 
@@ -11,7 +11,7 @@ export default function CreateEventPage() {
 
   const [submitting, setSubmitting] = useState(false);
   const [error, setError] = useState<string | null>(null);
-  const [templates, setTemplates] = useState<RegistrationTemplate[]>([]);
+  const [templates, setTemplates] = useState<RegistrationTemplateSummary[]>([]);
 
   const [formData, setFormData] = useState({
     name: '',
@@ -48,7 +48,7 @@ export default function CreateEventPage() {
   useEffect(() => {
     const fetchTemplates = async () => {
       try {
-        const data = await templateService.getTemplates();
+        const data = await templateService.getAllTemplateSummaries();
         setTemplates(data);
       } catch (err) {
         console.error('Fetch templates error:', err);
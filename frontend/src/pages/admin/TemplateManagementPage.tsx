@@ -1,12 +1,12 @@
 import { useState, useEffect } from 'react';
 import { templateService } from '../../services/templateService';
-import type {RegistrationTemplate, FormField, RegistrationTemplateCreate} from '../../types';
+import type {RegistrationTemplateSummary, FormField, RegistrationTemplateCreate} from '../../types';
 import LoadingSpinner from '../../components/LoadingSpinner';
 import { useAuthStore } from '../../store/authStore';
 
 export default function TemplateManagementPage() {
   const { admin } = useAuthStore();
-  const [templates, setTemplates] = useState<RegistrationTemplate[]>([]);
+  const [templates, setTemplates] = useState<RegistrationTemplateSummary[]>([]);
   const [loading, setLoading] = useState(true);
   const [isEditing, setIsEditing] = useState(false);
   const [editingId, setEditingId] = useState<string | null>(null);
@@ -24,7 +24,7 @@ export default function TemplateManagementPage() {
 
   const fetchTemplates = async () => {
     try {
-      const data = await templateService.getTemplates();
+      const data = await templateService.getAllTemplateSummaries();
       setTemplates(data);
     } catch (err) {
       console.error('Fetch templates error:', err);
@@ -66,17 +66,23 @@ export default function TemplateManagementPage() {
     setError(null);
   };
 
-  const handleStartEdit = (template: RegistrationTemplate) => {
-    setFormData({
-      name: template.name,
-      type: template.type,
-      survey_trigger: template.survey_trigger || 'course_start',
-      is_public: template.is_public,
-      fields_schema: [...template.fields_schema]
-    });
-    setEditingId(template.id);
-    setIsEditing(true);
-    setError(null);
+  const handleStartEdit = async (summary: RegistrationTemplateSummary) => {
+    // 列表只有摘要，編輯時才載入完整欄位定義
+    try {
+      const template = await templateService.getTemplate(summary.id);
+      setFormData({
+        name: template.name,
+        type: template.type,
+        survey_trigger: template.survey_trigger || 'course_start',
+        is_public: template.is_public,
+        fields_schema: [...template.fields_schema]
+      });
+      setEditingId(template.id);
+      setIsEditing(true);
+      setError(null);
+    } catch (err: any) {
+      alert(err.response?.data?.detail || '載入範本失敗');
+    }
   };
 
   const handleSave = async () => {
@@ -263,7 +269,7 @@ export default function TemplateManagementPage() {
                 觸發：{template.survey_trigger === 'course_start' ? '課程開始' : '課程結束'}
               </p>
             )}
-            <p className="text-sm text-gray-600 mb-4">欄位數量: {template.fields_schema.length}</p>
+            <p className="text-sm text-gray-600 mb-4">欄位數量: {template.field_count}</p>
             <div className="flex gap-4">
               <button
                 onClick={() => handleStartEdit(template)}
@@ -2,14 +2,41 @@
  * 註冊表單範本服務
  */
 import { apiClient } from './api';
-import type {RegistrationTemplate, RegistrationTemplateCreate} from '../types';
+import type {
+  PaginatedResponse,
+  RegistrationTemplate,
+  RegistrationTemplateCreate,
+  RegistrationTemplateSummary
+} from '../types';
+
+const SUMMARY_PAGE_SIZE = 200;
 
 export const templateService = {
   /**
-   * 獲取所有可用範本
+   * 獲取可用範本摘要（分頁，不含欄位定義）
+   */
+  async getTemplates(params?: {
+    page?: number;
+    page_size?: number;
+    type?: RegistrationTemplate['type'];
+  }): Promise<PaginatedResponse<RegistrationTemplateSummary>> {
+    return apiClient.get('/api/templates', { params });
+  },
+
+  /**
+   * 獲取所有可用範本摘要（依序讀取所有分頁，供選單使用）
    */
-  async getTemplates(): Promise<RegistrationTemplate[]> {
-    return apiClient.get('/api/templates');
+  async getAllTemplateSummaries(): Promise<RegistrationTemplateSummary[]> {
+    const summaries: RegistrationTemplateSummary[] = [];
+    let page = 1;
+    let totalPages = 1;
+    do {
+      const result = await this.getTemplates({ page, page_size: SUMMARY_PAGE_SIZE });
+      summaries.push(...result.data);
+      totalPages = result.total_pages;
+      page += 1;
+    } while (page <= totalPages);
+    return summaries;
   },
 
   /**
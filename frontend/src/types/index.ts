@@ -168,6 +168,28 @@ export interface RegistrationTemplate {
   updated_at?: string;
 }
 
+// 範本摘要（列表與選單用，不含 fields_schema）
+export interface RegistrationTemplateSummary {
+  id: string;
+  name: string;
+  type: 'registration' | 'survey' | 'profile_extension';
+  survey_trigger?: 'course_start' | 'course_end';
+  is_public: boolean;
+  created_by_admin_id?: number;
+  field_count: number;
+  updated_at?: string;
+}
+
+export interface PaginatedResponse<T> {
+  success: boolean;
+  message?: string;
+  data: T[];
+  total: number;
+  page: number;
+  page_size: number;
+  total_pages: number;
+}
+
 export interface RegistrationTemplateCreate {
   name: string;
   type: 'registration' | 'survey' | 'profile_extension';
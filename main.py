@@ -1,7 +1,16 @@
 #!/usr/bin/env python3
 """
 開發環境啟動腳本 - 統一管理前後端 log
+
+加上 --prod 時後端改用 backend/serve.py (多 worker、無 --reload)
+加上 --log-json 時 log 檔改為每行一筆 JSON
+
+Log 輪替 (環境變數):
+- LOG_MAX_MB: 單檔大小上限，預設 50
+- LOG_ROTATE_HOURS: 依時間輪替的間隔，預設 24，0 表示不依時間輪替
+- LOG_BACKUP_COUNT: 保留的舊檔數量，預設 5
 """
+import json
 import subprocess
 import signal
 import sys
@@ -25,39 +34,172 @@ class Colors:
 
 
 processes = []
+log_writers = []
 log_dir = Path('logs')
 
 
+class TimestampCache:
+    """同一秒內重複使用已格式化的時間字串，避免每行都呼叫 strftime"""
+
+    def __init__(self):
+        self._second = None
+        self._text = ''
+        self._lock = threading.Lock()
+
+    def now(self):
+        second = int(time.time())
+        if second != self._second:
+            with self._lock:
+                if second != self._second:
+                    self._text = datetime.fromtimestamp(second).strftime('%Y-%m-%d %H:%M:%S')
+                    self._second = second
+        return self._text
+
+
+timestamps = TimestampCache()
+
+
+class BufferedLogWriter:
+    """
+    緩衝式 log 寫入器
+
+    - 單一長期開啟的檔案 handle，不再每行 open/close
+    - 寫入只進記憶體緩衝區，由背景線程每 flush_interval 秒批次寫檔
+    - 依檔案大小或時間間隔輪替 (path.1, path.2, ...)
+    """
+
+    def __init__(self, path, max_bytes=50 * 1024 * 1024, rotate_interval=24 * 3600,
+                 backup_count=5, flush_interval=1.0, json_format=False, max_buffered_lines=10000):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+        self.flush_interval = flush_interval
+        self.json_format = json_format
+        self.max_buffered_lines = max_buffered_lines
+
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._open()
+
+        self._thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._thread.start()
+
+    def _open(self):
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._bytes = self._file.tell()
+        self._opened_at = time.monotonic()
+
+    def write(self, message, prefix=None, timestamp=None):
+        """加入一行 log 到緩衝區"""
+        timestamp = timestamp or timestamps.now()
+        if self.json_format:
+            record = {'time': timestamp, 'message': message}
+            if prefix:
+                record['source'] = prefix
+            line = json.dumps(record, ensure_ascii=False) + '\n'
+        elif prefix:
+            line = f"[{prefix}] [{timestamp}] {message}\n"
+        else:
+            line = f"[{timestamp}] {message}\n"
+
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= self.max_buffered_lines:
+                self._wakeup.set()
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"{Colors.RED}Log 寫入錯誤 ({self.path}): {e}{Colors.END}")
+
+    def flush(self):
+        """將緩衝區寫入檔案，必要時輪替"""
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+        if not lines:
+            return
+
+        data = ''.join(lines)
+        self._file.write(data)
+        self._file.flush()
+        self._bytes += len(data.encode('utf-8'))
+
+        if self._should_rotate():
+            self._rotate()
+
+    def _should_rotate(self):
+        if self.max_bytes and self._bytes >= self.max_bytes:
+            return True
+        if self.rotate_interval and time.monotonic() - self._opened_at >= self.rotate_interval:
+            return True
+        return False
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            src = self.path.with_name(f'{self.path.name}.{i}')
+            if src.exists():
+                src.replace(self.path.with_name(f'{self.path.name}.{i + 1}'))
+        if self.backup_count > 0:
+            self.path.replace(self.path.with_name(f'{self.path.name}.1'))
+        else:
+            self.path.unlink()
+        self._open()
+
+    def close(self):
+        """停止背景線程並寫出剩餘內容"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        self._file.close()
+
+
 def setup_logging():
-    """建立 log 目錄"""
+    """建立 log 目錄與寫入器"""
     log_dir.mkdir(exist_ok=True)
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
-    backend_log = log_dir / f'backend_{timestamp}.log'
-    frontend_log = log_dir / f'frontend_{timestamp}.log'
-    combined_log = log_dir / f'combined_{timestamp}.log'
+    json_format = '--log-json' in sys.argv
+    suffix = 'jsonl' if json_format else 'log'
+    options = {
+        'max_bytes': int(os.getenv('LOG_MAX_MB', '50')) * 1024 * 1024,
+        'rotate_interval': float(os.getenv('LOG_ROTATE_HOURS', '24')) * 3600,
+        'backup_count': int(os.getenv('LOG_BACKUP_COUNT', '5')),
+        'json_format': json_format,
+    }
+
+    backend_log = BufferedLogWriter(log_dir / f'backend_{timestamp}.{suffix}', **options)
+    frontend_log = BufferedLogWriter(log_dir / f'frontend_{timestamp}.{suffix}', **options)
+    combined_log = BufferedLogWriter(log_dir / f'combined_{timestamp}.{suffix}', **options)
+    log_writers.extend([backend_log, frontend_log, combined_log])
 
     return backend_log, frontend_log, combined_log
 
 
-def log_output(process, prefix, color, log_file, combined_file):
+def log_output(process, prefix, color, log_writer, combined_writer):
     """讀取並記錄進程輸出"""
     try:
         for line in iter(process.stdout.readline, b''):
             if line:
                 decoded_line = line.decode('utf-8', errors='ignore').rstrip()
-                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                timestamp = timestamps.now()
 
                 # 終端機輸出 (帶顏色)
                 print(f"{color}[{prefix}] {timestamp}{Colors.END} {decoded_line}")
 
-                # 寫入個別 log 檔
-                with open(log_file, 'a', encoding='utf-8') as f:
-                    f.write(f"[{timestamp}] {decoded_line}\n")
-
-                # 寫入合併 log 檔
-                with open(combined_file, 'a', encoding='utf-8') as f:
-                    f.write(f"[{prefix}] [{timestamp}] {decoded_line}\n")
+                # 寫入個別與合併 log (只進緩衝區，由背景線程寫檔)
+                log_writer.write(decoded_line, timestamp=timestamp)
+                combined_writer.write(decoded_line, prefix=prefix, timestamp=timestamp)
     except Exception as e:
         print(f"{Colors.RED}Log 錯誤 ({prefix}): {e}{Colors.END}")
 
@@ -74,6 +216,9 @@ def signal_handler(sig, frame):
         except Exception as e:
             print(f"{Colors.RED}停止服務時發生錯誤: {e}{Colors.END}")
 
+    for writer in log_writers:
+        writer.close()
+
     print(f'{Colors.GREEN}✅ 所有服務已停止{Colors.END}')
     print(f'{Colors.CYAN}📝 Log 檔案位於: {log_dir}{Colors.END}')
     sys.exit(0)
@@ -88,9 +233,9 @@ def main():
     # 設定 logging
     backend_log, frontend_log, combined_log = setup_logging()
     print(f'{Colors.CYAN}📝 Log 檔案:{Colors.END}')
-    print(f'   後端: {backend_log}')
-    print(f'   前端: {frontend_log}')
-    print(f'   合併: {combined_log}')
+    print(f'   後端: {backend_log.path}')
+    print(f'   前端: {frontend_log.path}')
+    print(f'   合併: {combined_log.path}')
     print()
 
     # 檢查後端目錄
@@ -116,9 +261,14 @@ def main():
         backend_path = os.path.abspath('backend')
         env = os.environ.copy()
         env['PYTHONPATH'] = backend_path
+        if '--prod' in sys.argv:
+            backend_cmd = [sys.executable, 'serve.py', '--host', '0.0.0.0', '--port', '8000']
+        else:
+            backend_cmd = ['uvicorn', 'main:app', '--reload', '--host', '0.0.0.0', '--port', '8000']
+
         print(f'{Colors.BLUE}🔧 啟動後端服務 (Port 8000)...{Colors.END}')
         backend = subprocess.Popen(
-            ['uvicorn', 'main:app', '--reload', '--host', '0.0.0.0', '--port', '8000'],
+            backend_cmd,
             cwd='backend',
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,